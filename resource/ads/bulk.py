@@ -0,0 +1,142 @@
+"""
+Bulk export and import of an owner's ads.
+
+Export streams one JSON document, `{"export_info": ..., "branding": ...,
+"ads": [...]}`, writing each ad as it is read so the response never holds
+all of them in memory. Ads use the same shape as the single-ad export.
+
+Import validates every item before writing anything. If all items are
+valid, the ads and then their media are inserted with one bulk_create each,
+inside a single transaction. Otherwise nothing is written and the errors
+are reported by item index.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from advouch import conditional
+from business.models import Business
+from users.ownership import owned_ids
+from . import embed, variants
+from .models import Ad, Media
+from .serializers import AdImportSerializer
+
+
+BRANDING = {
+    'platform': 'AdVouch',
+    'tagline': 'Verified & Trusted Advertising',
+    'website': 'https://advouch.com',
+    'badge_text': 'Advertised via AdVouch',
+}
+
+EXPORT_CHUNK_SIZE = 500
+MAX_IMPORT_ITEMS = 1000
+
+
+def ad_export_data(ad):
+    """
+    Export representation of one ad; expects business and media_files to
+    be loaded already
+    """
+    business = ad.business
+    return {
+        'ad': {
+            'id': ad.id,
+            'title': ad.title,
+            'description': ad.description,
+            'status': ad.status,
+            'share_count': ad.share_count,
+            'created_at': ad.created_at.isoformat(),
+            'media_files': [
+                {
+                    'url': media.url,
+                    'type': media.media_type
+                } for media in ad.media_files.all()
+            ]
+        },
+        'business': {
+            'id': business.id,
+            'name': business.name,
+        } if business else None,
+    }
+
+
+def stream_export(owner):
+    """
+    Yields the export document for all of `owner`'s ads in pieces.
+    """
+    ads = (
+        Ad.objects.filter(owner=owner)
+        .select_related('business')
+        .prefetch_related(Prefetch('media_files', queryset=Media.objects.order_by('id')))
+        .order_by('id')
+    )
+    header = {
+        'export_info': {
+            'exported_at': timezone.now().isoformat(),
+            'format': 'json',
+            'version': '1.0',
+        },
+        'branding': BRANDING,
+    }
+    # Open the document and the "ads" array by hand, then close them at the end
+    yield json.dumps(header)[:-1] + ', "ads": ['
+    # With chunk_size, iterator() runs the media prefetch once per chunk
+    for index, ad in enumerate(ads.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+        yield (', ' if index else '') + json.dumps(ad_export_data(ad), cls=DjangoJSONEncoder)
+    yield ']}'
+
+
+def validate_import(owner, items):
+    """
+    Returns (validated items, errors). Each error is {'index': i, 'errors': {...}}.
+    Business ownership is checked for all items with one query, once they are valid.
+    """
+    checked, errors = [], []
+    for index, item in enumerate(items):
+        serializer = AdImportSerializer(data=item)
+        if serializer.is_valid():
+            checked.append((index, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+
+    owned_businesses = owned_ids(Business, (data['business'] for _, data in checked), owner)
+    validated = []
+    for index, data in checked:
+        if data['business'] in owned_businesses:
+            validated.append(data)
+        else:
+            errors.append({'index': index, 'errors': {'business': ['You do not own this business']}})
+    errors.sort(key=lambda error: error['index'])
+    return validated, errors
+
+
+def import_ads(owner, validated):
+    """
+    Insert validated items with two bulk_create calls; returns the new ads.
+    """
+    with transaction.atomic():
+        ads = Ad.objects.bulk_create([
+            Ad(
+                title=item['title'],
+                description=item.get('description'),
+                status=item['status'],
+                business_id=item['business'],
+                owner=owner,
+            )
+            for item in validated
+        ])
+        created_media = Media.objects.bulk_create([
+            Media(ad=ad, **media)
+            for ad, item in zip(ads, validated)
+            for media in item.get('media_files', [])
+        ])
+        # bulk_create sends no post_save, so drop any cached "missing" embeds
+        # and move the list views on to new versions by hand
+        embed.invalidate([ad.id for ad in ads])
+        conditional.bump(Ad, Media)
+        variants.enqueue_media(item.id for item in created_media)
+    return ads
@@ -0,0 +1,159 @@
+"""
+Prerendered embed HTML.
+
+Embeds are loaded from third-party pages far more often than the API is
+called, so each ad's embed page is rendered once and cached as bytes along
+with its ETag. There are two tiers:
+
+    memory  per-process dict, kept for EMBED_MEMORY_TTL seconds so a hot ad
+            costs no network round trip at all
+    shared  the Django cache (Redis with CACHE_BACKEND=redis), kept for
+            EMBED_CACHE_TTL seconds; with the per-process locmem default
+            only for EMBED_MEMORY_TTL, since other workers never hear of
+            invalidations
+
+Missing or inactive ads are cached too, so repeated 404s stay off the
+database. Saving or deleting an Ad, its Media or its Business drops the
+entry from the shared cache and from this process's memory tier. Other
+processes can keep serving their memory copy for up to EMBED_MEMORY_TTL
+seconds. bulk_create sends no signals, so code that bulk-inserts ads or
+media calls invalidate() itself.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+
+from business.models import Business
+from .models import Ad, Media
+
+
+# (etag, body); body is None when there is no active ad with that id
+MISSING = (None, None)
+
+
+def _key(ad_id):
+    return f"embed:{ad_id}"
+
+
+class _MemoryTier:
+    """Small LRU of recently served embeds, each kept for `ttl` seconds"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ad_id):
+        with self._lock:
+            item = self._entries.get(ad_id)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._entries[ad_id]
+                return None
+            self._entries.move_to_end(ad_id)
+            return entry
+
+    def set(self, ad_id, entry):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[ad_id] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(ad_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, ad_ids):
+        with self._lock:
+            for ad_id in ad_ids:
+                self._entries.pop(ad_id, None)
+
+
+_memory = _MemoryTier(settings.EMBED_MEMORY_TTL, settings.EMBED_MEMORY_MAX_ENTRIES)
+
+
+def render(ad_id):
+    """
+    Render the embed page for `ad_id` from the database. Returns (etag, body)
+    or MISSING.
+    """
+    ad = (
+        Ad.objects.filter(id=ad_id, status='active')
+        .select_related('business')
+        .first()
+    )
+    if ad is None:
+        return MISSING
+    context = {
+        'ad': ad,
+        'business': ad.business,
+        'media': ad.media_files.order_by('id').first(),
+    }
+    body = render_to_string('ad_embed.html', context).encode()
+    return f'"{hashlib.sha1(body).hexdigest()}"', body
+
+
+def shared_ttl():
+    """Seconds an entry stays in the Django cache"""
+    if settings.CACHE_SHARED:
+        return settings.EMBED_CACHE_TTL
+    # Each worker has its own cache, so stale entries must expire quickly
+    return min(settings.EMBED_CACHE_TTL, settings.EMBED_MEMORY_TTL)
+
+
+def get(ad_id):
+    """
+    Cached (etag, body) for `ad_id`, or MISSING. Renders and stores it on a
+    miss.
+    """
+    entry = _memory.get(ad_id)
+    if entry is not None:
+        return entry
+    entry = cache.get(_key(ad_id))
+    if entry is None:
+        entry = render(ad_id)
+        cache.set(_key(ad_id), entry, shared_ttl())
+    _memory.set(ad_id, entry)
+    return entry
+
+
+def invalidate(ad_ids):
+    """Drop the cached embeds for `ad_ids` once the current transaction commits"""
+    ad_ids = list(ad_ids)
+    if not ad_ids:
+        return
+
+    def drop():
+        _memory.discard(ad_ids)
+        cache.delete_many([_key(ad_id) for ad_id in ad_ids])
+
+    transaction.on_commit(drop)
+
+
+@receiver([post_save, post_delete], sender=Ad)
+def _ad_changed(sender, instance, **kwargs):
+    invalidate([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Media)
+def _media_changed(sender, instance, **kwargs):
+    if instance.ad_id is not None:
+        invalidate([instance.ad_id])
+
+
+@receiver(post_save, sender=Business)
+def _business_changed(sender, instance, created, **kwargs):
+    # A new business has no ads yet; a deleted one deletes its ads, which
+    # sends post_delete for each of them
+    if not created:
+        invalidate(Ad.objects.filter(business=instance).values_list('id', flat=True))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('ads', '0001_initial'),
+        ('business', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='business',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ads', to='business.business'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 
 class Ad(models.Model):
     STATUS_CHOICES = [
@@ -21,6 +22,18 @@ class Ad(models.Model):
 
     class Meta:
         db_table = 'ads'
+        indexes = [
+            # ListAds / RetrieveAd filter on status and page by created_at
+            models.Index(fields=['status', '-created_at'], name='ads_status_created_idx'),
+            # ListAds?business=... only ever reads active ads
+            models.Index(
+                fields=['business', '-created_at'],
+                name='ads_active_business_idx',
+                condition=Q(status='active'),
+            ),
+            # MyAdsView: owner plus optional status filter
+            models.Index(fields=['owner', 'status'], name='ads_owner_status_idx'),
+        ]
 
    
 
@@ -33,6 +46,8 @@ class Media(models.Model):
         choices=[('image', 'Image'), ('video', 'Video')],
         default='image'
     )
+    # width -> URL of a resized copy, filled in by ads/variants.py
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"{self.media_type}: {self.url}"
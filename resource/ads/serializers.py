@@ -1,11 +1,15 @@
 from rest_framework import serializers
+from advouch import conditional
+from users.ownership import owns_business
+from . import embed, variants
 from .models import Ad, Media
 
 
 class MediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Media
-        fields = ['id', 'url', 'media_type']
+        fields = ['id', 'url', 'media_type', 'variants']
+        read_only_fields = ['variants']
 
 
 class AdSerializer(serializers.ModelSerializer):
@@ -26,9 +30,32 @@ class AdSerializer(serializers.ModelSerializer):
             'created_at'
         ]
 
+    def validate_business(self, business):
+        request = self.context.get('request')
+        # Ads can only be placed for the requesting user's own businesses
+        if request is not None and not owns_business(request, business.id):
+            raise serializers.ValidationError('You do not own this business')
+        return business
+
     def create(self, validated_data):
         media_data = validated_data.pop('media_files', [])
         ad = Ad.objects.create(**validated_data)
-        for media in media_data:
-            Media.objects.create(ad=ad, **media)
+        created = Media.objects.bulk_create([Media(ad=ad, **media) for media in media_data])
+        if media_data:
+            variants.enqueue_media(media.id for media in created)
+            # bulk_create sends no post_save for the media
+            embed.invalidate([ad.id])
+            conditional.bump(Media)
         return ad
+
+
+class AdImportSerializer(serializers.Serializer):
+    """
+    One item of a bulk import. `business` is a plain id here; ownership is
+    checked for the whole payload at once (see ads/bulk.py).
+    """
+    title = serializers.CharField(max_length=100)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    status = serializers.ChoiceField(choices=Ad.STATUS_CHOICES, default='draft')
+    business = serializers.IntegerField()
+    media_files = MediaSerializer(many=True, required=False)
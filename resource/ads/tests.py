@@ -1,3 +1,32 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from . import embed, variants
+
+
+@override_settings(EMBED_CACHE_TTL=86400, EMBED_MEMORY_TTL=5)
+class EmbedCacheTTLTests(SimpleTestCase):
+    @override_settings(CACHE_SHARED=True)
+    def test_shared_cache_keeps_entries(self):
+        self.assertEqual(embed.shared_ttl(), 86400)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_expires_with_memory_tier(self):
+        # Other workers never see invalidate(), so their copies must expire quickly
+        self.assertEqual(embed.shared_ttl(), 5)
+
+
+class ProcessAllTests(SimpleTestCase):
+    def test_one_failure_does_not_stop_the_batch(self):
+        processed = []
+
+        def process_media(media_id):
+            if media_id == 2:
+                raise OSError('storage unavailable')
+            processed.append(media_id)
+
+        with mock.patch.object(variants, 'process_media', side_effect=process_media):
+            with self.assertLogs('ads.variants', 'ERROR'):
+                variants._process_all([1, 2, 3])
+        self.assertEqual(processed, [1, 3])
@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import (
     ListAds, CreateAd, UpdateAd, DeleteAd, MyAdsView, RetrieveAd,
-    AdEmbedView, AdEmbedCodeView, AdExportDataView
+    AdEmbedView, AdEmbedCodeView, AdExportDataView,
+    BulkExportAdsView, BulkImportAdsView, ad_pixel
 )
 
 
@@ -16,5 +17,10 @@ urlpatterns = [
     # Export endpoints
     path('ads/<int:id>/embed/', AdEmbedView.as_view(), name='ad-embed'),
     path('ads/<int:id>/embed-code/', AdEmbedCodeView.as_view(), name='ad-embed-code'),
+    path('ads/<int:id>/pixel.gif', ad_pixel, name='ad-pixel'),
     path('ads/<int:id>/export/', AdExportDataView.as_view(), name='ad-export'),
+
+    # Bulk endpoints
+    path('ads/bulk/export/', BulkExportAdsView.as_view(), name='bulk-export-ads'),
+    path('ads/bulk/import/', BulkImportAdsView.as_view(), name='bulk-import-ads'),
 ]
\ No newline at end of file
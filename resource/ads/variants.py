@@ -0,0 +1,52 @@
+"""
+Resized variants of ad and business images (see advouch/media.py).
+
+Media.url stays the original. Once processed, Media.variants maps widths to
+variant URLs and is returned by MediaSerializer and used in the embed's
+srcset. Only images the pipeline can read are processed: files in our own
+storage and URLs on MEDIA_FETCH_HOSTS. Anything else keeps empty variants.
+"""
+import logging
+
+from advouch import conditional, media as pipeline
+from . import embed
+from .models import Media
+
+
+logger = logging.getLogger(__name__)
+
+
+def process_media(media_id):
+    """Make and record the variants of one Media row"""
+    item = Media.objects.filter(pk=media_id, media_type='image').first()
+    if item is None:
+        return
+    data = pipeline.read_source(item.url)
+    if data is None:
+        return
+    try:
+        _, variants = pipeline.store_image(data)
+    except ValueError as error:
+        logger.warning("Media %s at %s: %s", media_id, item.url, error)
+        return
+    # Only if the URL is still the one that was read
+    if Media.objects.filter(pk=media_id, url=item.url).update(variants=variants):
+        if item.ad_id:
+            embed.invalidate([item.ad_id])
+        conditional.bump(Media)
+
+
+def _process_all(media_ids):
+    for media_id in media_ids:
+        # One failure (storage, a dead worker process) doesn't drop the rest
+        try:
+            process_media(media_id)
+        except Exception:
+            logger.exception("Processing media %s failed", media_id)
+
+
+def enqueue_media(media_ids):
+    """Process `media_ids` in the background after the current transaction commits"""
+    media_ids = list(media_ids)
+    if media_ids:
+        pipeline.enqueue(_process_all, media_ids)
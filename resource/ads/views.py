@@ -1,21 +1,34 @@
-from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView, RetrieveAPIView
+from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+from rest_framework import status
 from .pagination import PageNumberPagination
 from .serializers import AdSerializer
-from .models import Ad
+from .models import Ad, Media
+from . import bulk, embed
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from users.permission import IsAuthenticated, IsOwner
+from users.ownership import OwnerScopedMixin
 from users.authentication import JWTAuthentication
+from users.throttling import RateLimitThrottle
+from advouch.conditional import ConditionalGetMixin
+from advouch.fieldsets import SparseFieldsMixin
+from advouch.serialization import FastListMixin
+from advouch.views import AsyncAPIView
+from advouch.db.replicas import ReplicaReadMixin
+from interactions import impressions
 import json
 
 
 
 # GET
-class MyAdsView(ListAPIView):
+class MyAdsView(ReplicaReadMixin, ListAPIView):
     serializer_class = AdSerializer
     pagination_class = PageNumberPagination
     authentication_classes = [JWTAuthentication]
@@ -31,10 +44,13 @@ class MyAdsView(ListAPIView):
     
 
 
-class ListAds(ListAPIView):
+class ListAds(ConditionalGetMixin, SparseFieldsMixin, FastListMixin, ReplicaReadMixin, ListAPIView):
     queryset = Ad.objects.filter(status='active') #since users will only see the active ads 
+    conditional_models = [Ad, Media]
     pagination_class = PageNumberPagination
     serializer_class = AdSerializer
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'public_read'
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['owner', 'business'] 
@@ -51,7 +67,7 @@ class CreateAd(CreateAPIView):
     serializer_class = AdSerializer
 
 # PUT and PATCH
-class UpdateAd(UpdateAPIView):
+class UpdateAd(OwnerScopedMixin, UpdateAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
     
@@ -61,7 +77,7 @@ class UpdateAd(UpdateAPIView):
     
 
 # DELETE
-class DeleteAd(DestroyAPIView):
+class DeleteAd(OwnerScopedMixin, DestroyAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
 
@@ -71,27 +87,47 @@ class DeleteAd(DestroyAPIView):
 
 
 # GET - Retrieve single ad
-class RetrieveAd(RetrieveAPIView):
-    queryset = Ad.objects.filter(status='active')
+class RetrieveAd(ConditionalGetMixin, ReplicaReadMixin, AsyncAPIView):
+    queryset = Ad.objects.filter(status='active').prefetch_related('media_files')
     serializer_class = AdSerializer
-    lookup_field = 'id'
+    conditional_models = [Ad, Media]
+
+    async def get(self, request, id):
+        # Media is prefetched so serialization never touches the DB on the event loop
+        ad = await aget_object_or_404(self.queryset, id=id)
+        return Response(self.serializer_class(ad).data)
 
 
 # Ad Export Views
 class AdEmbedView(APIView):
     """
     Generate embeddable HTML for an ad with AdVouch branding
+
+    The page comes prerendered from ads/embed.py, so a cache hit does no
+    database work. Responses carry a strong ETag and revalidate to 304.
     """
     def get(self, request, id):
-        ad = get_object_or_404(Ad, id=id, status='active')
-        business = ad.business if hasattr(ad, 'business') else None
+        etag, body = embed.get(id)
+        if body is None:
+            raise Http404('No active ad with this id')
+
+        response = HttpResponse(body, content_type='text/html; charset=utf-8')
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = f'public, max-age={settings.EMBED_MAX_AGE}'
+        return get_conditional_response(request, etag=etag, response=response)
 
-        context = {
-            'ad': ad,
-            'business': business,
-        }
 
-        return render(request, 'ad_embed.html', context)
+@require_safe
+def ad_pixel(request, id):
+    """
+    Impression pixel included by the embed page; logs the impression
+    without touching the database (see interactions/impressions.py)
+    GET /api/v1/ads/{id}/pixel.gif?ref=<embedding page URL>
+    """
+    impressions.record_impression(request, id)
+    response = HttpResponse(impressions.PIXEL_GIF, content_type='image/gif')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 
 class AdEmbedCodeView(APIView):
@@ -137,40 +173,68 @@ class AdExportDataView(APIView):
 
     def get(self, request, id):
         ad = get_object_or_404(Ad, id=id, owner=request.user)
-        business = ad.business if hasattr(ad, 'business') else None
 
         # Prepare export data with AdVouch branding
-        export_data = {
-            'ad': {
-                'id': ad.id,
-                'title': ad.title,
-                'description': ad.description,
-                'status': ad.status,
-                'share_count': ad.share_count,
-                'created_at': ad.created_at.isoformat(),
-                'media_files': [
-                    {
-                        'url': media.url,
-                        'type': media.media_type
-                    } for media in ad.media_files.all()
-                ]
-            },
-            'business': {
-                'id': business.id if business else None,
-                'name': business.name if business else None,
-            } if business else None,
-            'branding': {
-                'platform': 'AdVouch',
-                'tagline': 'Verified & Trusted Advertising',
-                'website': 'https://advouch.com',
-                'badge_text': 'Advertised via AdVouch',
-            },
-            'export_info': {
+        export_data = dict(
+            bulk.ad_export_data(ad),
+            branding=bulk.BRANDING,
+            export_info={
                 'exported_at': request.META.get('HTTP_DATE', ''),
                 'format': 'json',
                 'version': '1.0'
-            }
-        }
+            },
+        )
 
         return Response(export_data)
 
+
+class BulkExportAdsView(APIView):
+    """
+    Export all of the user's ads with their media as one streamed JSON document
+    GET /api/v1/ads/bulk/export/
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'export'
+
+    def get(self, request):
+        response = StreamingHttpResponse(bulk.stream_export(request.user), content_type='application/json')
+        response['Content-Disposition'] = 'attachment; filename="advouch-ads.json"'
+        return response
+
+
+class BulkImportAdsView(APIView):
+    """
+    Create many ads at once; nothing is created unless every item is valid
+    POST /api/v1/ads/bulk/import/
+    Body: {"ads": [{"title": "...", "business": 1, "status": "draft", "media_files": [{"url": "...", "media_type": "image"}]}, ...]}
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('ads') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'error': '"ads" must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > bulk.MAX_IMPORT_ITEMS:
+            return Response(
+                {'error': f'At most {bulk.MAX_IMPORT_ITEMS} ads can be imported per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        validated, errors = bulk.validate_import(request.user, items)
+        if errors:
+            return Response({
+                'error': 'No ads were imported because some items are invalid',
+                'valid': len(validated),
+                'invalid': len(errors),
+                'errors': errors,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        ads = bulk.import_ads(request.user, validated)
+        return Response({
+            'success': True,
+            'created': len(ads),
+            'ids': [ad.id for ad in ads],
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AdvouchConfig(AppConfig):
+    name = 'advouch'
+
+    def ready(self):
+        from . import conditional
+
+        conditional.connect_signals()
@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from advouch.startup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advouch.settings')
 
 application = get_asgi_application()
+
+# Import the views now rather than on the first request (see advouch/startup.py)
+warm_up()
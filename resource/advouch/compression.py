@@ -0,0 +1,166 @@
+"""
+Negotiated response compression.
+
+compression_middleware compresses a response body when the client's
+Accept-Encoding allows it and the body is at least COMPRESSION_MIN_SIZE
+bytes. The encodings in COMPRESSION_ENCODINGS are tried in that order of
+preference; zstd and br are only offered when their libraries are installed
+(zstandard, or compression.zstd on Python 3.14+, and brotli), and gzip is
+always available. Among the encodings the client accepts, the highest
+q-value wins and ties go to the server's preference.
+
+Left alone:
+
+    - streaming responses (the interaction export compresses its own)
+    - responses that already have a Content-Encoding
+    - bodies that don't compress, such as images
+    - responses marked Cache-Control: no-transform
+
+Like Django's GZipMiddleware, gzip output carries a random-length filename
+to blunt BREACH-style length attacks, strong ETags become weak ETags and
+Vary: Accept-Encoding is added.
+"""
+import re
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+def _gzip(data):
+    return compress_string(data, max_random_bytes=100)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(data):
+    if zstd is not None:
+        return zstd.compress(data, level=settings.COMPRESSION_ZSTD_LEVEL)
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(data)
+
+
+def available_encoders():
+    """{encoding: compress function} for the encodings this process can produce"""
+    encoders = {'gzip': _gzip}
+    if brotli is not None:
+        encoders['br'] = _brotli
+    if zstd is not None or zstandard is not None:
+        encoders['zstd'] = _zstd
+    return encoders
+
+
+_COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/xml',
+    'application/xhtml+xml', 'image/svg+xml',
+}
+_CODING = re.compile(r'^\s*([A-Za-z0-9*_.+-]+)\s*(?:;\s*q\s*=\s*([0-9.]+)\s*)?$')
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return (
+        media_type.startswith('text/') or media_type in _COMPRESSIBLE_TYPES
+        or media_type.endswith(('+json', '+xml'))
+    )
+
+
+def accepted_qualities(header):
+    """{content coding: q} from an Accept-Encoding header; malformed entries are skipped"""
+    qualities = {}
+    for item in header.split(','):
+        match = _CODING.match(item)
+        if not match:
+            continue
+        coding, q = match.group(1).lower(), match.group(2)
+        try:
+            qualities[coding] = float(q) if q is not None else 1.0
+        except ValueError:
+            continue
+    return qualities
+
+
+def negotiate(header, preference):
+    """The encoding from `preference` the client accepts most, or None"""
+    qualities = accepted_qualities(header)
+    wildcard = qualities.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in preference:
+        q = qualities.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_response(request, response, encoders):
+    """Compress `response` in place if the request and the response allow it"""
+    if response.streaming or response.has_header('Content-Encoding'):
+        return response
+    if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+        return response
+    if not is_compressible(response.get('Content-Type', '')):
+        return response
+    if 'no-transform' in response.get('Cache-Control', '').lower():
+        return response
+
+    # The body depends on Accept-Encoding from here on, whatever we pick
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), encoders)
+    if encoding is None:
+        return response
+    compressed = encoders[encoding](response.content)
+    if len(compressed) >= len(response.content):
+        return response
+
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = encoding
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
+
+
+@sync_and_async_middleware
+def compression_middleware(get_response):
+    if not settings.COMPRESSION_ENABLED:
+        raise MiddlewareNotUsed
+
+    available = available_encoders()
+    # Preference order from settings, limited to what is installed
+    encoders = {
+        encoding: available[encoding]
+        for encoding in (item.strip() for item in settings.COMPRESSION_ENCODINGS.split(','))
+        if encoding in available
+    }
+    if not encoders:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return compress_response(request, await get_response(request), encoders)
+    else:
+        def middleware(request):
+            return compress_response(request, get_response(request), encoders)
+
+    return middleware
@@ -0,0 +1,150 @@
+"""
+Conditional GET for read views.
+
+Every tracked model has a version token in the Django cache, the time of
+its last committed write. Signals replace it after each save or delete;
+code that writes with bulk_create/bulk_update/update() calls bump() itself.
+
+ConditionalGetMixin derives a view's validators from the versions of the
+models it reads, the request path, the negotiated format and, for per-user
+views, the user. That is one cache get_many and no database work. A
+request whose If-None-Match / If-Modified-Since still matches is answered
+with 304 straight after authentication, permission and throttle checks,
+before the handler runs its queries or serializer.
+
+Versions are per model, not per row, so any write to an Ad gives every ad
+view a new ETag; that only costs a full response. With a per-process cache
+(the locmem default) a write would only bump the version in the worker
+that made it, and the others would keep answering 304 for changed data,
+so conditional GET is off unless CONDITIONAL_GET_ENABLED (on by default
+with CACHE_BACKEND=redis).
+With read replicas, a read that lags behind a bump is cached under the new
+ETag until the next write to that model.
+"""
+import hashlib
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+# Models whose writes change what the read views return
+VERSIONED_MODELS = [
+    'ads.Ad',
+    'ads.Media',
+    'business.Business',
+    'reputation.Reputation',
+    'users.User',
+    'users.Socials',
+]
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+def _key(label):
+    return f"version:{label}"
+
+
+def get_versions(models):
+    """
+    {label: version} for `models`. A version missing from the cache (first
+    use, eviction, flush) starts at now, which can only cause a 200 where a
+    304 was possible, never the other way round.
+    """
+    labels = [_label(model) for model in models]
+    found = cache.get_many([_key(label) for label in labels])
+    versions = {}
+    for label in labels:
+        version = found.get(_key(label))
+        if version is None:
+            cache.add(_key(label), time.time(), None)
+            version = cache.get(_key(label))
+        versions[label] = version
+    return versions
+
+
+def bump(*models):
+    """Give `models` a new version once the current transaction commits"""
+    labels = [_label(model) for model in models]
+
+    def set_versions():
+        now = time.time()
+        cache.set_many({_key(label): now for label in labels}, None)
+
+    transaction.on_commit(set_versions)
+
+
+def _model_changed(sender, **kwargs):
+    bump(sender)
+
+
+def connect_signals():
+    for label in VERSIONED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_model_changed, sender=model, dispatch_uid=f'version-save-{label}')
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=f'version-delete-{label}')
+
+
+class _Conditional(Exception):
+    """Carries a 304 (or 412) response out of initial()"""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validators and 304 responses for GET views.
+
+    conditional_models    models the response is built from
+    conditional_per_user  the response depends on request.user
+    cache_control         Cache-Control sent with 200 and 304 responses
+    """
+    conditional_models = []
+    conditional_per_user = False
+    cache_control = 'no-cache'
+
+    _validators = None
+
+    def get_validators(self, request):
+        """(etag, last_modified timestamp) for this request"""
+        versions = get_versions(self.conditional_models)
+        parts = [
+            type(self).__qualname__,
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            str(request.user.pk) if self.conditional_per_user else '',
+        ]
+        parts.extend(f'{label}={versions[label]!r}' for label in sorted(versions))
+        etag = 'W/"%s"' % hashlib.sha1('|'.join(parts).encode()).hexdigest()
+        return etag, int(max(versions.values(), default=0))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or not settings.CONDITIONAL_GET_ENABLED:
+            return
+        etag, last_modified = self._validators = self.get_validators(request)
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise _Conditional(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Conditional):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._validators and response.status_code in (200, 304):
+            etag, last_modified = self._validators
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(last_modified)
+            response.headers['Cache-Control'] = self.cache_control
+        return response
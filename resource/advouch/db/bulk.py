@@ -0,0 +1,57 @@
+"""
+Raw bulk inserts that keep every column as given.
+
+bulk_create runs pre_save, so auto_now_add fields get overwritten with the
+insert time. write_rows() is for rows that carry their own created_at
+(generated data, events loaded from a log).
+"""
+from django.db import connection, transaction
+
+
+def _copy_text(value):
+    if value is None:
+        return r'\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def write_rows(model, columns, rows, batch_size=10_000):
+    """
+    Insert `rows` (tuples in `columns` order) into `model`'s table in one
+    transaction: COPY on PostgreSQL, executemany batches elsewhere. Returns
+    the number of rows written.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_sql = ', '.join(connection.ops.quote_name(column) for column in columns)
+    written = 0
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            with cursor.cursor.copy(f"COPY {table} ({column_sql}) FROM STDIN") as copy:
+                buffer = []
+                for row in rows:
+                    buffer.append('\t'.join(map(_copy_text, row)))
+                    if len(buffer) >= batch_size:
+                        copy.write('\n'.join(buffer) + '\n')
+                        written += len(buffer)
+                        buffer = []
+                if buffer:
+                    copy.write('\n'.join(buffer) + '\n')
+                    written += len(buffer)
+        else:
+            adapt = connection.ops.adapt_datetimefield_value
+            sql = f"INSERT INTO {table} ({column_sql}) VALUES ({', '.join(['%s'] * len(columns))})"
+            batch = []
+            for row in rows:
+                batch.append(tuple(adapt(value) if hasattr(value, 'tzinfo') else value for value in row))
+                if len(batch) >= batch_size:
+                    cursor.executemany(sql, batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                written += len(batch)
+    return written
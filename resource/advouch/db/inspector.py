@@ -0,0 +1,239 @@
+"""
+Opt-in query inspection (QUERY_INSPECTOR_ENABLED=true).
+
+Every query is fingerprinted: literals and placeholders become `?` and
+IN lists collapse to `(?+)`, so the same statement with different values
+shares one fingerprint. Within a request the inspector reports:
+
+    duplicate - a fingerprint executed QUERY_INSPECTOR_DUPLICATE_THRESHOLD
+                or more times (usually an N+1 in a serializer or loop)
+    slow      - a query that took QUERY_INSPECTOR_SLOW_MS or longer
+
+Each event names the view and the innermost project frame that issued the
+query (e.g. `ads/serializers.py:41 in get_media`), skipping middleware. Queries issued by async
+views run in sync_to_async threads, where only the view name is known.
+
+Events are appended as JSON lines to QUERY_INSPECTOR_LOG_DIR/queries-<pid>.jsonl,
+one file per worker, rotated by size. Summarize them with
+`python manage.py summarize_queries`.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from importlib import import_module
+from logging.handlers import RotatingFileHandler
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from django.utils.decorators import sync_and_async_middleware
+
+
+LOG_NAME = 'queries-{pid}.jsonl'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?+)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+class RequestQueries:
+    __slots__ = ('seen', 'events')
+
+    def __init__(self):
+        self.seen = {}  # fingerprint -> [count, total_ms, sql, frame]
+        self.events = []
+
+
+_current = contextvars.ContextVar('query_inspector', default=None)
+
+_internal_files = None
+
+
+def internal_files():
+    """
+    Files whose frames never name a query's caller: advouch/db/ and the
+    modules of every middleware in settings.MIDDLEWARE, which wrap every view
+    """
+    global _internal_files
+    if _internal_files is None:
+        files = [os.path.dirname(__file__) + os.sep]
+        for path in settings.MIDDLEWARE:
+            module = import_module(path.rsplit('.', 1)[0])
+            if getattr(module, '__file__', None):
+                files.append(module.__file__)
+        _internal_files = tuple(files)
+    return _internal_files
+
+
+def _is_project_file(filename, root):
+    return (filename.startswith(root) and 'site-packages' not in filename
+            and not filename.startswith(internal_files()))
+
+
+def calling_frame():
+    """
+    Where a query came from, as 'path:line in function' for the innermost
+    frame of this project's code (middleware excluded).
+
+    Inherited DRF methods (ListAPIView.list, Serializer.to_representation)
+    run no project code, so while walking out we also note the first method
+    called on an instance of a project class, e.g.
+    'ads.serializers.AdSerializer.to_representation'. When that comes
+    before any project frame it is the more precise answer and wins.
+    """
+    root = str(settings.BASE_DIR) + os.sep
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if _is_project_file(filename, root):
+            return f"{os.path.relpath(filename, root)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        if 'self' in frame.f_code.co_varnames:
+            cls = type(frame.f_locals.get('self'))
+            module = sys.modules.get(cls.__module__)
+            if _is_project_file(getattr(module, '__file__', None) or '', root):
+                return f"{cls.__module__}.{cls.__qualname__}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+_logger = None
+
+
+def get_logger():
+    global _logger
+    if _logger is None:
+        os.makedirs(settings.QUERY_INSPECTOR_LOG_DIR, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(settings.QUERY_INSPECTOR_LOG_DIR, LOG_NAME.format(pid=os.getpid())),
+            maxBytes=settings.QUERY_INSPECTOR_LOG_MAX_BYTES,
+            backupCount=settings.QUERY_INSPECTOR_LOG_BACKUPS,
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger('advouch.queries')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _logger = logger
+    return _logger
+
+
+def write_events(events, view=None, method=None):
+    logger = get_logger()
+    now = timezone.now().isoformat()
+    for event in events:
+        logger.info(json.dumps(dict(event, time=now, view=view, method=method)))
+
+
+def _inspect_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        state = _current.get()
+        slow = elapsed_ms >= settings.QUERY_INSPECTOR_SLOW_MS
+        if state is not None or slow:
+            normalized = normalize(sql)
+            fp = fingerprint(normalized)
+            frame = None
+            if state is not None:
+                entry = state.seen.get(fp)
+                if entry is None:
+                    state.seen[fp] = [1, elapsed_ms, normalized, None]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed_ms
+                    if entry[0] == 2:
+                        # Only look up the stack once a query repeats
+                        entry[3] = frame = calling_frame()
+            if slow:
+                event = {
+                    'type': 'slow',
+                    'fingerprint': fp,
+                    'sql': normalized,
+                    'ms': round(elapsed_ms, 3),
+                    'database': context['connection'].alias,
+                    'frame': frame or calling_frame(),
+                }
+                if state is not None:
+                    state.events.append(event)
+                else:
+                    write_events([event])
+
+
+def _add_inspector(connection, **kwargs):
+    if _inspect_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _inspect_query)
+
+
+def _begin():
+    return _current.set(RequestQueries())
+
+
+def _finish(request, token):
+    state = _current.get()
+    _current.reset(token)
+
+    events = state.events
+    for fp, (count, total_ms, sql, frame) in state.seen.items():
+        if count >= settings.QUERY_INSPECTOR_DUPLICATE_THRESHOLD:
+            events.append({
+                'type': 'duplicate',
+                'fingerprint': fp,
+                'sql': sql,
+                'count': count,
+                'ms': round(total_ms, 3),
+                'frame': frame,
+            })
+    if events:
+        match = request.resolver_match
+        write_events(events, view=match.view_name if match else None, method=request.method)
+
+
+@sync_and_async_middleware
+def query_inspector_middleware(get_response):
+    if not settings.QUERY_INSPECTOR_ENABLED:
+        raise MiddlewareNotUsed
+
+    connection_created.connect(_add_inspector, dispatch_uid='advouch.db.inspector')
+    for connection in connections.all(initialized_only=True):
+        _add_inspector(connection)
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _begin()
+            try:
+                return await get_response(request)
+            finally:
+                _finish(request, token)
+    else:
+        def middleware(request):
+            token = _begin()
+            try:
+                return get_response(request)
+            finally:
+                _finish(request, token)
+
+    return middleware
@@ -0,0 +1,19 @@
+import time
+
+from django.db.backends.postgresql import base
+
+from advouch.db import stats
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Stock PostgreSQL backend that also records how many connections this
+    worker opens and how long each one took. In pool mode the timing is the
+    pool checkout, i.e. the time spent waiting for a free connection.
+    """
+
+    def get_new_connection(self, conn_params):
+        start = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        stats.record_connection(self.alias, time.perf_counter() - start)
+        return connection
@@ -0,0 +1,141 @@
+"""
+Read-replica routing.
+
+Reads are sent to a replica only when they are explicitly marked read-only:
+either the view uses ReplicaReadMixin, or the code runs inside a
+`replica_reads()` block. Everything else goes to the primary.
+
+Read-your-writes: once a request has written anything, the rest of that
+request reads from the primary. After an authenticated user's successful
+POST/PUT/PATCH/DELETE, their requests also stay on the primary for
+REPLICA_STICKY_SECONDS so they see their own changes despite replica lag.
+The stickiness marker lives in the Django cache, so use a shared cache
+(CACHE_BACKEND=redis) when running several workers.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+
+
+class RequestState:
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+_replica_block = contextvars.ContextVar('replica_block', default=False)
+
+
+def _sticky_key(user_id):
+    return f"replica:sticky:{user_id}"
+
+
+def is_pinned_to_primary(user):
+    if not settings.DATABASE_REPLICAS or not (user and user.is_authenticated):
+        return False
+    return cache.get(_sticky_key(user.pk)) is not None
+
+
+@contextmanager
+def replica_reads():
+    """
+    Send reads inside the block to a replica, for reporting/analytics code
+    that tolerates replication lag.
+    """
+    token = _replica_block.set(True)
+    try:
+        yield
+    finally:
+        _replica_block.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+
+        state = _request_state.get()
+        if state is not None and state.wrote:
+            return 'default'
+        if _replica_block.get() or (state is not None and state.use_replica):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def _record_write(request, response):
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or response.status_code >= 400:
+        return None
+    user = getattr(request, 'user', None)
+    if not (user and user.is_authenticated):
+        return None
+    return _sticky_key(user.pk)
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """
+    Gives each request its own routing state and marks the user as sticky
+    to the primary after a successful write. DRF sets request.user on the
+    underlying HttpRequest, so JWT-authenticated users are seen here too.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _request_state.set(RequestState())
+            try:
+                response = await get_response(request)
+            finally:
+                _request_state.reset(token)
+            if settings.DATABASE_REPLICAS:
+                key = _record_write(request, response)
+                if key:
+                    await cache.aset(key, 1, settings.REPLICA_STICKY_SECONDS)
+            return response
+    else:
+        def middleware(request):
+            token = _request_state.set(RequestState())
+            try:
+                response = get_response(request)
+            finally:
+                _request_state.reset(token)
+            if settings.DATABASE_REPLICAS:
+                key = _record_write(request, response)
+                if key:
+                    cache.set(key, 1, settings.REPLICA_STICKY_SECONDS)
+            return response
+
+    return middleware
+
+
+class ReplicaReadMixin:
+    """
+    For read-only DRF views: serve the request from a replica unless the
+    user wrote something within the last REPLICA_STICKY_SECONDS.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = _request_state.get()
+        if state is not None and request.method in ('GET', 'HEAD'):
+            state.use_replica = not is_pinned_to_primary(request.user)
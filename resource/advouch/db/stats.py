@@ -0,0 +1,42 @@
+"""
+Per-worker connection statistics, recorded by the advouch.db.postgresql
+backend. Every gunicorn/uvicorn worker keeps its own counters.
+"""
+import os
+import threading
+
+
+_lock = threading.Lock()
+_connections = {}
+
+
+def record_connection(alias, wait_seconds):
+    with _lock:
+        entry = _connections.setdefault(alias, {'opened': 0, 'wait_total_ms': 0.0, 'wait_max_ms': 0.0})
+        wait_ms = wait_seconds * 1000
+        entry['opened'] += 1
+        entry['wait_total_ms'] += wait_ms
+        entry['wait_max_ms'] = max(entry['wait_max_ms'], wait_ms)
+
+
+def snapshot():
+    """
+    Connection counters for this worker, plus psycopg pool stats for
+    aliases running in pool mode.
+    """
+    from django.db import connections
+
+    databases = {}
+    with _lock:
+        for alias, entry in _connections.items():
+            databases[alias] = dict(
+                entry,
+                wait_avg_ms=entry['wait_total_ms'] / entry['opened'] if entry['opened'] else 0.0,
+            )
+
+    for alias in connections:
+        pools = getattr(connections[alias], '_connection_pools', {})
+        if alias in pools:
+            databases.setdefault(alias, {})['pool'] = pools[alias].get_stats()
+
+    return {'pid': os.getpid(), 'databases': databases}
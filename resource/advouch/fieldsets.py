@@ -0,0 +1,169 @@
+"""
+Sparse fieldsets for list endpoints.
+
+    GET /api/v1/ads/?fields=id,title,media_files.url
+
+A view with SparseFieldsMixin returns only the fields named in ?fields=.
+A dotted name selects fields of a nested serializer, and a nested field
+named on its own keeps all of its fields. Unknown names are a 400. Without
+?fields= every field is returned, as before.
+
+The same selection trims the SQL. The queryset loads only the columns
+behind the returned fields (.only()), and each returned nested list over a
+reverse foreign key is prefetched with its own column list, so it costs one
+query per page instead of one per row. Serializers with fields that can't
+be mapped to columns (method fields, dotted sources) keep the queryset as
+it is. FastListMixin (advouch/serialization.py) applies the selection to its
+compiled extractor, so the fast path selects only these columns too.
+"""
+from functools import cached_property
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignKey, OneToOneField, Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+
+def parse_fields(value):
+    """
+    'id,media_files.url' -> {'id': None, 'media_files': {'url': None}}, where
+    None keeps the whole field
+    """
+    tree = {}
+    for name in value.split(','):
+        parts = [part.strip() for part in name.split('.')]
+        if not all(parts):
+            continue
+        node = tree
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                break  # already selected whole
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return tree or None
+
+
+def readable_fields(serializer):
+    return {name: field for name, field in serializer.fields.items() if not field.write_only}
+
+
+def _nested(field):
+    """The serializer behind a nested field, or None"""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+def check_fields(serializer, tree, prefix=''):
+    """Raise ParseError for names in `tree` that `serializer` doesn't return"""
+    fields = readable_fields(serializer)
+    for name, subtree in tree.items():
+        if name not in fields:
+            raise ParseError({'error': f"Unknown field '{prefix}{name}'"})
+        if subtree is not None:
+            child = _nested(fields[name])
+            if child is None:
+                raise ParseError({'error': f"'{prefix}{name}' has no fields"})
+            check_fields(child, subtree, f'{prefix}{name}.')
+
+
+def prune_serializer(serializer, tree):
+    """Drop the fields of `serializer` (a checked one) that `tree` doesn't name"""
+    for name in list(serializer.fields):
+        if name not in tree:
+            serializer.fields.pop(name)
+        elif tree[name] is not None:
+            prune_serializer(_nested(serializer.fields[name]), tree[name])
+
+
+def column_plan(model, serializer, tree=None):
+    """
+    (.only() names, [(prefetch lookup, related model, child plan)]) loading
+    what `tree`'s fields of `serializer` read; None if that can't be worked out
+    """
+    fields = readable_fields(serializer)
+    only, prefetches = [], []
+    for name, subtree in (tree or dict.fromkeys(fields)).items():
+        field = fields[name]
+        if field.source == '*' or '.' in field.source or isinstance(field, serializers.SerializerMethodField):
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+
+        child = _nested(field)
+        if child is not None:
+            if not (isinstance(field, serializers.ListSerializer)
+                    and model_field.one_to_many and model_field.auto_created):
+                return None
+            child_plan = column_plan(model_field.related_model, child, subtree)
+            if child_plan is None:
+                return None
+            # The prefetch matches children to parents by the foreign key
+            child_plan[0].append(model_field.field.name)
+            prefetches.append((field.source, model_field.related_model, child_plan))
+        elif isinstance(model_field, (ForeignKey, OneToOneField)) or not model_field.is_relation:
+            only.append(field.source)
+        else:
+            return None
+    return only, prefetches
+
+
+def apply_plan(queryset, plan):
+    only, prefetches = plan
+    queryset = queryset.only(*only)
+    seen = {
+        lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+        for lookup in queryset._prefetch_related_lookups
+    }
+    for lookup, related_model, child_plan in prefetches:
+        # A prefetch the view set up itself wins
+        if lookup not in seen:
+            child_queryset = related_model._default_manager.all()
+            if not related_model._meta.ordering:
+                # Same order as FastListMixin's nested lists
+                child_queryset = child_queryset.order_by('pk')
+            child_queryset = apply_plan(child_queryset, child_plan)
+            queryset = queryset.prefetch_related(Prefetch(lookup, queryset=child_queryset))
+    return queryset
+
+
+def _key(tree):
+    return None if tree is None else tuple(sorted((name, _key(subtree)) for name, subtree in tree.items()))
+
+
+class SparseFieldsMixin:
+    """
+    For GenericAPIView subclasses: ?fields= picks the fields to return, and
+    the queryset loads only what they read
+    """
+    sparse_fields_param = 'fields'
+
+    _plans = {}
+
+    @cached_property
+    def sparse_fields(self):
+        """The parsed, checked ?fields= tree, or None for all fields"""
+        tree = parse_fields(self.request.query_params.get(self.sparse_fields_param, ''))
+        if tree is not None:
+            check_fields(self.get_serializer_class()(), tree)
+        return tree
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        key = (serializer_class, queryset.model, _key(self.sparse_fields))
+        if key not in SparseFieldsMixin._plans:
+            SparseFieldsMixin._plans[key] = column_plan(queryset.model, serializer_class(), self.sparse_fields)
+        plan = SparseFieldsMixin._plans[key]
+        return queryset if plan is None else apply_plan(queryset, plan)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fields is not None:
+            prune_serializer(_nested(serializer), self.sparse_fields)
+        return serializer
@@ -0,0 +1,118 @@
+"""
+EXPLAIN the queryset of every list view in the URLconf and report
+sequential scans.
+
+    python manage.py check_query_plans
+    python manage.py check_query_plans --view list-ads --verbose-plans
+
+For each ListAPIView the command explains the first page of the default
+queryset, then one variant per filterset field (using a value taken from
+the data) and per ordering field. On PostgreSQL sequential scans are
+disabled for the session first, so a Seq Scan that remains in the plan
+means no index can serve that query shape. On small tables that is the
+only reliable signal, because the planner prefers seq scans anyway.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.generics import ListAPIView
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # SQLite reports full scans as "SCAN <table>" and index use as "SEARCH"
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)'),
+}
+
+
+def iter_list_views(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_list_views(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None and issubclass(view_class, ListAPIView):
+                yield pattern.name, prefix + str(pattern.pattern), view_class, pattern.pattern.converters
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on each list view queryset and report sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', action='append', help='Only check the URL name(s) given')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan for every query')
+        parser.add_argument('--allow-seqscan', action='store_true', help='Do not disable seq scans on PostgreSQL')
+        parser.add_argument('--fail-on-seq-scan', action='store_true', help='Exit with an error if any seq scan is found')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user = User.objects.order_by('pk').first() or AnonymousUser()
+        factory = APIRequestFactory()
+
+        findings = 0
+        for name, route, view_class, converters in iter_list_views(get_resolver().url_patterns):
+            if options['view'] and name not in options['view']:
+                continue
+
+            view = view_class()
+            view.request = Request(factory.get('/' + route))
+            view.request.user = user
+            view.format_kwarg = None
+            # Path parameters (e.g. <int:ad_id>) only need a plausible value
+            view.kwargs = {kwarg: 1 for kwarg in converters}
+            view.args = ()
+
+            queryset = view.filter_queryset(view.get_queryset())
+            page_size = getattr(view.paginator, 'page_size', None) or 20
+
+            shapes = [('default', queryset)]
+            for field in getattr(view, 'filterset_fields', None) or []:
+                sample = queryset.values_list(field, flat=True).first()
+                if sample is not None:
+                    shapes.append((f'filter {field}', queryset.filter(**{field: sample})))
+            for field in getattr(view, 'ordering_fields', None) or []:
+                if field != '__all__':
+                    shapes.append((f'order -{field}', queryset.order_by(f'-{field}')))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({view_class.__name__}) /{route}"))
+            for label, shape in shapes:
+                scans = self.seq_scans(shape[:page_size], options)
+                findings += bool(scans)
+                if scans:
+                    self.stdout.write(self.style.WARNING(f"  {label:<28} seq scan on {', '.join(sorted(set(scans)))}"))
+                else:
+                    self.stdout.write(f"  {label:<28} ok")
+
+        if findings:
+            message = f"{findings} query shape(s) fall back to sequential scans"
+            if options['fail_on_seq_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('All list view queries are index-backed'))
+
+    def seq_scans(self, queryset, options):
+        connection = connections[queryset.db]
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Don't know how to read {connection.vendor} query plans")
+
+        if connection.vendor == 'postgresql' and not options['allow_seqscan']:
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        try:
+            plan = queryset.explain()
+        finally:
+            if connection.vendor == 'postgresql' and not options['allow_seqscan']:
+                with connection.cursor() as cursor:
+                    cursor.execute('RESET enable_seqscan')
+
+        if options['verbose_plans']:
+            self.stdout.write(plan)
+        return pattern.findall(plan)
@@ -0,0 +1,48 @@
+"""
+Make variants for images that don't have them yet (see advouch/media.py).
+
+    python manage.py process_media
+    python manage.py process_media --all
+
+Picks up Media rows whose image the pipeline can read (in our storage or
+on MEDIA_FETCH_HOSTS) and users with a profile picture, skipping those that
+already have variants unless --all is given. Background jobs are lost when
+a web process exits, so run this after deploys or periodically from cron.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ads.models import Media
+from ads.variants import process_media
+from users.models import User
+from users.pictures import process_picture
+
+
+class Command(BaseCommand):
+    help = 'Make resized variants for media and profile pictures that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Redo images that already have variants')
+
+    def handle(self, *args, **options):
+        readable = Q(url__startswith=settings.MEDIA_URL)
+        for host in settings.MEDIA_FETCH_HOSTS:
+            readable |= Q(url__startswith=f'https://{host}/')
+        media = Media.objects.filter(readable, media_type='image')
+        users = User.objects.exclude(profile_picture='').exclude(profile_picture=None)
+        if not options['all']:
+            media = media.filter(variants={})
+            users = users.filter(picture_variants={})
+
+        failed = 0
+        jobs = [(process_media, media_id) for media_id in media.order_by('id').values_list('id', flat=True)]
+        jobs += [(process_picture, user_id) for user_id in users.order_by('id').values_list('id', flat=True)]
+        for job, object_id in jobs:
+            try:
+                job(object_id)
+            except Exception as error:  # e.g. a fetch that timed out; the rest still run
+                failed += 1
+                self.stderr.write(f"{job.__name__}({object_id}): {error}")
+
+        self.stdout.write(f"Processed {len(jobs) - failed} images, {failed} failed")
@@ -0,0 +1,94 @@
+"""
+Summarize the query inspector logs (advouch/db/inspector.py).
+
+    python manage.py summarize_queries
+    python manage.py summarize_queries --type duplicate --top 10 --hours 24
+
+Events are grouped by fingerprint and ranked by the total time they cost:
+for duplicates that is the time of all repeated executions, for slow
+queries the sum of their durations.
+"""
+import glob
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = 'Show the slowest and most duplicated queries recorded by the query inspector'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log-dir', default=None, help='Defaults to QUERY_INSPECTOR_LOG_DIR')
+        parser.add_argument('--type', choices=['slow', 'duplicate'], help='Only one kind of event')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--hours', type=float, help='Only events from the last N hours')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        log_dir = options['log_dir'] or settings.QUERY_INSPECTOR_LOG_DIR
+        paths = glob.glob(os.path.join(str(log_dir), 'queries-*.jsonl*'))
+        if not paths:
+            raise CommandError(f"No query inspector logs in {log_dir}")
+
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] else None
+
+        groups = {}
+        for path in paths:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue  # partially written line
+                    if options['type'] and event['type'] != options['type']:
+                        continue
+                    if since and parse_datetime(event['time']) < since:
+                        continue
+
+                    group = groups.setdefault((event['type'], event['fingerprint']), {
+                        'type': event['type'],
+                        'fingerprint': event['fingerprint'],
+                        'sql': event['sql'],
+                        'events': 0,
+                        'executions': 0,
+                        'total_ms': 0.0,
+                        'max_ms': 0.0,
+                        'views': {},
+                        'frames': {},
+                    })
+                    group['events'] += 1
+                    group['executions'] += event.get('count', 1)
+                    group['total_ms'] += event['ms']
+                    group['max_ms'] = max(group['max_ms'], event['ms'])
+                    for key, value in (('views', event.get('view')), ('frames', event.get('frame'))):
+                        if value:
+                            group[key][value] = group[key].get(value, 0) + 1
+
+        ranked = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)[:options['top']]
+        for group in ranked:
+            for key in ('views', 'frames'):
+                group[key] = sorted(group[key], key=group[key].get, reverse=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(ranked, indent=2))
+            return
+
+        if not ranked:
+            self.stdout.write('No matching events')
+            return
+
+        for group in ranked:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"[{group['type']}] {group['fingerprint']}  {group['total_ms']:.1f}ms total, "
+                f"{group['events']} requests, {group['executions']} executions, max {group['max_ms']:.1f}ms"
+            ))
+            self.stdout.write(f"  {group['sql'][:300]}")
+            if group['views']:
+                self.stdout.write(f"  views:  {', '.join(group['views'][:5])}")
+            if group['frames']:
+                self.stdout.write(f"  frames: {', '.join(group['frames'][:3])}")
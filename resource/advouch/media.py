@@ -0,0 +1,272 @@
+"""
+Image pipeline: content-addressed originals and resized variants.
+
+An image is stored once, under the SHA-256 of the bytes it arrived as:
+
+    originals/<hash[:2]>/<hash>.<ext>
+    variants/<hash[:2]>/<hash>/<width>.jpg
+
+Uploading the same bytes again reuses both the original and the variants.
+A variant is made for each width in MEDIA_VARIANT_WIDTHS that is narrower
+than the image. Variants are progressive JPEGs with EXIF rotation applied
+and transparency flattened onto white. Rows keep them as a JSON object of
+width -> URL, e.g. {"160": "/media/variants/ab/ab12.../160.jpg"}.
+
+Decoding and resizing run in a pool of MEDIA_PROCESSES worker processes, so
+large images neither hold the GIL nor block requests. With
+MEDIA_PROCESSES=0 they run in the calling thread instead. The workers only
+run render_variants(), which uses Pillow and nothing from Django.
+
+Jobs go through `enqueue()`. They start after the current transaction
+commits, in one background thread per web process, and are lost if the
+process exits first. `manage.py process_media` finds rows that still have
+no variants and processes them, so run it after deploys or from cron.
+"""
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit
+from urllib.request import HTTPRedirectHandler, build_opener
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Pillow format -> extension of the stored original
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+# JPEG quality of originals re-encoded to fit max_side
+ORIGINAL_QUALITY = 90
+
+
+def render_variants(data, widths, quality, max_side=None):
+    """
+    (Pillow format, bounded, {width: JPEG bytes}) for image `data`, one
+    variant per width narrower than the image. With `max_side`, an image
+    larger than that on either side is scaled down to fit and `bounded` is
+    its re-encoded JPEG, which replaces the original; otherwise `bounded` is
+    None. Runs in the worker processes. Raises ValueError for data that
+    isn't an image of a supported format.
+    """
+    from PIL import Image, ImageOps
+
+    with warnings.catch_warnings():
+        # Images over Image.MAX_IMAGE_PIXELS are refused, not just warned about
+        warnings.simplefilter('error', Image.DecompressionBombWarning)
+        try:
+            image = Image.open(io.BytesIO(data))
+            image_format = image.format
+            if image_format not in EXTENSIONS:
+                raise ValueError(f"unsupported image format {image_format}")
+            # JPEGs can be decoded straight at a reduced scale
+            target = max([*widths, max_side or 0])
+            image.draft('RGB', (target, target))
+            image = ImageOps.exif_transpose(image)
+        except (OSError, SyntaxError, Image.DecompressionBombError, Image.DecompressionBombWarning) as error:
+            raise ValueError(f"not a readable image: {error}") from error
+
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    bounded = None
+    if max_side and max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=ORIGINAL_QUALITY, optimize=True, progressive=True)
+        bounded = out.getvalue()
+
+    variants = {}
+    # Widest first, each one resized from the previous to save work
+    for width in sorted(set(widths), reverse=True):
+        if width >= image.width:
+            continue
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=quality, optimize=True, progressive=True)
+        variants[width] = out.getvalue()
+    return image_format, bounded, variants
+
+
+def _store(name, data):
+    """Save `data` as `name` unless that file exists already; the stored name"""
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, ContentFile(data))
+
+
+class MediaPipeline:
+    """
+    The background thread and worker processes of one web process. Both are
+    created on first use, and again after a fork. The worker processes are
+    also replaced if one of them dies (e.g. OOM-killed on a huge image).
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._pool = None
+
+    def _executors(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix='media')
+                self._pool = None
+                self._pid = os.getpid()
+            if self._pool is None and self.processes:
+                # spawn, not fork: the parent has threads and open connections
+                self._pool = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._queue, self._pool
+
+    def _discard_pool(self, broken):
+        """Drop a pool whose worker died, so the next call starts a new one"""
+        with self._lock:
+            # Unless another thread has replaced it already
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False)
+
+    def render(self, data, max_side=None):
+        args = (data, settings.MEDIA_VARIANT_WIDTHS, settings.MEDIA_VARIANT_QUALITY, max_side)
+        for attempt in range(2):
+            _, pool = self._executors()
+            if pool is None:
+                return render_variants(*args)
+            try:
+                return pool.submit(render_variants, *args).result()
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                # Retried once; an image that kills a fresh worker too is an error
+                if attempt:
+                    raise
+                logger.warning("A media worker process died, starting a new pool")
+
+    def submit(self, job, *args):
+        queue, _ = self._executors()
+        return queue.submit(self._run, job, *args)
+
+    @staticmethod
+    def _run(job, *args):
+        try:
+            return job(*args)
+        except Exception:
+            logger.exception("Media job %s%r failed", job.__name__, args)
+        finally:
+            # The thread keeps no connection between jobs
+            connections.close_all()
+
+
+_pipeline = None
+
+
+def get_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = MediaPipeline(settings.MEDIA_PROCESSES)
+    return _pipeline
+
+
+def enqueue(job, *args):
+    """Run job(*args) in the background once the current transaction commits"""
+    transaction.on_commit(lambda: get_pipeline().submit(job, *args))
+
+
+def original_prefix(digest):
+    """Storage name of the original for `digest`, up to the extension"""
+    return f"originals/{digest[:2]}/{digest}."
+
+
+def store_image(data, digest=None, max_side=None):
+    """
+    Store image bytes content-addressed and make their variants. `digest`
+    is the SHA-256 hex of `data`, if the caller has it already. With
+    `max_side`, larger images are stored scaled down (see render_variants),
+    still under the digest of the bytes given.
+    Returns (name of the original in storage, {str(width): variant URL}).
+    Raises ValueError if `data` isn't a supported image.
+    """
+    digest = digest or hashlib.sha256(data).hexdigest()
+    image_format, bounded, variants = get_pipeline().render(data, max_side)
+    if bounded is None:
+        original = _store(original_prefix(digest) + EXTENSIONS[image_format], data)
+    else:
+        original = _store(original_prefix(digest) + 'jpg', bounded)
+    urls = {}
+    for width, variant in sorted(variants.items()):
+        name = _store(f"variants/{digest[:2]}/{digest}/{width}.jpg", variant)
+        urls[str(width)] = default_storage.url(name)
+    return original, urls
+
+
+def _allowed_url(url):
+    parts = urlsplit(url)
+    return parts.scheme == 'https' and parts.hostname in settings.MEDIA_FETCH_HOSTS
+
+
+class _DisallowedRedirect(Exception):
+    pass
+
+
+class _CheckedRedirectHandler(HTTPRedirectHandler):
+    """Follows a redirect only to another https URL on MEDIA_FETCH_HOSTS"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not _allowed_url(newurl):
+            fp.close()
+            raise _DisallowedRedirect(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = build_opener(_CheckedRedirectHandler)
+
+
+def read_source(url):
+    """
+    Bytes of the image at `url`, if it is in our storage (under MEDIA_URL)
+    or on a host listed in MEDIA_FETCH_HOSTS; None otherwise. Redirects are
+    only followed to listed hosts, over https. At most MEDIA_MAX_BYTES are
+    read. None too if the file or fetch fails (missing file, HTTP error,
+    timeout).
+    """
+    limit = settings.MEDIA_MAX_BYTES
+    if url.startswith(settings.MEDIA_URL):
+        name = url[len(settings.MEDIA_URL):]
+        try:
+            if not default_storage.exists(name) or default_storage.size(name) > limit:
+                return None
+            with default_storage.open(name, 'rb') as source:
+                return source.read()
+        except (OSError, SuspiciousFileOperation) as error:
+            logger.warning("Can't read %s from storage: %s", url, error)
+            return None
+
+    if not _allowed_url(url):
+        return None
+    try:
+        with _opener.open(url, timeout=settings.MEDIA_FETCH_TIMEOUT) as response:
+            data = response.read(limit + 1)
+    except _DisallowedRedirect:
+        return None
+    except OSError as error:  # URLError, HTTPError, timeouts
+        logger.warning("Can't fetch %s: %s", url, error)
+        return None
+    return data if len(data) <= limit else None
@@ -0,0 +1,311 @@
+"""
+Per-view request metrics in the Prometheus text format.
+
+metrics_middleware counts every request. For a sampled fraction of them
+(METRICS_SAMPLE_RATE) it also records, per resolved URL name:
+
+    - total time in Django (all middleware and the view)
+    - number of database queries and time spent executing them
+    - time spent in DRF serializers' `.data`, minus any queries they ran
+
+The figures go into fixed-size histograms and are served at /metrics (only
+once METRICS_TOKEN or METRICS_ALLOWED_NETWORKS is set),
+together with the connection counters from advouch.db.stats. Everything is
+kept per worker process, so scrape each worker or sum across them.
+"""
+import bisect
+import contextvars
+import math
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.decorators import sync_and_async_middleware
+
+from advouch.db import stats as db_stats
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def log_buckets(lowest, highest, sub_buckets):
+    """
+    Bucket upper bounds in the style of an HDR histogram: every power of two
+    between `lowest` and `highest` is split into `sub_buckets` buckets of
+    equal ratio, so the relative error is the same at every magnitude.
+    """
+    low_exp = math.floor(math.log2(lowest))
+    high_exp = math.ceil(math.log2(highest))
+    return [
+        2 ** (exp + step / sub_buckets)
+        for exp in range(low_exp, high_exp)
+        for step in range(sub_buckets)
+    ] + [2.0 ** high_exp]
+
+
+# ~120us to ~64s, four buckets per doubling
+SECONDS_BUCKETS = log_buckets(0.0001, 60, 4)
+# 1, 2, 4 ... 1024 queries
+QUERY_BUCKETS = log_buckets(1, 1000, 1)
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the extra bucket is +Inf
+        self.sum = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def copy(self):
+        clone = Histogram(self.bounds)
+        clone.counts = list(self.counts)
+        clone.sum = self.sum
+        return clone
+
+
+HISTOGRAMS = (
+    # (attribute, metric name, help, bounds)
+    ('duration', 'advouch_http_request_duration_seconds', 'Time spent handling the request', SECONDS_BUCKETS),
+    ('db_time', 'advouch_http_request_db_seconds', 'Time spent executing database queries', SECONDS_BUCKETS),
+    ('db_queries', 'advouch_http_request_db_queries', 'Database queries per request', QUERY_BUCKETS),
+    ('serializer_time', 'advouch_http_request_serializer_seconds', 'Time spent in serializers, excluding queries', SECONDS_BUCKETS),
+)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}  # (view, method, status) -> count
+        self._histograms = {}  # (view, method) -> {attribute: Histogram}
+
+    def count(self, view, method, status):
+        key = (view, method, f'{status // 100}xx')
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def observe(self, view, method, values):
+        with self._lock:
+            histograms = self._histograms.get((view, method))
+            if histograms is None:
+                histograms = self._histograms[(view, method)] = {
+                    attribute: Histogram(bounds) for attribute, _, _, bounds in HISTOGRAMS
+                }
+            for attribute, value in values.items():
+                histograms[attribute].record(value)
+
+    def snapshot(self):
+        with self._lock:
+            requests = dict(self._requests)
+            histograms = {
+                key: {attribute: histogram.copy() for attribute, histogram in entry.items()}
+                for key, entry in self._histograms.items()
+            }
+        return requests, histograms
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'in_serializer')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.in_serializer = False
+
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+def _time_query(execute, sql, params, many, context):
+    state = _current.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        state.db_time += time.perf_counter() - start
+        state.queries += 1
+
+
+def _add_query_timer(connection, **kwargs):
+    # Insert first so it survives connection.execute_wrapper() blocks, which
+    # pop the last wrapper on exit.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def _timed_data(original):
+    def data(self):
+        state = _current.get()
+        if state is None or state.in_serializer:
+            return original(self)
+        state.in_serializer = True
+        db_before = state.db_time
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            elapsed = time.perf_counter() - start
+            state.serializer_time += elapsed - (state.db_time - db_before)
+            state.in_serializer = False
+
+    data.timed = True
+    return data
+
+
+def install():
+    """
+    Hook query and serializer timing in. Connections are thread-local, so
+    the query timer is attached to every connection as it is opened (and to
+    the ones already open); the per-request state it writes to is a context
+    variable, which follows the request into sync_to_async threads.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(_add_query_timer, dispatch_uid='advouch.metrics')
+    for connection in connections.all(initialized_only=True):
+        _add_query_timer(connection)
+
+    # Serializer.data and ListSerializer.data both go through BaseSerializer.data
+    if not getattr(BaseSerializer.data.fget, 'timed', False):
+        BaseSerializer.data = property(_timed_data(BaseSerializer.data.fget))
+
+
+def _begin():
+    rate = settings.METRICS_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return None, None
+    state = RequestMetrics()
+    return state, _current.set(state)
+
+
+def _finish(request, response, state, start):
+    duration = time.perf_counter() - start
+    match = request.resolver_match
+    if match is None:
+        view = '<unresolved>'
+    elif match.url_name == 'metrics':
+        return
+    else:
+        view = match.view_name
+
+    registry.count(view, request.method, response.status_code)
+    if state is not None:
+        registry.observe(view, request.method, {
+            'duration': duration,
+            'db_time': state.db_time,
+            'db_queries': state.queries,
+            'serializer_time': state.serializer_time,
+        })
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Keep this first in MIDDLEWARE so the timings cover the whole stack.
+    """
+    install()
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            start = time.perf_counter()
+            state, token = _begin()
+            try:
+                response = await get_response(request)
+            finally:
+                if token is not None:
+                    _current.reset(token)
+            _finish(request, response, state, start)
+            return response
+    else:
+        def middleware(request):
+            start = time.perf_counter()
+            state, token = _begin()
+            try:
+                response = get_response(request)
+            finally:
+                if token is not None:
+                    _current.reset(token)
+            _finish(request, response, state, start)
+            return response
+
+    return middleware
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _number(value):
+    return f'{value:.6g}' if isinstance(value, float) else str(value)
+
+
+def _family(lines, name, kind, help_text):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def render():
+    """
+    All metrics for this worker in the Prometheus text exposition format.
+    """
+    requests, histograms = registry.snapshot()
+    lines = []
+
+    _family(lines, 'advouch_metrics_sample_rate', 'gauge', 'Fraction of requests with detailed timings')
+    lines.append(f'advouch_metrics_sample_rate {_number(float(settings.METRICS_SAMPLE_RATE))}')
+
+    _family(lines, 'advouch_http_requests_total', 'counter', 'Requests handled, by view')
+    for (view, method, status), count in sorted(requests.items()):
+        lines.append(f'advouch_http_requests_total{_labels(view=view, method=method, status=status)} {count}')
+
+    for attribute, name, help_text, bounds in HISTOGRAMS:
+        _family(lines, name, 'histogram', help_text + ' (sampled requests)')
+        for (view, method), entry in sorted(histograms.items()):
+            histogram = entry[attribute]
+            cumulative = 0
+            for bound, count in zip(bounds + [None], histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound is None else _number(float(bound))
+                lines.append(f'{name}_bucket{_labels(view=view, method=method, le=le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(view=view, method=method)} {_number(float(histogram.sum))}')
+            lines.append(f'{name}_count{_labels(view=view, method=method)} {cumulative}')
+
+    databases = db_stats.snapshot()['databases']
+    connection_families = (
+        ('opened', 'advouch_db_connections_opened_total', 'counter', 'Database connections opened', 1),
+        ('wait_total_ms', 'advouch_db_connection_wait_seconds_total', 'counter', 'Time spent opening connections', 0.001),
+        ('wait_max_ms', 'advouch_db_connection_wait_seconds_max', 'gauge', 'Slowest connection open', 0.001),
+    )
+    for key, name, kind, help_text, scale in connection_families:
+        _family(lines, name, kind, help_text)
+        for alias, entry in sorted(databases.items()):
+            if key in entry:
+                lines.append(f'{name}{_labels(alias=alias)} {_number(entry[key] * scale)}')
+
+    pool_stats = {}
+    for alias, entry in databases.items():
+        for key, value in entry.get('pool', {}).items():
+            pool_stats.setdefault(key.removeprefix('pool_'), []).append((alias, value))
+    for key, values in sorted(pool_stats.items()):
+        name = f'advouch_db_pool_{key}'
+        _family(lines, name, 'gauge', f'psycopg pool statistic {key}')
+        for alias, value in sorted(values):
+            lines.append(f'{name}{_labels(alias=alias)} {_number(value)}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,232 @@
+"""
+Fast path for high-volume, read-only list endpoints.
+
+A view opts in with FastListMixin. Its serializer is compiled once into a
+flat extractor: the ORM paths to select with .values(), plus one converter
+per field. A page is then built from plain row dicts, with no model
+instances and no per-field get_attribute() calls. Nested many=True
+serializers over a reverse foreign key (Ad.media_files) become one extra
+.values() query per page, ordered by primary key. Each field still goes
+through its own to_representation(), except where the database value is
+already the representation (ints, strings, booleans, primary keys), so the
+output matches the serializer's.
+
+Serializers the extractor can't reproduce exactly make the view fall back
+to the normal path: method fields, source='*', file/image fields (they need
+the request), forward relations other than primary keys, and nested
+serializers other than a reverse foreign key.
+
+FastJSONRenderer writes the same bytes as DRF's JSONRenderer using orjson,
+falling back to json when orjson isn't installed, when indentation is
+requested, or when orjson can't encode the data.
+
+FAST_SERIALIZATION=false turns both off. `python -m benchmarks.serialization`
+checks that both paths produce identical bytes and times them.
+
+Views that also have SparseFieldsMixin get ?fields= here too: the extractor
+is narrowed to the requested fields, so .values() selects only their columns.
+"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignKey, OneToOneField
+from rest_framework import fields as drf_fields, relations, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer output, produced by orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not settings.FAST_SERIALIZATION or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                # Dates go through DRF's encoder, which formats UTC as 'Z'
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, so the output is a strict JavaScript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class NotCompilable(Exception):
+    pass
+
+
+# (serializer field, model field types) pairs where the value read from the
+# database already is the representation
+_IDENTITY = [
+    (drf_fields.IntegerField, {
+        'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField',
+        'SmallIntegerField', 'PositiveIntegerField', 'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+    }),
+    (drf_fields.CharField, {'CharField', 'TextField', 'SlugField', 'EmailField', 'URLField', 'GenericIPAddressField'}),
+    (drf_fields.BooleanField, {'BooleanField'}),
+]
+
+
+def _converter(field, model_field):
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return field.pk_field.to_representation if field.pk_field is not None else None
+    if isinstance(field, (
+        relations.RelatedField, relations.ManyRelatedField, drf_fields.FileField,
+        drf_fields.SerializerMethodField, drf_fields.HiddenField, serializers.BaseSerializer,
+    )):
+        raise NotCompilable(f"{field.field_name}: {type(field).__name__}")
+    for field_class, model_types in _IDENTITY:
+        if isinstance(field, field_class) and type(field).to_representation is field_class.to_representation \
+                and model_field.get_internal_type() in model_types:
+            return None
+    return field.to_representation
+
+
+class Extractor:
+    """
+    Builds serializer output from .values() rows.
+
+    columns   [(output name, values() path, converter or None)]
+    nested    [(output name, related model, fk attname, child Extractor)]
+    """
+
+    def __init__(self, model, columns, nested):
+        self.model = model
+        self.columns = columns
+        self.nested = nested
+        paths = [path for _, path, _ in columns]
+        if nested:
+            paths.insert(0, 'pk')
+        self.paths = list(dict.fromkeys(paths))
+
+    def rows(self, rows):
+        """Serialized dicts for `rows` (from queryset.values(*self.paths))"""
+        children = [self._children(model, fk, child, rows) for _, model, fk, child in self.nested]
+        output = []
+        for row in rows:
+            item = {}
+            for name, path, convert in self.columns:
+                value = row[path]
+                item[name] = value if convert is None or value is None else convert(value)
+            for (name, _, _, _), by_parent in zip(self.nested, children):
+                item[name] = by_parent.get(row['pk'], [])
+            output.append(item)
+        return output
+
+    def select(self, tree):
+        """
+        Extractor for the fields named in a sparse fieldset tree (see
+        advouch/fieldsets.py); None in the tree keeps a nested field whole
+        """
+        return Extractor(
+            self.model,
+            [column for column in self.columns if column[0] in tree],
+            [
+                (name, model, fk, child if tree[name] is None else child.select(tree[name]))
+                for name, model, fk, child in self.nested if name in tree
+            ],
+        )
+
+    @staticmethod
+    def _children(model, fk, child, rows):
+        parents = [row['pk'] for row in rows]
+        by_parent = {}
+        if not parents:
+            return by_parent
+        queryset = model._default_manager.filter(**{f'{fk}__in': parents}).order_by('pk')
+        child_rows = list(queryset.values(*dict.fromkeys([fk, *child.paths])))
+        for row, item in zip(child_rows, child.rows(child_rows)):
+            by_parent.setdefault(row[fk], []).append(item)
+        return by_parent
+
+
+def compile_serializer(serializer_class):
+    """Extractor for a ModelSerializer class; raises NotCompilable if unsupported"""
+    if not issubclass(serializer_class, serializers.ModelSerializer):
+        raise NotCompilable(f"{serializer_class.__name__} is not a ModelSerializer")
+    model = serializer_class.Meta.model
+    columns, nested = [], []
+
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            raise NotCompilable(f"{name}: source {field.source!r}")
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise NotCompilable(f"{name}: {field.source!r} is not a model field")
+
+        if isinstance(field, serializers.ListSerializer):
+            relation = model_field
+            if not (relation.one_to_many and relation.auto_created):
+                raise NotCompilable(f"{name}: only reverse foreign keys can be nested")
+            child = compile_serializer(type(field.child))
+            nested.append((name, relation.related_model, relation.field.attname, child))
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            raise NotCompilable(f"{name}: nested {type(field).__name__}")
+
+        if isinstance(model_field, (ForeignKey, OneToOneField)):
+            path = model_field.attname
+        elif model_field.is_relation:
+            raise NotCompilable(f"{name}: {type(model_field).__name__}")
+        else:
+            path = 'pk' if model_field.primary_key else field.source
+        columns.append((name, path, _converter(field, model_field)))
+
+    return Extractor(model, columns, nested)
+
+
+class FastListMixin:
+    """
+    For ListAPIView subclasses: serve list() from compiled .values() rows
+    and render with orjson. Falls back to the normal path if the serializer
+    can't be compiled.
+    """
+    fast_serialization = True
+
+    renderer_classes = [
+        FastJSONRenderer if renderer is JSONRenderer else renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+
+    _extractors = {}
+
+    @classmethod
+    def get_extractor(cls):
+        serializer_class = cls.serializer_class
+        if serializer_class not in FastListMixin._extractors:
+            try:
+                FastListMixin._extractors[serializer_class] = compile_serializer(serializer_class)
+            except NotCompilable:
+                FastListMixin._extractors[serializer_class] = None
+        return FastListMixin._extractors[serializer_class]
+
+    def list(self, request, *args, **kwargs):
+        extractor = self.get_extractor() if self.fast_serialization and settings.FAST_SERIALIZATION else None
+        if extractor is None:
+            return super().list(request, *args, **kwargs)
+        # ?fields= from SparseFieldsMixin, when the view has it
+        fields = getattr(self, 'sparse_fields', None)
+        if fields is not None:
+            extractor = extractor.select(fields)
+
+        # Nested lists are loaded by the extractor, so drop any prefetches
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*extractor.paths)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(extractor.rows(list(page)))
+        return Response(extractor.rows(list(queryset)))
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import ipaddress
 import os
 from pathlib import Path
 
@@ -48,15 +49,20 @@ INSTALLED_APPS = [
     'users',
     'offer',
     'application',
+    'advouch',  # project-wide management commands
 ]
 
 MIDDLEWARE = [
+    'advouch.metrics.metrics_middleware',
+    'advouch.db.inspector.query_inspector_middleware',
+    'advouch.compression.compression_middleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'advouch.db.replicas.replica_routing_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -112,17 +118,86 @@ WSGI_APPLICATION = 'advouch.wsgi.application'
 # }
 
 
+# Connection management, selected with DB_CONN_MODE:
+#   persistent - each worker keeps its connection open for DB_CONN_MAX_AGE
+#                seconds, health-checked before reuse (default)
+#   pool       - psycopg 3 connection pool per worker (DB_POOL_MIN_SIZE,
+#                DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT)
+#   pgbouncer  - DB_HOST points at a pgbouncer in transaction pooling mode;
+#                server-side cursors are disabled since they can't span
+#                pgbouncer transactions
+# Under ASGI, connections are per request thread, so persistent connections
+# default to off there; use pool or pgbouncer instead.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+DB_CONN_MODE = os.getenv('DB_CONN_MODE', 'persistent')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Stock postgresql backend plus per-worker connection stats (advouch/db)
+        'ENGINE': 'advouch.db.postgresql',
         'NAME': os.getenv('DB_NAME', 'postgres'),
         'USER': os.getenv('DB_USER', 'postgres'),
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'db'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0' if SERVER_MODE == 'asgi' else '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+        'OPTIONS': {},
     }
 }
 
+if DB_CONN_MODE == 'pool':
+    # Pooled connections are returned to the pool after each request
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    }
+elif DB_CONN_MODE == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replicas (advouch/db/replicas.py)
+# DB_REPLICA_HOSTS is a comma-separated list of hosts sharing the primary's
+# credentials; each becomes a 'replica_N' alias. Read-only views use a
+# replica unless the user wrote within REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host.strip(), TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['advouch.db.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+
+# Cache
+# Per-process memory by default; CACHE_BACKEND=redis shares it between workers
+REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.getenv('CACHE_BACKEND', 'locmem') == 'redis':
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+# Whether every worker sees the same cache. Cache-based invalidation (model
+# versions, embed pages, the nearby grid) only reaches other workers if so.
+CACHE_SHARED = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Conditional GET (advouch/conditional.py)
+# ETags come from model versions kept in the cache, so a write in one
+# worker must be visible to all of them. Off unless the cache is shared;
+# CONDITIONAL_GET_ENABLED=true turns it on anyway (a single worker).
+CONDITIONAL_GET_ENABLED = os.getenv('CONDITIONAL_GET_ENABLED', str(CACHE_SHARED)).lower() == 'true'
+
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -134,6 +209,111 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Fast list serialization (advouch/serialization.py)
+# Views with FastListMixin build pages from .values() rows and render with
+# orjson; false sends them through their serializers and JSONRenderer.
+FAST_SERIALIZATION = os.getenv('FAST_SERIALIZATION', 'true').lower() == 'true'
+
+# Response compression (advouch/compression.py)
+# Bodies of at least COMPRESSION_MIN_SIZE bytes are compressed with the
+# encoding the client rates highest, ties going to the earlier one in
+# COMPRESSION_ENCODINGS. zstd and br need the zstandard and brotli packages.
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'zstd,br,gzip')
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL', '3'))
+
+# Business dashboard (business/dashboard.py)
+# Dashboards are cached per business and date range for DASHBOARD_CACHE_TTL
+# seconds. Without since/until they cover the last DASHBOARD_DEFAULT_DAYS days.
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '60'))
+DASHBOARD_DEFAULT_DAYS = int(os.getenv('DASHBOARD_DEFAULT_DAYS', '30'))
+
+# Nearby businesses (business/nearby.py)
+# NEARBY_INDEX is 'geohash' (prefix queries on Business.geohash) or 'grid'
+# (an in-memory index per process, in cells of NEARBY_GRID_DEGREES; rebuilt
+# at least every NEARBY_GRID_TTL seconds unless the cache is shared).
+# Results score distance and reputation, reputation with weight
+# NEARBY_REPUTATION_WEIGHT (0-1).
+NEARBY_INDEX = os.getenv('NEARBY_INDEX', 'geohash')
+NEARBY_GRID_DEGREES = float(os.getenv('NEARBY_GRID_DEGREES', '0.1'))
+NEARBY_GRID_TTL = float(os.getenv('NEARBY_GRID_TTL', '30'))
+NEARBY_REPUTATION_WEIGHT = float(os.getenv('NEARBY_REPUTATION_WEIGHT', '0.3'))
+NEARBY_DEFAULT_RADIUS_KM = float(os.getenv('NEARBY_DEFAULT_RADIUS_KM', '5'))
+NEARBY_MAX_RADIUS_KM = float(os.getenv('NEARBY_MAX_RADIUS_KM', '100'))
+NEARBY_MAX_RESULTS = int(os.getenv('NEARBY_MAX_RESULTS', '100'))
+
+# Embed cache (ads/embed.py)
+# Rendered embed pages live in the Django cache for EMBED_CACHE_TTL seconds
+# (EMBED_MEMORY_TTL with the per-process locmem cache) and in each
+# process's memory for EMBED_MEMORY_TTL seconds. Browsers and
+# CDNs may reuse a response for EMBED_MAX_AGE seconds before revalidating.
+EMBED_CACHE_TTL = int(os.getenv('EMBED_CACHE_TTL', '86400'))
+EMBED_MEMORY_TTL = float(os.getenv('EMBED_MEMORY_TTL', '5'))
+EMBED_MEMORY_MAX_ENTRIES = int(os.getenv('EMBED_MEMORY_MAX_ENTRIES', '1000'))
+EMBED_MAX_AGE = int(os.getenv('EMBED_MAX_AGE', '300'))
+
+# Embed impressions (interactions/impressions.py)
+# The pixel appends impressions to per-process log files, a new file every
+# IMPRESSION_SEGMENT_SECONDS; `manage.py load_impressions` (cron) copies
+# finished files into ad_views. Each host needs its own loader run.
+IMPRESSION_LOG_DIR = os.getenv('IMPRESSION_LOG_DIR', str(BASE_DIR / 'logs' / 'impressions'))
+IMPRESSION_SEGMENT_SECONDS = int(os.getenv('IMPRESSION_SEGMENT_SECONDS', '60'))
+
+# Offer matching (offer/matching.py)
+# Per-process engagement index: new clicks/shares are added at most every
+# MATCHING_REFRESH_SECONDS and the whole index is rebuilt every
+# MATCHING_REBUILD_SECONDS. A share counts as MATCHING_SHARE_WEIGHT clicks.
+# Queries walk at most MATCHING_MAX_POSTINGS users per business.
+MATCHING_REFRESH_SECONDS = int(os.getenv('MATCHING_REFRESH_SECONDS', '60'))
+MATCHING_REBUILD_SECONDS = int(os.getenv('MATCHING_REBUILD_SECONDS', '3600'))
+MATCHING_SHARE_WEIGHT = float(os.getenv('MATCHING_SHARE_WEIGHT', '3'))
+MATCHING_NEIGHBOURS = int(os.getenv('MATCHING_NEIGHBOURS', '20'))
+MATCHING_MAX_POSTINGS = int(os.getenv('MATCHING_MAX_POSTINGS', '2000'))
+
+# Tracking filter (interactions/fraud.py)
+# Token bucket limits for track/click and track/view, in events per second
+# with a burst capacity. Events above the limit are stored but flagged.
+TRACKING_IP_RATE = float(os.getenv('TRACKING_IP_RATE', '2'))
+TRACKING_IP_BURST = int(os.getenv('TRACKING_IP_BURST', '30'))
+TRACKING_SESSION_RATE = float(os.getenv('TRACKING_SESSION_RATE', '0.5'))
+TRACKING_SESSION_BURST = int(os.getenv('TRACKING_SESSION_BURST', '10'))
+TRACKING_FILTER_MAX_KEYS = int(os.getenv('TRACKING_FILTER_MAX_KEYS', '100000'))
+
+# Rate limiting (users/throttling.py)
+# Per-view rates are looked up by the view's throttle_scope.
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'memory')  # 'memory' or 'redis'
+RATELIMIT_RATES = {
+    'tracking': os.getenv('RATELIMIT_TRACKING_RATE', '120/min'),
+    'public_read': os.getenv('RATELIMIT_PUBLIC_READ_RATE', '300/min'),
+    'export': os.getenv('RATELIMIT_EXPORT_RATE', '10/min'),
+}
+
+# Request metrics (advouch/metrics.py), served at /metrics
+# Every request is counted; METRICS_SAMPLE_RATE of them (0-1) also get query,
+# serializer and latency histograms. /metrics answers 404 until exposed:
+# set METRICS_TOKEN to accept `Authorization: Bearer <token>`, and/or
+# METRICS_ALLOWED_NETWORKS (comma-separated CIDRs, e.g. 10.0.0.0/8) to let
+# scrapers from those addresses in without one. REMOTE_ADDR is used, so
+# behind a proxy list the proxy only if everything behind it may scrape.
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', '1.0'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_NETWORKS = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in os.getenv('METRICS_ALLOWED_NETWORKS', '').split(',') if network.strip()
+]
+
+# Query inspector (advouch/db/inspector.py), off by default
+# Logs slow and repeated queries per request; see `manage.py summarize_queries`.
+QUERY_INSPECTOR_ENABLED = os.getenv('QUERY_INSPECTOR_ENABLED', 'false').lower() == 'true'
+QUERY_INSPECTOR_SLOW_MS = float(os.getenv('QUERY_INSPECTOR_SLOW_MS', '100'))
+QUERY_INSPECTOR_DUPLICATE_THRESHOLD = int(os.getenv('QUERY_INSPECTOR_DUPLICATE_THRESHOLD', '3'))
+QUERY_INSPECTOR_LOG_DIR = os.getenv('QUERY_INSPECTOR_LOG_DIR', str(BASE_DIR / 'logs'))
+QUERY_INSPECTOR_LOG_MAX_BYTES = int(os.getenv('QUERY_INSPECTOR_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+QUERY_INSPECTOR_LOG_BACKUPS = int(os.getenv('QUERY_INSPECTOR_LOG_BACKUPS', '5'))
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -177,6 +357,25 @@ STATIC_URL = 'static/'
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media pipeline (advouch/media.py)
+# Images get one resized JPEG per width in MEDIA_VARIANT_WIDTHS, made in
+# MEDIA_PROCESSES worker processes (0 resizes in the web process's media
+# thread). Media URLs outside our storage are fetched only from the hosts in
+# MEDIA_FETCH_HOSTS, and never more than MEDIA_MAX_BYTES.
+MEDIA_VARIANT_WIDTHS = [int(width) for width in os.getenv('MEDIA_VARIANT_WIDTHS', '160,320,640,1280').split(',')]
+MEDIA_VARIANT_QUALITY = int(os.getenv('MEDIA_VARIANT_QUALITY', '80'))
+MEDIA_PROCESSES = int(os.getenv('MEDIA_PROCESSES', '2'))
+MEDIA_FETCH_HOSTS = [host for host in os.getenv('MEDIA_FETCH_HOSTS', '').split(',') if host]
+MEDIA_FETCH_TIMEOUT = float(os.getenv('MEDIA_FETCH_TIMEOUT', '10'))
+MEDIA_MAX_BYTES = int(os.getenv('MEDIA_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Profile pictures (users/pictures.py)
+# Pictures over PROFILE_PICTURE_MAX_BYTES decoded are refused before
+# decoding; larger than PROFILE_PICTURE_MAX_SIDE pixels on a side, they are
+# stored scaled down to fit.
+PROFILE_PICTURE_MAX_BYTES = int(os.getenv('PROFILE_PICTURE_MAX_BYTES', str(5 * 1024 * 1024)))
+PROFILE_PICTURE_MAX_SIDE = int(os.getenv('PROFILE_PICTURE_MAX_SIDE', '1024'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,26 @@
+"""
+Startup work for the web servers.
+
+Django imports the URLconf, and with it every view, serializer, DRF and
+django-filter module, on the first request each process serves. warm_up()
+does it while the application is loaded instead. Under `gunicorn --preload`
+that happens once, in the master, and the workers fork with all of it
+already in memory (shared copy-on-write), so no worker pays for it on its
+first request. Pillow stays a lazy import of the media pipeline, so
+processes that never handle an image never load it.
+
+benchmarks/startup.py measures import time per package and time to the
+first answered request.
+"""
+from django.db import connections
+from django.urls import get_resolver
+
+
+def warm_up():
+    resolver = get_resolver()
+    # Imports every app's urls and views; reverse_dict compiles the patterns
+    resolver.url_patterns
+    resolver.reverse_dict
+    # Nothing above should have connected, but a connection opened in the
+    # gunicorn master would be shared by every forked worker
+    connections.close_all()
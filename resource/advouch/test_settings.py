@@ -0,0 +1,23 @@
+"""
+Settings for the test suite, which needs no PostgreSQL:
+
+    python manage.py test --settings=advouch.test_settings
+
+Two SQLite databases: 'default' and 'replica', a separate database that
+stands in for a read replica. It is migrated like the primary (it isn't
+in DATABASE_REPLICAS until a test routes to it), but holds no rows, so a
+read routed to it finds nothing (advouch/tests.py).
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-default.sqlite3',  # noqa: F405
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',  # noqa: F405
+    },
+}
+DATABASE_REPLICAS = []
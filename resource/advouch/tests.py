@@ -0,0 +1,351 @@
+import gzip
+import io
+import ipaddress
+import socket
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock, skipUnless
+from urllib.error import HTTPError, URLError
+from urllib.request import Request
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ads.models import Ad, Media
+from ads.serializers import AdSerializer
+from business.models import Business
+from users.models import User
+
+from . import compression, fieldsets, media
+from .db.replicas import ReplicaRouter, replica_reads
+
+
+HAS_REPLICA = 'replica' in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, "needs the 'replica' database of advouch.test_settings")
+@override_settings(DATABASE_REPLICAS=['replica'], RATELIMIT_ENABLED=False, REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(TestCase):
+    """
+    'replica' is a second, empty SQLite database: rows written here exist
+    only on default, so a read that comes back empty was served by the replica
+    """
+    # The runner sets up every database a test names, skipped or not
+    databases = {'default', 'replica'} if HAS_REPLICA else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(phone_number='+251900000001', full_name='Owner')
+        self.business = Business.objects.create(name='Cafe', location='Adama', description='Coffee', owner=self.user)
+        self.client = APIClient()
+
+    def list_names(self):
+        response = self.client.get('/api/v1/business/')
+        self.assertEqual(response.status_code, 200)
+        return [business['name'] for business in response.json()['results']]
+
+    def test_writes_go_to_default(self):
+        self.assertEqual(self.business._state.db, 'default')
+        self.assertEqual(ReplicaRouter().db_for_write(Business), 'default')
+        self.assertTrue(Business.objects.using('default').filter(pk=self.business.pk).exists())
+        self.assertFalse(Business.objects.using('replica').filter(pk=self.business.pk).exists())
+
+    def test_unmarked_reads_go_to_default(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Business))
+        self.assertEqual(Business.objects.all().db, 'default')
+
+    def test_replica_reads_block(self):
+        with replica_reads():
+            self.assertEqual(Business.objects.all().db, 'replica')
+            self.assertFalse(Business.objects.exists())
+        self.assertTrue(Business.objects.exists())
+
+    def test_list_view_reads_from_replica(self):
+        self.assertEqual(self.list_names(), [])
+
+    def test_reads_after_a_write_stay_on_default(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.list_names(), [])
+
+        response = self.client.post('/api/v1/me/sync/', {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # Within REPLICA_STICKY_SECONDS of the write
+        self.assertEqual(self.list_names(), ['Cafe'])
+
+        # Once the marker expires, reads go back to the replica
+        cache.clear()
+        self.assertEqual(self.list_names(), [])
+
+    def test_other_users_are_not_pinned(self):
+        self.client.force_authenticate(self.user)
+        self.client.post('/api/v1/me/sync/', {'name': 'Renamed'}, format='json')
+
+        other = User.objects.create(phone_number='+251900000002', full_name='Other')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.list_names(), [])
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    @override_settings(CONDITIONAL_GET_ENABLED=True)
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get('/api/v1/business/')['ETag']
+        response = self.client.get('/api/v1/business/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(CONDITIONAL_GET_ENABLED=False)
+    def test_off_without_a_shared_cache(self):
+        response = self.client.get('/api/v1/business/')
+        self.assertNotIn('ETag', response)
+        response = self.client.get('/api/v1/business/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(MEDIA_FETCH_HOSTS=['images.example.com'])
+class MediaFetchTests(SimpleTestCase):
+    def redirect(self, newurl):
+        request = Request('https://images.example.com/a.jpg')
+        return media._CheckedRedirectHandler().redirect_request(request, io.BytesIO(), 302, 'Found', {}, newurl)
+
+    def test_unlisted_hosts_are_not_fetched(self):
+        for url in ['https://internal.example.com/a.jpg', 'http://images.example.com/a.jpg', 'file:///etc/passwd']:
+            with self.subTest(url=url):
+                self.assertIsNone(media.read_source(url))
+
+    def test_redirects_stay_on_listed_hosts(self):
+        self.assertEqual(self.redirect('https://images.example.com/b.jpg').full_url, 'https://images.example.com/b.jpg')
+        for url in ['https://169.254.169.254/latest/meta-data/', 'http://images.example.com/b.jpg', 'https://localhost/b.jpg']:
+            with self.subTest(url=url):
+                with self.assertRaises(media._DisallowedRedirect):
+                    self.redirect(url)
+
+    def test_failed_fetches_are_none(self):
+        url = 'https://images.example.com/a.jpg'
+        errors = [URLError('unreachable'), HTTPError(url, 404, 'Not Found', {}, None), socket.timeout('timed out')]
+        for error in errors:
+            with self.subTest(error=error):
+                with mock.patch.object(media._opener, 'open', side_effect=error):
+                    with self.assertLogs('advouch.media', 'WARNING'):
+                        self.assertIsNone(media.read_source(url))
+
+    def test_unreadable_storage_is_none(self):
+        with self.assertLogs('advouch.media', 'WARNING'):
+            self.assertIsNone(media.read_source(settings.MEDIA_URL + '../../etc/passwd'))
+        with mock.patch.object(media.default_storage, 'exists', side_effect=OSError('disk')):
+            with self.assertLogs('advouch.media', 'WARNING'):
+                self.assertIsNone(media.read_source(settings.MEDIA_URL + 'originals/ab/ab.jpg'))
+
+
+class BrokenPoolTests(SimpleTestCase):
+    """A worker that dies takes the pool with it; the next render gets a new one"""
+
+    def pipeline(self, *outcomes):
+        pools = []
+
+        def make_pool(*args, **kwargs):
+            pool = mock.Mock()
+            pool.submit.return_value.result.side_effect = [outcomes[len(pools)]]
+            pools.append(pool)
+            return pool
+
+        patcher = mock.patch.object(media, 'ProcessPoolExecutor', side_effect=make_pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return media.MediaPipeline(1), pools
+
+    def test_retried_on_a_new_pool(self):
+        pipeline, pools = self.pipeline(BrokenProcessPool(), ('JPEG', None, {}))
+        with self.assertLogs('advouch.media', 'WARNING'):
+            self.assertEqual(pipeline.render(b'image'), ('JPEG', None, {}))
+        self.assertEqual(len(pools), 2)
+        pools[0].shutdown.assert_called_once_with(wait=False)
+
+    def test_raised_if_it_breaks_again(self):
+        pipeline, pools = self.pipeline(BrokenProcessPool(), BrokenProcessPool(), ('JPEG', None, {}))
+        with self.assertRaises(BrokenProcessPool), self.assertLogs('advouch.media', 'WARNING'):
+            pipeline.render(b'image')
+        # Not left broken for the next caller
+        self.assertEqual(pipeline.render(b'image'), ('JPEG', None, {}))
+        self.assertEqual(len(pools), 3)
+
+
+class MetricsAccessTests(SimpleTestCase):
+    def test_not_exposed_by_default(self):
+        with self.settings(METRICS_TOKEN='', METRICS_ALLOWED_NETWORKS=[]):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    def test_token(self):
+        with self.settings(METRICS_TOKEN='secret', METRICS_ALLOWED_NETWORKS=[]):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+    def test_allowed_networks(self):
+        networks = [ipaddress.ip_network('10.0.0.0/8')]
+        with self.settings(METRICS_TOKEN='', METRICS_ALLOWED_NETWORKS=networks):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.9').status_code, 403)
+
+
+@override_settings(RATELIMIT_ENABLED=False, COMPRESSION_MIN_SIZE=10 ** 9)
+class SparseFieldsTests(TestCase):
+    """?fields= on ListAds, which serves both the compiled and the serializer path"""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create(phone_number='+251900000001', full_name='Owner')
+        business = Business.objects.create(name='Cafe', location='Adama', description='Coffee', owner=user)
+        for number in range(3):
+            ad = Ad.objects.create(title=f'Ad {number}', description='Fresh', business=business, owner=user, status='active')
+            for image in range(number):
+                Media.objects.create(ad=ad, url=f'https://images.example.com/{number}/{image}.jpg')
+        self.client = APIClient()
+
+    def get(self, fields, fast):
+        with self.settings(FAST_SERIALIZATION=fast):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/v1/ads/', {'fields': fields} if fields else {})
+        return response, [query['sql'] for query in queries]
+
+    def test_fast_and_serializer_paths_match(self):
+        for fields in ['', 'id,title,media_files.url', 'media_files', 'title']:
+            with self.subTest(fields=fields):
+                fast, _ = self.get(fields, True)
+                slow, _ = self.get(fields, False)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, slow.content)
+
+    def test_selected_fields(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast):
+                response, _ = self.get('id,title,media_files.url', fast)
+                ad = next(ad for ad in response.json() if ad['title'] == 'Ad 2')
+                self.assertEqual(list(ad), ['id', 'title', 'media_files'])
+                self.assertEqual([list(item) for item in ad['media_files']], [['url'], ['url']])
+
+    def test_unknown_fields_are_400(self):
+        for fields in ['nope', 'title.length', 'media_files.nope', 'id,owner.name']:
+            with self.subTest(fields=fields):
+                for fast in (True, False):
+                    response, _ = self.get(fields, fast)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('error', response.json())
+
+    def test_only_selected_columns_are_read(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast):
+                _, queries = self.get('title,media_files.url', fast)
+                ads = [sql for sql in queries if 'FROM "ads"' in sql and 'COUNT' not in sql]
+                media_queries = [sql for sql in queries if 'FROM "ads_media"' in sql]
+                self.assertEqual(len(ads), 1)
+                self.assertNotIn('"ads"."description"', ads[0])
+                # One query for the page's media, not one per ad
+                self.assertEqual(len(media_queries), 1)
+                self.assertIn('"ads_media"."url"', media_queries[0])
+                self.assertNotIn('"ads_media"."media_type"', media_queries[0])
+
+    def test_column_plan(self):
+        plan = fieldsets.column_plan(Ad, AdSerializer(), {'title': None, 'media_files': {'url': None}})
+        self.assertEqual(plan, (['title'], [('media_files', Media, (['url', 'ad'], []))]))
+        self.assertEqual(fieldsets.parse_fields('id, media_files.url,media_files'), {'id': None, 'media_files': None})
+
+
+class CompressionTests(SimpleTestCase):
+    PREFERENCE = ('zstd', 'br', 'gzip')
+    BODY = b'{"results": []}' * 200
+
+    def compress(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return compression.compress_response(request, response, {'gzip': compression._gzip})
+
+    def test_negotiation(self):
+        cases = {
+            'gzip, br': 'br',
+            'gzip;q=1.0, br;q=0.5': 'gzip',
+            'br;q=0.5, *;q=0.8': 'zstd',
+            'gzip;q=0': None,
+            'identity': None,
+            'gzip;q=abc, br': 'br',
+            '': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(compression.negotiate(header, self.PREFERENCE), expected)
+
+    def test_gzip(self):
+        response = HttpResponse(self.BODY, content_type='application/json')
+        response['ETag'] = '"abc"'
+        response = self.compress(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_identity(self):
+        response = HttpResponse(self.BODY, content_type='application/json')
+        response['ETag'] = '"abc"'
+        response = self.compress(response, accept='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.BODY)
+        self.assertEqual(response['ETag'], '"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_left_alone(self):
+        streaming = StreamingHttpResponse(iter([self.BODY]), content_type='application/json')
+        encoded = HttpResponse(self.BODY, content_type='application/json')
+        encoded['Content-Encoding'] = 'br'
+        no_transform = HttpResponse(self.BODY, content_type='application/json')
+        no_transform['Cache-Control'] = 'public, no-transform'
+        image = HttpResponse(self.BODY, content_type='image/jpeg')
+        small = HttpResponse(b'{}', content_type='application/json')
+        for name, response in [('streaming', streaming), ('encoded', encoded), ('no-transform', no_transform),
+                               ('image', image), ('small', small)]:
+            with self.subTest(name):
+                response = self.compress(response)
+                self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+                self.assertFalse(response.has_header('Vary'))
+
+
+@override_settings(RATELIMIT_ENABLED=False, CONDITIONAL_GET_ENABLED=True, COMPRESSION_MIN_SIZE=0)
+class CompressionRoundTripTests(TestCase):
+    """Through the middleware stack, with the views' own ETags"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        owner = User.objects.create(phone_number='+251900000001', full_name='Owner')
+        for number in range(20):
+            business = Business.objects.create(name=f'Cafe {number}', location='Adama', description='Coffee', owner=owner)
+        self.ad = Ad.objects.create(title='Coffee', description='Fresh' * 100, business=business, owner=owner, status='active')
+
+    def round_trip(self, path):
+        identity = self.client.get(path, HTTP_ACCEPT_ENCODING='identity')
+        compressed = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(identity.has_header('Content-Encoding'))
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), identity.content)
+        for response in (identity, compressed):
+            self.assertIn('Accept-Encoding', response['Vary'])
+        # The weak ETag still revalidates
+        response = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+        self.assertEqual(response.status_code, 304)
+        return identity['ETag'], compressed['ETag']
+
+    def test_strong_etag_is_weakened(self):
+        identity, compressed = self.round_trip(f'/api/v1/ads/{self.ad.id}/embed/')
+        self.assertTrue(identity.startswith('"'))
+        self.assertEqual(compressed, 'W/' + identity)
+
+    def test_weak_etag_is_kept(self):
+        identity, compressed = self.round_trip('/api/v1/business/')
+        self.assertTrue(identity.startswith('W/'))
+        self.assertEqual(compressed, identity)
@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import DatabaseStatsView, metrics_view
 
 
 urlpatterns = [
@@ -29,4 +30,6 @@ urlpatterns = [
     path('api/v1/', include('offer.urls')),
     path('api/v1/', include('application.urls')),
     path('api/v1/reputation/', include('reputation.urls')),
+    path('api/v1/internal/db-stats/', DatabaseStatsView.as_view(), name='db-stats'),
+    path('metrics', metrics_view, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,96 @@
+import inspect
+import ipaddress
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from advouch import metrics
+from advouch.db import stats as db_stats
+from users.authentication import JWTAuthentication
+from users.permission import IsAuthenticated
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines (`async def get/post`).
+
+    Authentication, permission and throttle checks run in the sync thread
+    since they may hit the database; the handler itself runs on the event
+    loop and should use the async ORM (aget, acreate, ...). Under WSGI the
+    view still works, Django just runs it in a one-off event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            # options() and http_method_not_allowed() are inherited sync methods
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class DatabaseStatsView(APIView):
+    """
+    Connection statistics for the worker serving the request (staff only)
+    GET /api/v1/internal/db-stats/
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Only administrators can view database statistics'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(db_stats.snapshot())
+
+
+def _metrics_allowed(request):
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    networks = settings.METRICS_ALLOWED_NETWORKS
+    if networks:
+        try:
+            address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+        except ValueError:
+            return False
+        return any(address in network for network in networks)
+    return False
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint for the worker serving the request
+    GET /metrics (Authorization: Bearer <METRICS_TOKEN>, or from METRICS_ALLOWED_NETWORKS)
+    Not exposed (404) unless one of the two is configured.
+    """
+    if not (settings.METRICS_TOKEN or settings.METRICS_ALLOWED_NETWORKS):
+        raise Http404
+    if not _metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
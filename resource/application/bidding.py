@@ -0,0 +1,75 @@
+"""
+Per-offer bid aggregates and top-k bids.
+
+OfferBidStats holds the best (lowest) bid, the bid count and the median of
+an offer's active applications. The application views recompute it in the
+same transaction as the write, holding a row lock on the stats row, so
+concurrent bids on one offer are applied one at a time and the stats always
+match the committed applications.
+
+Both 'active' (the model default) and 'Active' (the choice value) count as
+active. Each is read separately from the (offer, status, offer_bid) index
+in bid order and the two runs are merged, so the top k bids cost two
+LIMIT k index scans instead of a sort.
+"""
+import heapq
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .models import Application, OfferBidStats
+
+
+ACTIVE_STATUSES = ('active', 'Active')
+
+
+def _active_bids(offer_id, status):
+    return Application.objects.filter(offer_id=offer_id, status=status).order_by('offer_bid')
+
+
+def top_bids(offer_id, k):
+    """The `k` lowest active bids for an offer, lowest first"""
+    runs = [list(_active_bids(offer_id, status)[:k]) for status in ACTIVE_STATUSES]
+    return list(islice(heapq.merge(*runs, key=lambda application: application.offer_bid), k))
+
+
+def _nth_bid(offer_id, counts, n):
+    """The n-th lowest active bid (0-based), given the bid count per status"""
+    runs = [
+        _active_bids(offer_id, status).values_list('offer_bid', flat=True)[:n + 1]
+        for status in ACTIVE_STATUSES if counts.get(status)
+    ]
+    if len(runs) == 1:
+        return runs[0][n]
+    return next(islice(heapq.merge(*(list(run) for run in runs)), n, None))
+
+
+def refresh_offer_stats(*offer_ids):
+    """
+    Recompute the stats of `offer_ids` from their applications. Call inside
+    the transaction that changed them.
+    """
+    with transaction.atomic():
+        # Lock in id order so two writers touching the same offers can't deadlock
+        for offer_id in sorted({offer_id for offer_id in offer_ids if offer_id is not None}):
+            stats, _ = OfferBidStats.objects.select_for_update().get_or_create(offer_id=offer_id)
+            rows = list(
+                Application.objects.filter(offer_id=offer_id, status__in=ACTIVE_STATUSES)
+                .values('status').annotate(count=Count('id'), best=Min('offer_bid')).order_by()
+            )
+            counts = {row['status']: row['count'] for row in rows}
+            stats.bid_count = sum(counts.values())
+            stats.best_bid = min((row['best'] for row in rows), default=None)
+            # Lower median for an even count, so it is always an actual bid
+            stats.median_bid = _nth_bid(offer_id, counts, (stats.bid_count - 1) // 2) if stats.bid_count else None
+            stats.save()
+
+
+def get_offer_stats(offer_id):
+    """Stats for one offer, computed on first use for offers bid on before stats existed"""
+    stats = OfferBidStats.objects.filter(offer_id=offer_id).first()
+    if stats is None:
+        refresh_offer_stats(offer_id)
+        stats = OfferBidStats.objects.get(offer_id=offer_id)
+    return stats
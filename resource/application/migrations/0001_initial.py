@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offer_bid', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('additional_description', models.TextField()),
+                ('status', models.CharField(choices=[('Active', 'active'), ('Inactive', 'inactive')], default='active', max_length=10)),
+            ],
+            options={
+                'db_table': 'applications',
+                'ordering': ['offer_bid'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['offer', 'offer_bid'], name='applications_offer_bid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['status', 'offer_bid'], name='applications_status_bid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['offer_bid'], name='applications_bid_idx'),
+        ),
+    ]
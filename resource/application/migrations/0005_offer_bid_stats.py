@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0004_indexes'),
+        ('offer', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferBidStats',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='bid_stats', serialize=False, to='offer.offer')),
+                ('best_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('median_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'offer_bid_stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['offer', 'status', 'offer_bid'], name='applications_offer_active_idx'),
+        ),
+    ]
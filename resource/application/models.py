@@ -12,4 +12,27 @@ class Application(models.Model):
 
     class Meta:
         db_table = 'applications'
-        ordering = ['offer_bid']
\ No newline at end of file
+        ordering = ['offer_bid']
+        indexes = [
+            # ListApplication?offer=... with the default offer_bid ordering
+            models.Index(fields=['offer', 'offer_bid'], name='applications_offer_bid_idx'),
+            # Best/top-k active bids per offer (application/bidding.py)
+            models.Index(fields=['offer', 'status', 'offer_bid'], name='applications_offer_active_idx'),
+            models.Index(fields=['status', 'offer_bid'], name='applications_status_bid_idx'),
+            models.Index(fields=['offer_bid'], name='applications_bid_idx'),
+        ]
+
+
+class OfferBidStats(models.Model):
+    """
+    Aggregates over an offer's active applications, kept up to date by the
+    application views (see application/bidding.py)
+    """
+    offer = models.OneToOneField('offer.Offer', on_delete=models.CASCADE, primary_key=True, related_name='bid_stats')
+    best_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    median_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    bid_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'offer_bid_stats'
@@ -1,4 +1,4 @@
-from .models import Application
+from .models import Application, OfferBidStats
 from rest_framework import serializers
 
 
@@ -8,4 +8,10 @@ class ApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Application
         fields = '__all__'
-        
\ No newline at end of file
+
+
+class OfferBidStatsSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = OfferBidStats
+        fields = ['best_bid', 'median_bid', 'bid_count', 'updated_at']
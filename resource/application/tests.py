@@ -1,3 +1,109 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ads.models import Ad
+from business.models import Business
+from offer.models import Offer
+from users.models import User
+
+from .models import Application, OfferBidStats
+from .views import OfferBidsView
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class OfferBidStatsTests(TestCase):
+    """Best, count and median stay exact through the application views"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(phone_number='+251900000001', full_name='Bidder')
+        business = Business.objects.create(name='Cafe', location='Adama', description='Coffee', owner=self.user)
+        ad = Ad.objects.create(title='Coffee', business=business, owner=self.user, status='active')
+        self.offer = Offer.objects.create(ad=ad, business=business, maximum_offer_amount=1000)
+        self.other_offer = Offer.objects.create(ad=ad, business=business, maximum_offer_amount=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bid(self, amount, offer=None, status=None):
+        """
+        Create an application; without `status` it gets the model default,
+        'active', which the serializer wouldn't accept as a choice
+        """
+        data = {
+            'user': self.user.id,
+            'offer': (offer or self.offer).id,
+            'offer_bid': amount,
+            'additional_description': 'Bid',
+        }
+        if status:
+            data['status'] = status
+        response = self.client.post('/api/v1/application/create/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def stats(self, offer=None):
+        stats = OfferBidStats.objects.get(offer=offer or self.offer)
+        return stats.best_bid, stats.median_bid, stats.bid_count
+
+    def test_lower_median(self):
+        for amount in ['40', '10', '30']:
+            self.bid(amount)
+        self.assertEqual(self.stats(), (Decimal('10'), Decimal('30'), 3))
+        # Even count: the lower of the two middle bids
+        self.bid('20')
+        self.assertEqual(self.stats(), (Decimal('10'), Decimal('20'), 4))
+
+    def test_mixed_case_statuses_are_counted_together(self):
+        self.bid('30', status='Active')
+        self.bid('10')
+        self.bid('20', status='Active')
+        self.bid('5', status='Inactive')
+        self.assertEqual(self.stats(), (Decimal('10'), Decimal('20'), 3))
+
+    def test_deactivated_bid_is_dropped(self):
+        best = self.bid('10')
+        self.bid('20')
+        response = self.client.patch(f'/api/v1/application/{best}/', {'status': 'Inactive'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats(), (Decimal('20'), Decimal('20'), 1))
+
+    def test_moving_an_application_refreshes_both_offers(self):
+        moved = self.bid('10')
+        self.bid('20')
+        self.bid('50', offer=self.other_offer)
+        response = self.client.patch(f'/api/v1/application/{moved}/', {'offer': self.other_offer.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats(), (Decimal('20'), Decimal('20'), 1))
+        self.assertEqual(self.stats(self.other_offer), (Decimal('10'), Decimal('10'), 2))
+
+    def test_delete(self):
+        only = self.bid('10')
+        response = self.client.delete(f'/api/v1/application/{only}/delete/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Application.objects.exists())
+        self.assertEqual(self.stats(), (None, None, 0))
+
+    def test_bids_view_merges_statuses_in_bid_order(self):
+        for amount, status in [('40', None), ('10', 'Active'), ('30', 'Active'), ('20', None), ('5', 'Inactive')]:
+            self.bid(amount, status=status)
+
+        response = self.client.get(f'/api/v1/offer/{self.offer.id}/bids/')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([bid['offer_bid'] for bid in body['bids']], ['10.00', '20.00', '30.00', '40.00'])
+        self.assertEqual((body['best_bid'], body['median_bid'], body['bid_count']), ('10.00', '20.00', 4))
+
+        def bids(k):
+            return self.client.get(f'/api/v1/offer/{self.offer.id}/bids/', {'k': k}).json()['bids']
+        self.assertEqual([bid['offer_bid'] for bid in bids(2)], ['10.00', '20.00'])
+        self.assertEqual(bids(-3), [])
+        self.assertEqual(len(bids('many')), 4)
+        with mock.patch.object(OfferBidsView, 'max_k', 3):
+            self.assertEqual(len(bids(1000)), 3)
+
+    def test_bids_view_missing_offer(self):
+        self.assertEqual(self.client.get('/api/v1/offer/999999/bids/').status_code, 404)
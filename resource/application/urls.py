@@ -1,9 +1,13 @@
 from django.urls import path
-from .views import ListApplication, CreateApplication, UpdateApplication, DeleteApplication
+from .views import ListApplication, CreateApplication, UpdateApplication, DeleteApplication, OfferBidsView
 
 urlpatterns = [
     path('application/', ListApplication.as_view(), name= 'list-application'),
     path('application/', CreateApplication.as_view(), name= 'create-application'),
     path('application/<int:id>/', UpdateApplication.as_view(), name= 'update-application'),
-    path('application/<int:id>/', DeleteApplication.as_view(), name= 'delete-application')
+    path('application/<int:id>/', DeleteApplication.as_view(), name= 'delete-application'),
+    # The create and delete routes above are shadowed by list and update
+    path('application/create/', CreateApplication.as_view()),
+    path('application/<int:id>/delete/', DeleteApplication.as_view()),
+    path('offer/<int:offer_id>/bids/', OfferBidsView.as_view(), name='offer-bids'),
 ]
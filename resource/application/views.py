@@ -1,8 +1,13 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404
+from django.db import transaction
 from .pagination import ApplicationPagination
-from .serializers import ApplicationSerializer
+from .serializers import ApplicationSerializer, OfferBidStatsSerializer
 from .models import Application
+from . import bidding
+from offer.models import Offer
 from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView
+from rest_framework.views import APIView
+from rest_framework.response import Response
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 # Create your views here.
@@ -16,17 +21,59 @@ class ListApplication(ListAPIView):
     ordering_fields = ['offer_bid']
 
 
+# Writes update the offer's bid stats in the same transaction
 class CreateApplication(CreateAPIView):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            application = serializer.save()
+            bidding.refresh_offer_stats(application.offer_id)
     
 class UpdateApplication(UpdateAPIView):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
     lookup_field = 'id'
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            previous_offer_id = serializer.instance.offer_id
+            application = serializer.save()
+            bidding.refresh_offer_stats(previous_offer_id, application.offer_id)
+
 class DeleteApplication(DestroyAPIView):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
     lookup_field = 'id'
-    
\ No newline at end of file
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            offer_id = instance.offer_id
+            instance.delete()
+            bidding.refresh_offer_stats(offer_id)
+
+
+class OfferBidsView(APIView):
+    """
+    Bid stats and the k lowest active bids for an offer
+    GET /api/v1/offer/{offer_id}/bids/?k=10
+    """
+    default_k = 10
+    max_k = 100
+
+    def get(self, request, offer_id):
+        offer = get_object_or_404(Offer, id=offer_id)
+        try:
+            k = min(int(request.query_params.get('k', self.default_k)), self.max_k)
+        except ValueError:
+            k = self.default_k
+
+        stats = bidding.get_offer_stats(offer.id)
+        bids = bidding.top_bids(offer.id, max(k, 0))
+
+        return Response({
+            'offer_id': offer.id,
+            **OfferBidStatsSerializer(stats).data,
+            'bids': ApplicationSerializer(bids, many=True).data,
+        })
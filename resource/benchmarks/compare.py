@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Compare two benchmark result files from benchmarks.run.
+
+    python -m benchmarks.compare                         # the two most recent runs
+    python -m benchmarks.compare base.json head.json --threshold 10 --fail-on-regression
+
+For every concurrency level present in both runs, prints throughput and
+p50/p95/p99 per endpoint with the relative change. A regression is
+throughput falling, or p95/p99 rising, by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+METRICS = (
+    # (key, higher is better)
+    ('throughput_rps', True),
+    ('p50_ms', False),
+    ('p95_ms', False),
+    ('p99_ms', False),
+)
+REGRESSION_METRICS = {'throughput_rps', 'p95_ms', 'p99_ms'}
+
+
+def change(base, head):
+    if not base:
+        return 0.0
+    return (head - base) / base * 100
+
+
+def compare(base, head, threshold):
+    """
+    Yields (concurrency, endpoint, metric, base, head, percent change, regressed).
+    """
+    head_levels = {level['concurrency']: level for level in head['levels']}
+    for base_level in base['levels']:
+        head_level = head_levels.get(base_level['concurrency'])
+        if head_level is None:
+            continue
+        rows = dict(base_level['endpoints'], total=base_level['total'])
+        head_rows = dict(head_level['endpoints'], total=head_level['total'])
+        for endpoint, base_stats in rows.items():
+            head_stats = head_rows.get(endpoint)
+            if head_stats is None:
+                continue
+            for metric, higher_is_better in METRICS:
+                delta = change(base_stats[metric], head_stats[metric])
+                worse = -delta if higher_is_better else delta
+                regressed = metric in REGRESSION_METRICS and worse > threshold
+                yield base_level['concurrency'], endpoint, metric, base_stats[metric], head_stats[metric], delta, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='base and head result files')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Percent change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    if args.files and len(args.files) != 2:
+        parser.error('pass exactly two files, or none to compare the two latest runs')
+    paths = [Path(p) for p in args.files] or sorted(RESULTS_DIR.glob('*.json'))[-2:]
+    if len(paths) != 2:
+        sys.exit(f"Need two result files in {RESULTS_DIR}")
+
+    base, head = (json.loads(path.read_text()) for path in paths)
+    print(f"base {base['commit']} ({paths[0].name})")
+    print(f"head {head['commit']} ({paths[1].name})")
+    if any(abs(change(count, head['dataset'].get(table, 0))) > 5 for table, count in base['dataset'].items()):
+        print("warning: the runs used datasets of different sizes")
+
+    regressions = 0
+    current = None
+    for concurrency, endpoint, metric, before, after, delta, regressed in compare(base, head, args.threshold):
+        if (concurrency, endpoint) != current:
+            current = (concurrency, endpoint)
+            print(f"\nc={concurrency} {endpoint}")
+        marker = '  REGRESSION' if regressed else ''
+        print(f"    {metric:<15} {before:>10.2f} -> {after:>10.2f}  {delta:+7.1f}%{marker}")
+        regressions += regressed
+
+    print(f"\n{regressions} regression(s) above {args.threshold:g}%")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Concurrent load generation against the real URL routes.
+
+A workload is a list of weighted request templates; each worker thread
+draws from it at random (seeded per worker) until the duration is up and
+records the latency of every request under its endpoint label.
+
+Two transports:
+    HTTPTransport       keep-alive http.client connection to a running server
+    InProcessTransport  django.test.Client, i.e. the full middleware and view
+                        stack in this process, without a server or network
+"""
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class Endpoint:
+    """
+    One kind of request in the mix. `make(rng)` returns (method, path, body)
+    where body is a dict (sent as JSON) or None.
+    """
+
+    def __init__(self, label, weight, make):
+        self.label = label
+        self.weight = weight
+        self.make = make
+
+
+def mixed_profile(ads, business_ids):
+    """
+    Feed reads, ad detail, reputation reads and tracking writes in roughly
+    the proportions a public ad site sees. `ads` is a list of
+    (ad_id, business_id) for active ads.
+
+    The unfiltered /ads/ feed has no page size and returns every active ad,
+    so the feed is read the way the web app does it, per business.
+    """
+    return [
+        Endpoint('feed', 30, lambda rng: ('GET', f'/api/v1/ads/?business={rng.choice(business_ids)}&ordering=-created_at', None)),
+        Endpoint('retrieve-ad', 20, lambda rng: ('GET', f'/api/v1/ads/{rng.choice(ads)[0]}/', None)),
+        Endpoint('business-reputation', 15, lambda rng: ('GET', f'/api/v1/reputation/business/{rng.choice(business_ids)}/', None)),
+        Endpoint('track-view', 28, lambda rng: ('POST', '/api/v1/track/view/', {'ad_id': rng.choice(ads)[0]})),
+        Endpoint('track-click', 7, lambda rng: ('POST', '/api/v1/track/click/', {'ad_id': rng.choice(ads)[0]})),
+    ]
+
+
+class HTTPTransport:
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._conn = None
+
+    def request(self, method, path, body):
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            self._conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self._conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self._conn.close()
+            self._conn = None
+            raise
+
+
+class InProcessTransport:
+    def __init__(self):
+        from django.test import Client
+
+        # ALLOWED_HOSTS has no 'testserver' outside the test runner
+        self._client = Client(HTTP_HOST='localhost')
+
+    def request(self, method, path, body):
+        if method == 'GET':
+            response = self._client.get(path)
+        else:
+            response = self._client.generic(method, path, json.dumps(body), content_type='application/json')
+        return response.status_code
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, duration):
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': len(values) / duration if duration else 0.0,
+        'mean_ms': statistics.mean(values) if values else 0.0,
+        'p50_ms': percentile(values, 50),
+        'p95_ms': percentile(values, 95),
+        'p99_ms': percentile(values, 99),
+        'max_ms': values[-1] if values else 0.0,
+    }
+
+
+def run_load(make_transport, endpoints, concurrency, duration, seed=0):
+    """
+    Drive `endpoints` from `concurrency` threads for `duration` seconds.
+    `make_transport()` is called once per thread. Requests answered with a
+    status >= 400, or not answered at all, count as errors.
+    """
+    latencies = {endpoint.label: [] for endpoint in endpoints}
+    errors = {endpoint.label: 0 for endpoint in endpoints}
+    lock = threading.Lock()
+    weights = [endpoint.weight for endpoint in endpoints]
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        transport = make_transport()
+        local = {endpoint.label: [] for endpoint in endpoints}
+        local_errors = dict.fromkeys(local, 0)
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, path, body = endpoint.make(rng)
+            start = time.perf_counter()
+            try:
+                status = transport.request(method, path, body)
+            except Exception:
+                local_errors[endpoint.label] += 1
+                continue
+            if status >= 400:
+                local_errors[endpoint.label] += 1
+            else:
+                local[endpoint.label].append((time.perf_counter() - start) * 1000)
+        with lock:
+            for label, values in local.items():
+                latencies[label].extend(values)
+                errors[label] += local_errors[label]
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'total': summarize([v for values in latencies.values() for v in values], sum(errors.values()), elapsed),
+        'endpoints': {label: summarize(latencies[label], errors[label], elapsed) for label in latencies},
+    }
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Run the mixed-workload benchmark and store the results for comparison.
+
+    python create_sample_data.py --businesses 10000 --ads 100000 --interactions 50000000 --flush
+    python -m benchmarks.run --url http://127.0.0.1:8000 --concurrency 1 16 64 --duration 30
+    python -m benchmarks.run --in-process --concurrency 4
+    python -m benchmarks.compare
+
+--url drives a running server (start it with RATELIMIT_ENABLED=false, or
+the tracking routes will mostly answer 429). --in-process sends requests
+through django.test.Client instead, which exercises routing, auth,
+serialization and the ORM without a server in front.
+
+Each run writes benchmarks/results/<timestamp>-<commit>.json with
+throughput and p50/p95/p99 latency per endpoint for every concurrency
+level, plus the commit, database and dataset size it ran against.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advouch.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+
+from ads.models import Ad
+from benchmarks.load import HTTPTransport, InProcessTransport, mixed_profile, run_load
+from create_sample_data import dataset_summary
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+PROFILES = {
+    'mixed': mixed_profile,
+}
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(['git', *args], capture_output=True, text=True, cwd=Path(__file__).parent)
+
+    head = git('rev-parse', '--short', 'HEAD')
+    if head.returncode != 0:
+        return 'unknown'
+    dirty = git('diff', '--quiet', 'HEAD').returncode != 0
+    return head.stdout.strip() + ('-dirty' if dirty else '')
+
+
+def print_level(result):
+    total = result['total']
+    print(
+        f"c={result['concurrency']:<4} {total['throughput_rps']:>8.1f} req/s  "
+        f"p50 {total['p50_ms']:>7.2f}ms  p95 {total['p95_ms']:>7.2f}ms  "
+        f"p99 {total['p99_ms']:>7.2f}ms  errors {total['errors']}"
+    )
+    for label, stats in result['endpoints'].items():
+        print(
+            f"    {label:<22} {stats['throughput_rps']:>8.1f} req/s  "
+            f"p50 {stats['p50_ms']:>7.2f}ms  p95 {stats['p95_ms']:>7.2f}ms  "
+            f"p99 {stats['p99_ms']:>7.2f}ms  errors {stats['errors']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='Base URL of a running server')
+    target.add_argument('--in-process', action='store_true', help='Use django.test.Client in this process')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='mixed')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 16, 64])
+    parser.add_argument('--duration', type=float, default=15.0, help='Seconds per concurrency level')
+    parser.add_argument('--warmup', type=float, default=3.0, help='Unrecorded seconds before the first level')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', default='', help='Free-form note stored with the results')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<timestamp>-<commit>.json)')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    ads = list(Ad.objects.filter(status='active').order_by('id').values_list('id', 'business_id')[:5000])
+    if not ads:
+        sys.exit("No active ads found; run create_sample_data.py first")
+    business_ids = sorted({business_id for _, business_id in ads})
+    endpoints = PROFILES[args.profile](ads, business_ids)
+
+    if args.in_process:
+        settings.RATELIMIT_ENABLED = False
+        make_transport = InProcessTransport
+    else:
+        make_transport = lambda: HTTPTransport(args.url)  # noqa: E731
+
+    if args.warmup:
+        run_load(make_transport, endpoints, min(4, max(args.concurrency)), args.warmup, seed=args.seed)
+
+    levels = []
+    for concurrency in args.concurrency:
+        result = run_load(make_transport, endpoints, concurrency, args.duration, seed=args.seed)
+        levels.append(result)
+        print_level(result)
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'label': args.label,
+        'profile': args.profile,
+        'transport': 'in-process' if args.in_process else args.url,
+        'duration_s': args.duration,
+        'environment': {
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'server_mode': settings.SERVER_MODE,
+            'db_conn_mode': settings.DB_CONN_MODE,
+            'debug': settings.DEBUG,
+        },
+        'dataset': dataset_summary(),
+        'levels': levels,
+    }
+
+    if not args.no_save:
+        path = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
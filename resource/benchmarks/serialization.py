@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Compare the fast list serialization path with the serializer path.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --repeat 50
+
+Every case is requested through django.test.Client with FAST_SERIALIZATION
+off and then on. The two response bodies must be byte-identical; the run
+exits non-zero if any differ. Each path is then timed over --repeat
+requests and the query counts are reported.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advouch.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from ads.models import Ad
+from interactions.models import Review, ServiceRatting
+
+
+def cases():
+    business_id = (
+        Ad.objects.filter(status='active').values('business_id')
+        .annotate(n=Count('id')).order_by('-n').values_list('business_id', flat=True).first()
+    )
+    review_ad = Review.objects.values_list('ad_id', flat=True).first()
+    rating_ad = ServiceRatting.objects.values_list('ad_id', flat=True).first()
+    found = [
+        ('ads (all active)', '/api/v1/ads/'),
+        ('shares page 1', '/api/v1/share/'),
+        # InteractionPagination's page parameter is named page_size
+        ('shares page 3', '/api/v1/share/?page_size=3'),
+    ]
+    if business_id:
+        found.append(('ads ?business=', f'/api/v1/ads/?business={business_id}&ordering=-created_at'))
+    if review_ad:
+        found.append(('reviews of one ad', f'/api/v1/review/{review_ad}'))
+    if rating_ad:
+        found.append(('ratings of one ad', f'/api/v1/rating/{rating_ad}'))
+    return found
+
+
+def fetch(client, path, fast):
+    settings.FAST_SERIALIZATION = fast
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    if response.status_code != 200:
+        sys.exit(f"{path} answered {response.status_code}")
+    return response.content, len(queries)
+
+
+def timed(client, path, fast, repeat):
+    settings.FAST_SERIALIZATION = fast
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(path)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='Timed requests per path and mode')
+    args = parser.parse_args()
+
+    settings.RATELIMIT_ENABLED = False
+    client = Client(HTTP_HOST='localhost')
+    mismatches = 0
+
+    print(f"{'case':<20} {'bytes':>9} {'queries':>9} {'serializer':>11} {'fast':>9} {'speedup':>8}  identical")
+    for label, path in cases():
+        slow_body, slow_queries = fetch(client, path, False)
+        fast_body, fast_queries = fetch(client, path, True)
+        identical = slow_body == fast_body
+        mismatches += not identical
+        slow_ms = timed(client, path, False, args.repeat)
+        fast_ms = timed(client, path, True, args.repeat)
+        print(
+            f"{label:<20} {len(fast_body):>9} {slow_queries:>4}/{fast_queries:<4} "
+            f"{slow_ms:>9.2f}ms {fast_ms:>7.2f}ms {slow_ms / fast_ms:>7.1f}x  {'yes' if identical else 'NO'}"
+        )
+
+    if mismatches:
+        sys.exit(f"{mismatches} case(s) rendered different bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Compare WSGI (sync gunicorn workers) and ASGI (uvicorn workers) deployments.
+
+Starts each server mode in turn against the configured database, drives the
+async endpoints (ad detail, business reputation, view tracking) at several
+concurrency levels and reports throughput and tail latency.
+
+    python -m benchmarks.server_modes --concurrency 1 16 64 --duration 15
+
+Needs existing data (run create_sample_data.py first). Rate limiting is
+disabled for the servers under test.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advouch.settings')
+django.setup()
+
+from ads.models import Ad
+from benchmarks.load import Endpoint, HTTPTransport, run_load
+
+
+SERVER_COMMANDS = {
+    'wsgi': ['gunicorn', 'advouch.wsgi:application'],
+    'asgi': ['gunicorn', 'advouch.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+}
+
+
+def start_server(mode, port, workers):
+    env = dict(os.environ, RATELIMIT_ENABLED='false')
+    command = SERVER_COMMANDS[mode] + ['--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning']
+    process = subprocess.Popen(command, env=env)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/v1/ads/')
+            conn.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def hot_endpoints(ads):
+    """One third each of the async endpoints"""
+    return [
+        Endpoint('retrieve-ad', 1, lambda rng: ('GET', f'/api/v1/ads/{rng.choice(ads)[0]}/', None)),
+        Endpoint('business-reputation', 1, lambda rng: ('GET', f'/api/v1/reputation/business/{rng.choice(ads)[1]}/', None)),
+        Endpoint('track-view', 1, lambda rng: ('POST', '/api/v1/track/view/', {'ad_id': rng.choice(ads)[0]})),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=sorted(SERVER_COMMANDS), default=['wsgi', 'asgi'])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 16, 64])
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    ads = list(Ad.objects.filter(status='active').values_list('id', 'business_id')[:200])
+    if not ads:
+        sys.exit("No active ads found; run create_sample_data.py first")
+    endpoints = hot_endpoints(ads)
+    make_transport = lambda: HTTPTransport(f'http://127.0.0.1:{args.port}')  # noqa: E731
+
+    results = []
+    for mode in args.modes:
+        process = start_server(mode, args.port, args.workers)
+        try:
+            run_load(make_transport, endpoints, 4, 2.0)  # warm up connections and caches
+            for concurrency in args.concurrency:
+                result = run_load(make_transport, endpoints, concurrency, args.duration)
+                result['mode'] = mode
+                results.append(result)
+                total = result['total']
+                print(
+                    f"{mode:<5} c={concurrency:<4} {total['throughput_rps']:>8.1f} req/s  "
+                    f"p50 {total['p50_ms']:>7.2f}ms  p95 {total['p95_ms']:>7.2f}ms  "
+                    f"p99 {total['p99_ms']:>7.2f}ms  errors {total['errors']}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Measure service startup: import time per package and time to first request.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --target 2 --workers 4
+
+Import times come from `python -X importtime` loading advouch.wsgi (which
+warms up the URLconf, see advouch/startup.py) in a fresh interpreter,
+summed per top-level package: each app, django, rest_framework and so on.
+The advouch line includes the work advouch.wsgi does itself (app setup,
+middleware, warm-up), which -X importtime counts as its own.
+The `migrate --check` probe that entrypoint.sh runs in production mode is
+timed next. Finally gunicorn is started with and without --preload, each
+timed from launch to its first answered request, followed by the median of
+the next --requests requests.
+
+Exits non-zero if time to first request with --preload is over --target
+seconds.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def import_times():
+    """({top-level package: seconds spent importing its modules}, total seconds)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import advouch.wsgi'],
+        capture_output=True, text=True, env=os.environ,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1e6
+    return packages, sum(packages.values())
+
+
+def migration_probe():
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--check', '--skip-checks', '--noinput'],
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start, result.returncode == 0
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        conn.request('GET', path)
+        conn.getresponse().read()
+    finally:
+        conn.close()
+
+
+def first_request(port, path, workers, preload, requests):
+    """(seconds from launch to the first answer, its latency in ms, median ms of the next `requests`)"""
+    env = dict(os.environ, RATELIMIT_ENABLED='false')
+    command = [
+        'gunicorn', 'advouch.wsgi:application', '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers), '--log-level', 'warning',
+    ] + (['--preload'] if preload else [])
+    launched = time.perf_counter()
+    process = subprocess.Popen(command, env=env)
+    try:
+        while True:
+            if process.poll() is not None:
+                sys.exit(f"gunicorn exited with status {process.returncode}")
+            if time.perf_counter() - launched > 60:
+                sys.exit(f"gunicorn did not answer on port {port}")
+            sent = time.perf_counter()
+            try:
+                get(port, path)
+                break
+            except OSError:
+                time.sleep(0.02)
+        answered = time.perf_counter()
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            get(port, path)
+            samples.append((time.perf_counter() - start) * 1000)
+        return answered - launched, (answered - sent) * 1000, statistics.median(samples) if samples else 0.0
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', type=float, default=3.0, help='Seconds allowed to the first answered request')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--path', default='/api/v1/ads/', help='Path requested')
+    parser.add_argument('--requests', type=int, default=20, help='Requests timed after the first')
+    parser.add_argument('--top', type=int, default=15, help='Packages listed by import time')
+    args = parser.parse_args()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advouch.settings')
+
+    packages, total = import_times()
+    print(f"{'package':<24} {'import':>9}")
+    for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<24} {seconds * 1000:>7.1f}ms")
+    print(f"{'total':<24} {total * 1000:>7.1f}ms\n")
+
+    seconds, up_to_date = migration_probe()
+    print(f"migrate --check          {seconds * 1000:>7.1f}ms  ({'nothing to apply' if up_to_date else 'migrations pending'})\n")
+
+    print(f"{'gunicorn':<12} {'first answer':>13} {'its latency':>12} {'then p50':>10}")
+    preload_seconds = None
+    for preload in (False, True):
+        ready, latency_ms, median_ms = first_request(args.port, args.path, args.workers, preload, args.requests)
+        if preload:
+            preload_seconds = ready
+        print(f"{'--preload' if preload else 'default':<12} {ready:>12.2f}s {latency_ms:>10.1f}ms {median_ms:>8.2f}ms")
+
+    if preload_seconds > args.target:
+        sys.exit(f"time to first request {preload_seconds:.2f}s is over the {args.target:g}s target")
+
+
+if __name__ == '__main__':
+    main()
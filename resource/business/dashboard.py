@@ -0,0 +1,90 @@
+"""
+Per-ad and total engagement for a business over a date range.
+
+All numbers come from one query: the business's ads, each annotated with a
+correlated COUNT (or SUM) subquery per interaction table. Every subquery
+filters on one ad id plus the created_at range, which is the
+(ad, created_at) index each table has. Totals are summed from the per-ad
+rows, so they always agree with them. Clicks and views flagged as bot or
+burst traffic are left out, as in Reputation.
+
+Results are cached for DASHBOARD_CACHE_TTL seconds per business and range.
+They are read from a replica when one is configured, since a few seconds
+of lag doesn't matter here.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from ads.models import Ad
+from advouch.db.replicas import replica_reads
+from interactions.models import AdClick, AdView, Review, ServiceRatting, Share
+from reputation.models import click_through_rate
+
+
+# name -> (model, aggregate, extra filters)
+METRICS = {
+    'clicks': (AdClick, Count('id'), {'is_flagged': False}),
+    'views': (AdView, Count('id'), {'is_flagged': False}),
+    'shares': (Share, Count('id'), {}),
+    'reviews': (Review, Count('id'), {}),
+    'ratings': (ServiceRatting, Count('id'), {}),
+    'rating_sum': (ServiceRatting, Sum('ratting'), {}),
+}
+
+
+def _per_ad(model, aggregate, filters, since, until):
+    """Subquery computing `aggregate` over the outer ad's rows of `model`"""
+    queryset = model.objects.filter(ad=OuterRef('pk'), **filters)
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    if until:
+        queryset = queryset.filter(created_at__lt=until)
+    value = queryset.order_by().values('ad').annotate(value=aggregate).values('value')
+    return Coalesce(Subquery(value, output_field=IntegerField()), 0)
+
+
+def _rates(row):
+    """Add average_rating and click_through_rate to a row of metrics"""
+    rating_sum = row.pop('rating_sum')
+    row['average_rating'] = round(rating_sum / row['ratings'], 2) if row['ratings'] else 0.0
+    row['click_through_rate'] = round(click_through_rate(row['clicks'], row['views']), 4)
+    return row
+
+
+def compute_dashboard(business_id, since=None, until=None):
+    # Prefixed, since Ad already has relations named clicks and views
+    annotations = {
+        f'metric_{name}': _per_ad(model, aggregate, filters, since, until)
+        for name, (model, aggregate, filters) in METRICS.items()
+    }
+    with replica_reads():
+        rows = [
+            {'ad_id': row['id'], 'title': row['title'], 'status': row['status'],
+             **{name: row[f'metric_{name}'] for name in METRICS}}
+            for row in Ad.objects.filter(business_id=business_id)
+            .annotate(**annotations)
+            .order_by('-created_at')
+            .values('id', 'title', 'status', *annotations)
+        ]
+
+    totals = {name: sum(row[name] for row in rows) for name in METRICS}
+    ads = [_rates(row) for row in rows]
+    return {
+        'business_id': business_id,
+        'since': since.isoformat() if since else None,
+        'until': until.isoformat() if until else None,
+        'totals': dict(_rates(totals), ads=len(ads)),
+        'ads': ads,
+    }
+
+
+def get_dashboard(business_id, since=None, until=None):
+    """The dashboard for a business and range, from the cache when fresh"""
+    key = f"dashboard:{business_id}:{since.isoformat() if since else ''}:{until.isoformat() if until else ''}"
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = compute_dashboard(business_id, since, until)
+        cache.set(key, dashboard, settings.DASHBOARD_CACHE_TTL)
+    return dashboard
@@ -0,0 +1,155 @@
+"""
+Geohashes, distances and an in-memory grid of points.
+
+A geohash names a cell of the latitude/longitude grid as a base-32 string.
+Each extra character splits the cell 32 ways, so every point inside a cell
+has a geohash starting with that cell's. Business.geohash stores
+GEOHASH_PRECISION characters (cells of about 5 m), and "everything in this
+cell" is a prefix match on a B-tree index, no PostGIS needed.
+
+covering_cells() picks the few cells, at the finest precision that works,
+that together contain every point within a radius; GridIndex does the same
+job in memory for the cases the geohash cells can't cover.
+"""
+import math
+from collections import defaultdict
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Characters stored in Business.geohash; changing it needs a backfill
+GEOHASH_PRECISION = 9
+# Mean earth radius (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(lat, lng, precision=GEOHASH_PRECISION):
+    """The geohash of a point, `precision` characters long"""
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    chars, value, bits, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value, lng_lo = value * 2 + 1, mid
+            else:
+                value, lng_hi = value * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value, lat_lo = value * 2 + 1, mid
+            else:
+                value, lat_hi = value * 2, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            value, bits = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell of `precision` characters"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def extent(lat, radius_km):
+    """
+    (dlat, dlng): half the height and width in degrees of the box around a
+    circle of `radius_km` centred at latitude `lat`. dlng is None when the
+    circle reaches a pole, where every longitude is in range.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    if abs(lat) + dlat >= 90:
+        return dlat, None
+    dlng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    return dlat, dlng
+
+
+def _wrap(lng):
+    return (lng + 180.0) % 360.0 - 180.0
+
+
+def covering_cells(lat, lng, radius_km):
+    """
+    Geohash prefixes whose cells together hold every point within
+    `radius_km` of (lat, lng): the point's own cell at the finest precision
+    whose cells are at least as big as the circle, plus the neighbours the
+    circle spills into (at most 4 cells). None if the circle reaches a pole
+    or is wider than the coarsest cells.
+    """
+    dlat, dlng = extent(lat, radius_km)
+    if dlng is None:
+        return None
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height >= dlat and width >= dlng:
+            break
+    else:
+        return None
+
+    # Bounds of the point's own cell, then one step beyond each side the circle crosses
+    lat_lo = math.floor((lat + 90.0) / height) * height - 90.0
+    lng_lo = math.floor((lng + 180.0) / width) * width - 180.0
+    lats = [lat]
+    if lat - dlat < lat_lo:
+        lats.append(lat - height)
+    if lat + dlat >= lat_lo + height:
+        lats.append(lat + height)
+    lngs = [lng]
+    if lng - dlng < lng_lo:
+        lngs.append(lng - width)
+    if lng + dlng >= lng_lo + width:
+        lngs.append(lng + width)
+    return sorted({
+        encode(min(max(cell_lat, -90.0), 90.0 - height / 2), _wrap(cell_lng), precision)
+        for cell_lat in lats for cell_lng in lngs
+    })
+
+
+class GridIndex:
+    """
+    (id, lat, lng) points bucketed into square cells of `cell` degrees,
+    for radius queries in memory
+    """
+
+    def __init__(self, points, cell):
+        self.cell = cell
+        self.columns = math.ceil(360.0 / cell)
+        self.points = list(points)
+        self.cells = defaultdict(list)
+        for point in self.points:
+            self.cells[self._cell(point[1], point[2])].append(point)
+
+    def _cell(self, lat, lng):
+        return math.floor((lat + 90.0) / self.cell), math.floor((lng + 180.0) / self.cell) % self.columns
+
+    def candidates(self, lat, lng, radius_km):
+        """Points in the cells around the circle, a superset of those inside it"""
+        dlat, dlng = extent(lat, radius_km)
+        if dlng is None:
+            return self.points
+        rows = range(
+            math.floor((max(lat - dlat, -90.0) + 90.0) / self.cell),
+            math.floor((min(lat + dlat, 90.0) + 90.0) / self.cell) + 1,
+        )
+        first = math.floor((lng - dlng + 180.0) / self.cell)
+        last = math.floor((lng + dlng + 180.0) / self.cell)
+        columns = {column % self.columns for column in range(first, min(last, first + self.columns - 1) + 1)}
+        if len(rows) * len(columns) > len(self.cells):
+            # More cells to look at than there are occupied ones
+            return self.points
+        found = []
+        for row in rows:
+            for column in columns:
+                found.extend(self.cells.get((row, column), ()))
+        return found
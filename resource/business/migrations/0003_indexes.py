@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['-created_at'], name='businesses_created_idx'),
+        ),
+    ]
@@ -1,12 +1,32 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from .geo import encode
+
+
 class Business(models.Model):
     name = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
     description = models.TextField()
     owner = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='businesses')
     created_at = models.DateTimeField(auto_now_add=True)
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    # Derived from latitude/longitude on save; prefix queries find businesses by area (business/nearby.py)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False, db_index=True)
 
     class Meta:
         db_table = 'businesses'
         verbose_name_plural = 'Businesses'
+        indexes = [
+            # ListBusiness orders by newest first
+            models.Index(fields=['-created_at'], name='businesses_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        located = self.latitude is not None and self.longitude is not None
+        self.geohash = encode(self.latitude, self.longitude) if located else ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
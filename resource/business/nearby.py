@@ -0,0 +1,130 @@
+"""
+Businesses near a point, ranked by distance and reputation.
+
+Candidates come from one of two indexes, picked by NEARBY_INDEX:
+
+    geohash   a prefix match on the indexed Business.geohash column for
+              the few cells covering the circle (see geo.covering_cells)
+    grid      an in-memory geo.GridIndex of every located business, built
+              per process and rebuilt after any write to Business (with
+              the per-process locmem cache, other workers don't hear of
+              writes, so it is also rebuilt every NEARBY_GRID_TTL seconds)
+
+The geohash index is the default. The grid also answers the circles the
+geohash cells can't cover (ones reaching a pole). Either way candidates
+are only (id, lat, lng) tuples; exact distances are then computed in
+Python and those outside the radius dropped.
+
+Each result scores
+
+    (1 - w) * (1 - distance / radius) + w * overall_score / 100
+
+with w = NEARBY_REPUTATION_WEIGHT, so a close business with a good
+reputation comes first. Businesses without a Reputation row count as the
+model's default score of 50.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max, Q
+
+from advouch import conditional
+from advouch.db.replicas import replica_reads
+from reputation.models import Reputation
+
+from . import geo
+from .models import Business
+
+
+# Reputation.overall_score's default, for businesses that have none yet
+DEFAULT_SCORE = 50
+
+
+class _Grid:
+    """The process's GridIndex, tagged with the Business version it was built at"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._built = 0.0
+        self._index = None
+
+    def _stale(self, version):
+        if self._index is None or self._version != version:
+            return True
+        # Writes in other workers only show up in a shared cache
+        return not settings.CACHE_SHARED and time.monotonic() - self._built > settings.NEARBY_GRID_TTL
+
+    def get(self):
+        version = conditional.get_versions([Business])[Business._meta.label]
+        with self._lock:
+            if self._stale(version):
+                with replica_reads():
+                    points = Business.objects.filter(
+                        latitude__isnull=False, longitude__isnull=False,
+                    ).values_list('id', 'latitude', 'longitude')
+                    self._index = geo.GridIndex(points, settings.NEARBY_GRID_DEGREES)
+                self._version = version
+                self._built = time.monotonic()
+            return self._index
+
+
+_grid = _Grid()
+
+
+def candidates(lat, lng, radius_km):
+    """(id, lat, lng) of located businesses in and around the circle"""
+    cells = None
+    if settings.NEARBY_INDEX == 'geohash':
+        cells = geo.covering_cells(lat, lng, radius_km)
+    if cells is None:
+        return _grid.get().candidates(lat, lng, radius_km)
+
+    match = Q()
+    for cell in cells:
+        match |= Q(geohash__startswith=cell)
+    with replica_reads():
+        return list(Business.objects.filter(match).values_list('id', 'latitude', 'longitude'))
+
+
+def find_nearby(lat, lng, radius_km, limit):
+    """Up to `limit` result dicts for businesses within `radius_km`, best first"""
+    distances = {}
+    for business_id, business_lat, business_lng in candidates(lat, lng, radius_km):
+        distance = geo.haversine(lat, lng, business_lat, business_lng)
+        if distance <= radius_km:
+            distances[business_id] = distance
+    if not distances:
+        return []
+
+    with replica_reads():
+        scores = dict(
+            Reputation.objects.filter(business_id__in=distances)
+            .values('business_id').annotate(score=Max('overall_score'))
+            .values_list('business_id', 'score')
+        )
+    weight = settings.NEARBY_REPUTATION_WEIGHT
+
+    def rank(business_id):
+        closeness = 1 - distances[business_id] / radius_km if radius_km else 1.0
+        return (1 - weight) * closeness + weight * scores.get(business_id, DEFAULT_SCORE) / 100
+
+    ranked = sorted(distances, key=lambda business_id: (-rank(business_id), distances[business_id], business_id))[:limit]
+    with replica_reads():
+        businesses = Business.objects.only('name', 'location', 'latitude', 'longitude').in_bulk(ranked)
+    return [
+        {
+            'id': business_id,
+            'name': businesses[business_id].name,
+            'location': businesses[business_id].location,
+            'latitude': businesses[business_id].latitude,
+            'longitude': businesses[business_id].longitude,
+            'distance_km': round(distances[business_id], 3),
+            'reputation': scores.get(business_id, DEFAULT_SCORE),
+            'score': round(rank(business_id), 4),
+        }
+        for business_id in ranked
+        # Deleted since the candidates were read
+        if business_id in businesses
+    ]
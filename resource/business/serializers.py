@@ -14,11 +14,20 @@ class BussinessSerializer(serializers.ModelSerializer):
             'name',
             'description',
             'location',
+            'latitude',
+            'longitude',
             'owner',
             'media_files',
             'created_at'
         ]
 
+    def validate(self, attrs):
+        latitude = attrs.get('latitude', getattr(self.instance, 'latitude', None))
+        longitude = attrs.get('longitude', getattr(self.instance, 'longitude', None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError('latitude and longitude must be given together')
+        return attrs
+
     def create(self, validated_data):
         media_data = validated_data.pop('media_files', [])
         business = Business.objects.create(**validated_data)
@@ -1,12 +1,14 @@
 from django.urls import path
-from .views import ListBusiness, CreateBusiness, UpdateBusiness, DeleteBusiness, GetMyBusinesses
+from .views import ListBusiness, CreateBusiness, UpdateBusiness, DeleteBusiness, GetMyBusinesses, BusinessDashboardView, NearbyBusinessView
 
 
 urlpatterns = [
     path('business/', ListBusiness.as_view(), name='list-business'),
     path('business/my/', GetMyBusinesses.as_view(), name='list-my-business'),
+    path('business/nearby/', NearbyBusinessView.as_view(), name='nearby-business'),
     path('business/', CreateBusiness.as_view(), name='create-business'),
     path('business/<int:id>/', UpdateBusiness.as_view(), name='update-business'),
-    path('business/<int:id>/', DeleteBusiness.as_view(), name='delete-business')
+    path('business/<int:id>/', DeleteBusiness.as_view(), name='delete-business'),
+    path('business/<int:id>/dashboard/', BusinessDashboardView.as_view(), name='business-dashboard'),
 ]
 
@@ -1,14 +1,28 @@
 from .models import Business
 from .pagination import BusinessPagination
 from .serializers import BussinessSerializer
+from . import dashboard, nearby
 from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
+from rest_framework import filters, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from datetime import datetime, time, timedelta
 from users.permission import IsAuthenticated, IsOwner
+from users.ownership import OwnerScopedMixin, owns_business
 from users.authentication import JWTAuthentication
+from users.throttling import RateLimitThrottle
+from advouch.conditional import ConditionalGetMixin
+from advouch.fieldsets import SparseFieldsMixin
+from advouch.db.replicas import ReplicaReadMixin
+from ads.models import Media
+from interactions.export import parse_bound
 
 
-class GetMyBusinesses(ListAPIView):
+class GetMyBusinesses(ReplicaReadMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     
@@ -24,10 +38,13 @@ class GetMyBusinesses(ListAPIView):
         return Business.objects.filter(owner=self.request.user)
 
 
-class ListBusiness(ListAPIView):
+class ListBusiness(ConditionalGetMixin, SparseFieldsMixin, ReplicaReadMixin, ListAPIView):
     queryset = Business.objects.all().order_by('-created_at')
+    conditional_models = [Business, Media]
     pagination_class = BusinessPagination
     serializer_class = BussinessSerializer
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'public_read'
 
     filter_backends = [DjangoFilterBackend,filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['name', 'owner']
@@ -42,7 +59,7 @@ class CreateBusiness(CreateAPIView):
     serializer_class = BussinessSerializer
 
 
-class UpdateBusiness(UpdateAPIView):
+class UpdateBusiness(OwnerScopedMixin, UpdateAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
     
@@ -51,7 +68,7 @@ class UpdateBusiness(UpdateAPIView):
     lookup_field = 'id'
 
 
-class DeleteBusiness(DestroyAPIView):
+class DeleteBusiness(OwnerScopedMixin, DestroyAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
     
@@ -59,3 +76,79 @@ class DeleteBusiness(DestroyAPIView):
     serializer_class = BussinessSerializer
     lookup_field = 'id'
 
+
+class BusinessDashboardView(APIView):
+    """
+    Per-ad and total clicks, views, shares, reviews, average rating and CTR
+    for a business (owner only)
+    GET /api/v1/business/{id}/dashboard/
+    Query params:
+        since, until    ISO date or datetime; until is exclusive, a bare date includes that day
+                        (default: the last DASHBOARD_DEFAULT_DAYS days)
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        if not owns_business(request, id):
+            get_object_or_404(Business, id=id)
+            return Response(
+                {'error': 'You do not have permission to view this business dashboard'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            since = parse_bound(request.query_params['since']) if request.query_params.get('since') else None
+            until = parse_bound(request.query_params['until'], end=True) if request.query_params.get('until') else None
+        except ValueError as e:
+            return Response({'error': f'Invalid date: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        if since is None and until is None:
+            # Whole days, so the default range (and its cache key) stays the same all day
+            start = timezone.localdate() - timedelta(days=settings.DASHBOARD_DEFAULT_DAYS - 1)
+            since = timezone.make_aware(datetime.combine(start, time.min))
+        if since and until and since >= until:
+            return Response({'error': 'since must be before until'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(dashboard.get_dashboard(id, since, until))
+
+
+class NearbyBusinessView(APIView):
+    """
+    Businesses within a radius of a point, ranked by distance and reputation
+    GET /api/v1/business/nearby/?lat=&lng=&radius=
+    Query params:
+        lat, lng    the point, in degrees
+        radius      km (default NEARBY_DEFAULT_RADIUS_KM, at most NEARBY_MAX_RADIUS_KM)
+        limit       results (default 20, at most NEARBY_MAX_RESULTS)
+    """
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'public_read'
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            lat = float(params['lat'])
+            lng = float(params['lng'])
+            radius = float(params.get('radius') or settings.NEARBY_DEFAULT_RADIUS_KM)
+            limit = int(params.get('limit') or 20)
+        except KeyError:
+            return Response({'error': 'lat and lng are required'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'lat, lng, radius and limit must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return Response({'error': 'lat or lng out of range'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < radius <= settings.NEARBY_MAX_RADIUS_KM:
+            return Response(
+                {'error': f'radius must be above 0 and at most {settings.NEARBY_MAX_RADIUS_KM:g} km'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(max(limit, 1), settings.NEARBY_MAX_RESULTS)
+
+        results = nearby.find_nearby(lat, lng, radius, limit)
+        return Response({
+            'latitude': lat,
+            'longitude': lng,
+            'radius_km': radius,
+            'count': len(results),
+            'results': results,
+        })
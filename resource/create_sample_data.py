@@ -1,335 +1,434 @@
 #!/usr/bin/env python
 """
-Create comprehensive sample data for AdVouch platform testing
+Generate sample data for the AdVouch platform, from a small demo set up to
+benchmark-sized datasets.
+
+    python create_sample_data.py                          # scale 1: 10 businesses, 10k interactions
+    python create_sample_data.py --scale 1000 --workers 8 --flush
+    python create_sample_data.py --businesses 10000 --ads 100000 --interactions 50000000
+
+One unit of --scale is 50 users, 10 businesses, 100 ads and 10,000
+interaction rows; --users/--businesses/--ads/--interactions override the
+individual counts. The same --seed always produces the same data,
+whatever the number of workers.
+
+Users, businesses, ads, media and reputations are inserted with
+bulk_create. Interaction rows (views, clicks, shares, reviews, ratings,
+searches) are generated in fixed-size chunks spread over --workers
+processes and streamed with COPY on PostgreSQL, or inserted in executemany
+batches on SQLite (one worker, since SQLite allows a single writer).
+Reputations are then computed with one grouped query per interaction table.
 """
+import argparse
+import multiprocessing
 import os
+import random
 import sys
+import time
+from datetime import timedelta
+
 import django
-from datetime import datetime, timedelta
-from decimal import Decimal
-import random
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advouch.settings')
 django.setup()
 
-from users.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.db.models import Avg, Count, F
+from django.utils import timezone
+
+from advouch import conditional
+from advouch.db.bulk import write_rows
+from ads.models import Ad, Media
+from business import geo
 from business.models import Business
-from ads.models import Ad
-from interactions.models import AdClick, AdView, SearchQuery, Share, Review, ServiceRatting
-from reputation.models import Reputation
+from interactions.models import AdClick, AdView, Review, SearchQuery, ServiceRatting, Share
+from reputation.models import Reputation, click_through_rate
+from users.models import User
 
-def create_users(count=10):
-    """Create multiple test users"""
-    print(f"\n{'='*60}")
-    print(f"Creating {count} Users...")
-    print(f"{'='*60}")
-    
-    users = []
-    for i in range(1, count + 1):
-        phone = f"+25191234{i:04d}"
-        user, created = User.objects.get_or_create(
-            phone_number=phone,
-            defaults={
-                'email': f'user{i}@advouch.com',
-                'full_name': f'Test User {i}',
-                'gender': random.choice(['Male', 'Female', 'Other']),
-                'public': random.choice([True, False])
-            }
-        )
-        if created:
-            user.set_password('testpass123')
-            user.save()
-            print(f"✓ Created user: {user.full_name} ({user.phone_number})")
-        else:
-            print(f"✓ User exists: {user.full_name} ({user.phone_number})")
-        users.append(user)
-    
-    return users
 
-def create_businesses(users, count=5):
-    """Create multiple test businesses"""
-    print(f"\n{'='*60}")
-    print(f"Creating {count} Businesses...")
-    print(f"{'='*60}")
+SCALE_UNIT = {'users': 50, 'businesses': 10, 'ads': 100, 'interactions': 10_000}
 
-    business_names = [
-        "TechHub Solutions",
-        "Creative Design Studio",
-        "Digital Marketing Pro",
-        "Web Development Co",
-        "Mobile App Experts",
-        "Cloud Services Inc",
-        "Data Analytics Group",
-        "AI Innovation Labs"
-    ]
+# Share of the interaction rows going to each table
+INTERACTION_MIX = {
+    'views': 0.70,
+    'clicks': 0.15,
+    'shares': 0.05,
+    'ratings': 0.04,
+    'reviews': 0.03,
+    'searches': 0.03,
+}
 
-    businesses = []
-    for i in range(count):
-        owner = users[i % len(users)]
-        name = business_names[i % len(business_names)]
+BATCH_SIZE = 10_000  # rows per bulk_create / COPY write / executemany
+CHUNK_ROWS = 250_000  # interaction rows per worker task
 
-        business, created = Business.objects.get_or_create(
-            name=name,
-            owner=owner,
-            defaults={
-                'description': f'Professional {name} providing top-quality services in Addis Ababa',
-                'location': 'Addis Ababa, Ethiopia'
-            }
-        )
-        
-        if created:
-            print(f"✓ Created business: {business.name} (Owner: {owner.full_name})")
-            
-            # Create reputation for business
-            reputation, rep_created = Reputation.objects.get_or_create(
-                business=business,
-                defaults={
-                    'share_count': 0,
-                    'average_ratting': 0.0,
-                    'review_count': 0,
-                    'click_count': 0,
-                    'view_count': 0,
-                    'search_count': 0
-                }
-            )
-            if rep_created:
-                print(f"  ✓ Created reputation for: {business.name}")
-        else:
-            print(f"✓ Business exists: {business.name}")
-        
-        businesses.append(business)
-    
-    return businesses
-
-def create_ads(businesses, users, count=15):
-    """Create multiple test ads"""
+BUSINESS_NAMES = [
+    "TechHub Solutions", "Creative Design Studio", "Digital Marketing Pro", "Web Development Co",
+    "Mobile App Experts", "Cloud Services Inc", "Data Analytics Group", "AI Innovation Labs",
+]
+AD_TITLES = [
+    "Premium Web Development Services", "Professional Graphic Design", "Digital Marketing Solutions",
+    "Mobile App Development", "SEO Optimization Services", "Social Media Management",
+    "Cloud Hosting Solutions", "E-commerce Development", "Brand Identity Design",
+    "Content Writing Services", "Video Production", "UI/UX Design", "Database Management",
+    "Cybersecurity Solutions", "AI & Machine Learning",
+]
+DESCRIPTIONS = [
+    "Transform your business with our cutting-edge solutions",
+    "Professional services tailored to your needs",
+    "Expert team with years of experience",
+    "Affordable pricing with premium quality",
+    "24/7 support and maintenance included",
+]
+# City -> (latitude, longitude) of its centre; businesses are scattered a few km around it
+LOCATIONS = {
+    'Addis Ababa': (9.0300, 38.7400),
+    'Adama': (8.5400, 39.2700),
+    'Bahir Dar': (11.5936, 37.3908),
+    'Hawassa': (7.0621, 38.4764),
+    'Mekelle': (13.4967, 39.4753),
+    'Dire Dawa': (9.6009, 41.8501),
+}
+SEARCH_TERMS = [
+    "web development", "graphic design", "digital marketing", "mobile app",
+    "SEO services", "social media", "cloud hosting", "e-commerce",
+]
+REFERRERS = ['https://google.com', 'https://facebook.com', 'https://t.me', 'direct', '']
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+    'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Mobile Safari/537.36',
+]
+
+# Tables in the order --flush empties them
+GENERATED_MODELS = [AdView, AdClick, Share, Review, ServiceRatting, SearchQuery, Reputation, Media, Ad, Business, User]
+
+
+def print_header(title):
     print(f"\n{'='*60}")
-    print(f"Creating {count} Ads...")
+    print(title)
     print(f"{'='*60}")
 
-    ad_titles = [
-        "Premium Web Development Services",
-        "Professional Graphic Design",
-        "Digital Marketing Solutions",
-        "Mobile App Development",
-        "SEO Optimization Services",
-        "Social Media Management",
-        "Cloud Hosting Solutions",
-        "E-commerce Development",
-        "Brand Identity Design",
-        "Content Writing Services",
-        "Video Production",
-        "UI/UX Design",
-        "Database Management",
-        "Cybersecurity Solutions",
-        "AI & Machine Learning"
-    ]
 
-    descriptions = [
-        "Transform your business with our cutting-edge solutions",
-        "Professional services tailored to your needs",
-        "Expert team with years of experience",
-        "Affordable pricing with premium quality",
-        "24/7 support and maintenance included"
-    ]
+def _bulk_create(model, objects):
+    created = []
+    for start in range(0, len(objects), BATCH_SIZE):
+        created.extend(model.objects.bulk_create(objects[start:start + BATCH_SIZE]))
+    return created
+
 
-    ads = []
-    for i in range(count):
-        business = businesses[i % len(businesses)]
-        owner = users[i % len(users)]
-        title = ad_titles[i % len(ad_titles)]
-
-        ad, created = Ad.objects.get_or_create(
-            title=title,
-            business=business,
-            owner=owner,
-            defaults={
-                'description': descriptions[i % len(descriptions)],
-                'status': random.choice(['draft', 'active', 'active', 'active']),  # More active ads
-                'share_count': 0
-            }
+def create_entities(rng, users, businesses, ads):
+    """
+    Returns (user_ids, business_ids, ad_ids, ad_business_ids), the last
+    giving each ad's business id.
+    """
+    # Every user gets password 'testpass123'; hashing it once keeps this fast
+    password = make_password('testpass123')
+    user_objects = [
+        User(
+            phone_number=f"+2519{index:08d}",
+            email=f"user{index}@advouch.com",
+            full_name=f"Test User {index}",
+            gender=rng.choice(['Male', 'Female', 'Other']),
+            public=rng.random() < 0.6,
+            password=password,
         )
-        
-        if created:
-            print(f"✓ Created ad: {ad.title} (Business: {business.name})")
-        else:
-            print(f"✓ Ad exists: {ad.title}")
-        
-        ads.append(ad)
-    
-    return ads
-
-def create_interactions(users, ads, businesses):
-    """Create realistic interaction data"""
-    print(f"\n{'='*60}")
-    print(f"Creating Interactions...")
-    print(f"{'='*60}")
-    
-    # Create ad clicks
-    click_count = 0
-    for ad in ads:
-        num_clicks = random.randint(5, 50)
-        for _ in range(num_clicks):
-            user = random.choice(users) if random.random() > 0.3 else None
-            click, created = AdClick.objects.get_or_create(
-                ad=ad,
-                user=user,
-                session_id=f'session-{random.randint(1000, 9999)}',
-                defaults={
-                    'ip_address': f'192.168.{random.randint(1, 255)}.{random.randint(1, 255)}',
-                    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-                    'referrer': random.choice(['https://google.com', 'https://facebook.com', 'direct', ''])
-                }
-            )
-            if created:
-                click_count += 1
-    
-    print(f"✓ Created {click_count} ad clicks")
-    
-    # Create ad views
-    view_count = 0
-    for ad in ads:
-        num_views = random.randint(10, 100)
-        for _ in range(num_views):
-            user = random.choice(users) if random.random() > 0.5 else None
-            view, created = AdView.objects.get_or_create(
-                ad=ad,
-                user=user,
-                session_id=f'session-{random.randint(1000, 9999)}',
-                defaults={
-                    'ip_address': f'192.168.{random.randint(1, 255)}.{random.randint(1, 255)}'
-                }
-            )
-            if created:
-                view_count += 1
-    
-    print(f"✓ Created {view_count} ad views")
-    
-    # Create search queries
-    search_queries = [
-        "web development",
-        "graphic design",
-        "digital marketing",
-        "mobile app",
-        "SEO services",
-        "social media",
-        "cloud hosting",
-        "e-commerce"
+        for index in range(1, users + 1)
     ]
-    
-    search_count = 0
-    for _ in range(30):
-        query = random.choice(search_queries)
-        user = random.choice(users) if random.random() > 0.4 else None
-        clicked_ad = random.choice(ads) if random.random() > 0.5 else None
-        
-        search, created = SearchQuery.objects.get_or_create(
-            query=query,
-            user=user,
-            session_id=f'session-{random.randint(1000, 9999)}',
-            defaults={
-                'results_count': random.randint(1, 20),
-                'clicked_ad': clicked_ad
-            }
+    user_ids = [user.pk for user in _bulk_create(User, user_objects)]
+
+    owner_ids = [rng.choice(user_ids) for _ in range(businesses)]
+    business_objects = []
+    for index in range(businesses):
+        name = BUSINESS_NAMES[index % len(BUSINESS_NAMES)]
+        if index >= len(BUSINESS_NAMES):
+            name = f"{name} {index // len(BUSINESS_NAMES) + 1}"
+        location = rng.choice(list(LOCATIONS))
+        latitude, longitude = LOCATIONS[location]
+        latitude, longitude = round(rng.gauss(latitude, 0.03), 6), round(rng.gauss(longitude, 0.03), 6)
+        business_objects.append(Business(
+            name=name,
+            location=f"{location}, Ethiopia",
+            description=f"Professional {name} providing top-quality services in {location}",
+            owner_id=owner_ids[index],
+            latitude=latitude,
+            longitude=longitude,
+            # bulk_create skips Business.save()
+            geohash=geo.encode(latitude, longitude),
+        ))
+    business_ids = [business.pk for business in _bulk_create(Business, business_objects)]
+    _bulk_create(Reputation, [Reputation(business_id=business_id) for business_id in business_ids])
+
+    ad_business = [rng.randrange(businesses) for _ in range(ads)]
+    ad_objects = [
+        Ad(
+            title=AD_TITLES[index % len(AD_TITLES)],
+            description=rng.choice(DESCRIPTIONS),
+            business_id=business_ids[ad_business[index]],
+            owner_id=owner_ids[ad_business[index]],
+            status=rng.choice(['draft', 'active', 'active', 'active', 'active', 'archived']),
         )
-        if created:
-            search_count += 1
-    
-    print(f"✓ Created {search_count} search queries")
-    
-    # Create shares
-    share_count = 0
-    for ad in ads:
-        num_shares = random.randint(1, 10)
-        for _ in range(num_shares):
-            user = random.choice(users) if random.random() > 0.3 else None
-            share = Share.objects.create(
-                ad=ad,
-                user=user
-            )
-            share_count += 1
-
-    print(f"✓ Created {share_count} shares")
-    
-    # Create reviews (reviews are for ads, not businesses)
-    review_count = 0
-    for ad in ads:
-        num_reviews = random.randint(1, 5)
-        for _ in range(num_reviews):
-            user = random.choice(users)
-            review = Review.objects.create(
-                ad=ad,
-                user=user,
-                content=f'Great service! Highly recommended. Very professional work.'
-            )
-            review_count += 1
-
-    print(f"✓ Created {review_count} reviews")
-    
-    # Create service ratings (ratings are for ads, not businesses)
-    rating_count = 0
-    for ad in ads:
-        num_ratings = random.randint(3, 10)
-        for _ in range(num_ratings):
-            user = random.choice(users)
-            rating = ServiceRatting.objects.create(
-                ad=ad,
-                user=user,
-                ratting=random.randint(3, 5)  # Note: field is 'ratting' not 'rating'
-            )
-            rating_count += 1
-
-    print(f"✓ Created {rating_count} service ratings")
-
-def update_reputations(businesses):
-    """Update reputation scores for all businesses"""
-    print(f"\n{'='*60}")
-    print(f"Updating Reputation Scores...")
-    print(f"{'='*60}")
+        for index in range(ads)
+    ]
+    ad_ids = [ad.pk for ad in _bulk_create(Ad, ad_objects)]
+    _bulk_create(Media, [
+        Media(ad_id=ad_id, url=f"https://cdn.advouch.com/ads/{ad_id}/{position}.jpg")
+        for ad_id in ad_ids
+        for position in range(rng.randint(1, 3))
+    ])
+
+    return user_ids, business_ids, ad_ids, [business_ids[index] for index in ad_business]
+
+
+class InteractionGenerator:
+    """
+    Rows for each interaction table, as tuples in COLUMNS order. Ads are
+    picked with a Zipf-like skew so a few ads get most of the traffic.
+    """
+
+    COLUMNS = {
+        'views': (AdView, ['ad_id', 'user_id', 'session_id', 'ip_address', 'is_flagged', 'created_at']),
+        'clicks': (AdClick, ['ad_id', 'user_id', 'session_id', 'ip_address', 'referrer', 'user_agent', 'is_flagged', 'created_at']),
+        'shares': (Share, ['ad_id', 'user_id', 'created_at']),
+        'reviews': (Review, ['ad_id', 'user_id', 'content', 'created_at']),
+        'ratings': (ServiceRatting, ['ad_id', 'user_id', 'ratting', 'created_at']),
+        'searches': (SearchQuery, ['query', 'user_id', 'session_id', 'clicked_ad_id', 'clicked_business_id', 'results_count', 'created_at']),
+    }
+
+    def __init__(self, user_ids, ad_ids, ad_business_ids, now, days):
+        self.user_ids = user_ids
+        self.ad_ids = ad_ids
+        self.ad_business_ids = ad_business_ids
+        self.ad_indexes = range(len(ad_ids))
+        self.ad_weights = []
+        total = 0.0
+        for rank in range(len(ad_ids)):
+            total += 1 / (rank + 1) ** 0.8
+            self.ad_weights.append(total)
+        self.start = now - timedelta(days=days)
+        self.span = days * 86400
+
+    def rows(self, rng, table, count):
+        choice, rand, randrange = rng.choice, rng.random, rng.randrange
+        ad_ids, user_ids = self.ad_ids, self.user_ids
+        picks = rng.choices(self.ad_indexes, cum_weights=self.ad_weights, k=count)
+        start, span = self.start, self.span
+
+        def user(anonymous_share):
+            return None if rand() < anonymous_share else choice(user_ids)
+
+        def when():
+            return start + timedelta(seconds=rand() * span)
+
+        def session():
+            return f"session-{rng.getrandbits(40):010x}"
+
+        def ip():
+            return f"10.{randrange(256)}.{randrange(256)}.{randrange(1, 255)}"
+
+        for ad in picks:
+            if table == 'views':
+                yield (ad_ids[ad], user(0.5), session(), ip(), False, when())
+            elif table == 'clicks':
+                yield (ad_ids[ad], user(0.3), session(), ip(), choice(REFERRERS), choice(USER_AGENTS), False, when())
+            elif table == 'shares':
+                yield (ad_ids[ad], user(0.3), when())
+            elif table == 'reviews':
+                yield (ad_ids[ad], choice(user_ids), 'Great service! Highly recommended. Very professional work.', when())
+            elif table == 'ratings':
+                yield (ad_ids[ad], choice(user_ids), rng.choices((1, 2, 3, 4, 5), (2, 3, 10, 35, 50))[0], when())
+            else:
+                clicked = rand() < 0.4
+                yield (choice(SEARCH_TERMS), user(0.4), session(),
+                       ad_ids[ad] if clicked else None,
+                       self.ad_business_ids[ad] if clicked else None,
+                       randrange(1, 21), when())
+
+
+_generator = None
+_seed = None
+
+
+def _init_worker(user_ids, ad_ids, ad_business_ids, now, days, seed):
+    global _generator, _seed
+    _generator = InteractionGenerator(user_ids, ad_ids, ad_business_ids, now, days)
+    _seed = seed
+
+
+def _write_chunk(task):
+    """
+    Generate and write one chunk. Each chunk has its own random stream, so
+    the data does not depend on how chunks are spread over workers.
+    """
+    table, chunk, count = task
+    rng = random.Random(f"{_seed}:{table}:{chunk}")
+    model, columns = InteractionGenerator.COLUMNS[table]
+    written = write_rows(model, columns, _generator.rows(rng, table, count), BATCH_SIZE)
+    connection.close()
+    return table, written
+
+
+def create_interactions(total, user_ids, ad_ids, ad_business_ids, workers, seed, days):
+    tasks = []
+    for table, share in INTERACTION_MIX.items():
+        rows = int(total * share)
+        for chunk, offset in enumerate(range(0, rows, CHUNK_ROWS)):
+            tasks.append((table, chunk, min(CHUNK_ROWS, rows - offset)))
+
+    init_args = (user_ids, ad_ids, ad_business_ids, timezone.now(), days, seed)
+    written = dict.fromkeys(INTERACTION_MIX, 0)
+
+    if workers <= 1:
+        _init_worker(*init_args)
+        results = map(_write_chunk, tasks)
+        for table, count in results:
+            written[table] += count
+    else:
+        # Children open their own connections; don't let them inherit ours
+        connections.close_all()
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            for table, count in pool.imap_unordered(_write_chunk, tasks):
+                written[table] += count
+
+    for table, count in written.items():
+        model = InteractionGenerator.COLUMNS[table][0]
+        print(f"✓ {model._meta.db_table}: {count} rows")
+    return written
+
+
+def update_reputations():
+    """
+    Reputation for every business from one grouped query per interaction
+    table, instead of update_from_business() per business. Mirrors its
+    rules: flagged clicks and views are excluded.
+    """
+    def per_business(queryset, business_field='ad__business_id', **aggregate):
+        aggregate = aggregate or {'value': Count('id')}
+        return {
+            row['business']: row['value']
+            for row in queryset.values(business=F(business_field)).annotate(**aggregate).order_by()
+        }
+
+    shares = per_business(Share.objects.all())
+    reviews = per_business(Review.objects.all())
+    ratings = per_business(ServiceRatting.objects.all(), value=Avg('ratting'))
+    clicks = per_business(AdClick.objects.filter(is_flagged=False))
+    views = per_business(AdView.objects.filter(is_flagged=False))
+    searches = per_business(SearchQuery.objects.exclude(clicked_business=None), 'clicked_business_id')
+
+    reputations = list(Reputation.objects.all())
+    for reputation in reputations:
+        business_id = reputation.business_id
+        reputation.share_count = shares.get(business_id, 0)
+        reputation.review_count = reviews.get(business_id, 0)
+        reputation.average_ratting = ratings.get(business_id) or 0.0
+        reputation.click_count = clicks.get(business_id, 0)
+        reputation.view_count = views.get(business_id, 0)
+        reputation.click_through_rate = click_through_rate(reputation.click_count, reputation.view_count)
+        reputation.search_count = searches.get(business_id, 0)
+        reputation.calculate_score()
+
+    Reputation.objects.bulk_update(reputations, [
+        'share_count', 'review_count', 'average_ratting', 'click_count', 'view_count',
+        'click_through_rate', 'search_count', 'overall_score',
+    ], batch_size=BATCH_SIZE)
+    print(f"✓ Updated {len(reputations)} reputations")
+
+
+def flush():
+    """
+    Empty the generated tables. On PostgreSQL this is a TRUNCATE ... CASCADE,
+    which also empties tables referencing them (offers, applications, ...).
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in GENERATED_MODELS)
+            cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        else:
+            for model in GENERATED_MODELS:
+                model.objects.all().delete()
+    conditional.bump(User, Business, Ad, Media, Reputation)
+
+
+def dataset_summary():
+    """
+    Row counts per generated table. Uses the planner's estimate on
+    PostgreSQL, since COUNT(*) over tens of millions of rows takes a while.
+    """
+    summary = {}
+    with connection.cursor() as cursor:
+        for model in GENERATED_MODELS:
+            table = model._meta.db_table
+            estimate = -1
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+                row = cursor.fetchone()
+                estimate = row[0] if row else -1
+            summary[table] = estimate if estimate >= 0 else model.objects.count()
+    return summary
+
+
+def generate(users, businesses, ads, interactions, seed=42, workers=1, days=90):
+    started = time.perf_counter()
+
+    print_header(f"Creating {users} users, {businesses} businesses and {ads} ads...")
+    with transaction.atomic():
+        user_ids, business_ids, ad_ids, ad_business_ids = create_entities(random.Random(seed), users, businesses, ads)
+    print(f"✓ Done in {time.perf_counter() - started:.1f}s")
+
+    print_header(f"Creating {interactions} interactions with {workers} worker(s)...")
+    step = time.perf_counter()
+    create_interactions(interactions, user_ids, ad_ids, ad_business_ids, workers, seed, days)
+    print(f"✓ Done in {time.perf_counter() - step:.1f}s")
+
+    print_header("Updating Reputation Scores...")
+    step = time.perf_counter()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    update_reputations()
+    # Bulk writes send no signals; give conditional GETs new versions by hand
+    conditional.bump(User, Business, Ad, Media, Reputation)
+    print(f"✓ Done in {time.perf_counter() - step:.1f}s")
+
+    print_header(f"Summary ({time.perf_counter() - started:.1f}s)")
+    for table, count in dataset_summary().items():
+        print(f"✓ {table:<16} {count}")
 
-    for business in businesses:
-        try:
-            reputation = Reputation.objects.get(business=business)
-            reputation.update_from_business(business)
-            print(f"✓ Updated reputation for {business.name}:")
-            print(f"  - Clicks: {reputation.click_count}")
-            print(f"  - Views: {reputation.view_count}")
-            print(f"  - Shares: {reputation.share_count}")
-            print(f"  - Reviews: {reputation.review_count}")
-            print(f"  - Avg Rating: {reputation.average_ratting}")
-            print(f"  - Score: {reputation.calculate_score():.2f}")
-        except Reputation.DoesNotExist:
-            print(f"✗ No reputation found for {business.name}")
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1, help='Multiplier for the default dataset size')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--businesses', type=int)
+    parser.add_argument('--ads', type=int)
+    parser.add_argument('--interactions', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes generating interaction rows (always 1 on SQLite)')
+    parser.add_argument('--days', type=int, default=90, help='Spread interactions over the last N days')
+    parser.add_argument('--flush', action='store_true', help='Delete existing data in the generated tables first')
+    args = parser.parse_args()
+
+    counts = {
+        name: getattr(args, name) if getattr(args, name) is not None else max(1, int(unit * args.scale))
+        for name, unit in SCALE_UNIT.items()
+    }
+    workers = args.workers if connection.vendor == 'postgresql' else 1
+
     print("\n" + "="*60)
     print("AdVouch Sample Data Generator")
     print("="*60)
-    
-    # Create data
-    users = create_users(10)
-    businesses = create_businesses(users, 5)
-    ads = create_ads(businesses, users, 15)
-    create_interactions(users, ads, businesses)
-    update_reputations(businesses)
-    
-    # Print summary
-    print(f"\n{'='*60}")
-    print("Summary")
-    print(f"{'='*60}")
-    print(f"✓ Users: {User.objects.count()}")
-    print(f"✓ Businesses: {Business.objects.count()}")
-    print(f"✓ Ads: {Ad.objects.count()}")
-    print(f"✓ Ad Clicks: {AdClick.objects.count()}")
-    print(f"✓ Ad Views: {AdView.objects.count()}")
-    print(f"✓ Search Queries: {SearchQuery.objects.count()}")
-    print(f"✓ Shares: {Share.objects.count()}")
-    print(f"✓ Reviews: {Review.objects.count()}")
-    print(f"✓ Service Ratings: {ServiceRatting.objects.count()}")
-    print(f"✓ Reputations: {Reputation.objects.count()}")
-    print(f"{'='*60}\n")
+
+    if args.flush:
+        flush()
+    elif User.objects.exists():
+        sys.exit("The database already has users; pass --flush to replace the existing data")
+
+    generate(counts['users'], counts['businesses'], counts['ads'], counts['interactions'],
+             seed=args.seed, workers=workers, days=args.days)
+
 
 if __name__ == '__main__':
     main()
-
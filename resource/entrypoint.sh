@@ -1,10 +1,32 @@
 #!/bin/sh
 
-echo "Making migrations..."
-python manage.py makemigrations --noinput
+# STARTUP_MODE=production is for images whose migrations are committed:
+# no makemigrations, migrate only when `migrate --check` finds something
+# to apply, and gunicorn --preload so the app (every view, DRF, ...) is
+# imported once in the master and the workers fork with it in memory
+# (advouch/startup.py). The default, development, keeps generating and
+# applying migrations on every start.
+if [ "${STARTUP_MODE:-development}" = "production" ]; then
+    echo "Checking migrations..."
+    if ! python manage.py migrate --check --skip-checks --noinput > /dev/null; then
+        echo "Applying migrations..."
+        python manage.py migrate --noinput || exit 1
+    fi
+    PRELOAD="--preload"
+else
+    echo "Making migrations..."
+    python manage.py makemigrations --noinput
 
-echo "Applying migrations..."
-python manage.py migrate --noinput
+    echo "Applying migrations..."
+    python manage.py migrate --noinput
+    PRELOAD=""
+fi
 
 echo "Starting server..."
-gunicorn advouch.wsgi:application --bind 0.0.0.0:8000 --workers 4
+# SERVER_MODE=asgi runs uvicorn workers under gunicorn so the async views
+# (tracking, ad detail, reputation) don't block a worker on Postgres I/O
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    exec gunicorn advouch.asgi:application --bind 0.0.0.0:8000 --workers 4 --worker-class uvicorn_worker.UvicornWorker $PRELOAD
+else
+    exec gunicorn advouch.wsgi:application --bind 0.0.0.0:8000 --workers 4 $PRELOAD
+fi
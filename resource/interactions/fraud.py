@@ -0,0 +1,151 @@
+"""
+Traffic filtering for the public tracking endpoints.
+
+Every click/view recorded through the track/* endpoints is passed through
+TrafficFilter.inspect() first. Events from known bots or from an IP/session
+that exceeds its token bucket are still stored, but with is_flagged=True so
+they never reach reputation or CTR figures.
+
+Buckets live in process memory, so each worker enforces its own limits.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+# Substrings found in the user agents of crawlers, link previewers and
+# scripted HTTP clients. Matched case-insensitively as one compiled pattern.
+BOT_USER_AGENT_PATTERNS = [
+    'bot',
+    'crawl',
+    'spider',
+    'slurp',
+    'archiver',
+    'facebookexternalhit',
+    'embedly',
+    'preview',
+    'headless',
+    'phantomjs',
+    'selenium',
+    'puppeteer',
+    'playwright',
+    'scrapy',
+    'curl/',
+    'wget/',
+    'httpie/',
+    'python-requests',
+    'python-urllib',
+    'aiohttp',
+    'go-http-client',
+    'okhttp',
+    'java/',
+    'libwww-perl',
+    'apache-httpclient',
+]
+
+BOT_USER_AGENT_RE = re.compile(
+    '|'.join(re.escape(pattern) for pattern in BOT_USER_AGENT_PATTERNS),
+    re.IGNORECASE,
+)
+
+
+def is_bot_user_agent(user_agent):
+    return bool(user_agent) and BOT_USER_AGENT_RE.search(user_agent) is not None
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills at
+    `rate` tokens per second. Each event takes one token.
+    """
+    __slots__ = ('tokens', 'updated_at')
+
+    def __init__(self, capacity, now):
+        self.tokens = float(capacity)
+        self.updated_at = now
+
+    def take(self, rate, capacity, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(capacity, self.tokens + elapsed * rate)
+            self.updated_at = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class BucketTable:
+    """
+    Bounded LRU table of token buckets keyed by IP or session id, so a flood
+    of distinct keys cannot grow memory without limit.
+    """
+
+    def __init__(self, rate, capacity, max_keys):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def take(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.capacity, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(self.rate, self.capacity, now)
+
+
+class TrafficFilter:
+    """
+    Streaming filter applied to each tracked event.
+    inspect() returns None for clean traffic or a short flag reason.
+    """
+
+    def __init__(self, ip_rate, ip_burst, session_rate, session_burst, max_keys=100_000):
+        self._ip_buckets = BucketTable(ip_rate, ip_burst, max_keys)
+        self._session_buckets = BucketTable(session_rate, session_burst, max_keys)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            ip_rate=settings.TRACKING_IP_RATE,
+            ip_burst=settings.TRACKING_IP_BURST,
+            session_rate=settings.TRACKING_SESSION_RATE,
+            session_burst=settings.TRACKING_SESSION_BURST,
+            max_keys=settings.TRACKING_FILTER_MAX_KEYS,
+        )
+
+    def inspect(self, ip_address=None, session_id=None, user_agent=None):
+        if is_bot_user_agent(user_agent):
+            return 'bot_user_agent'
+
+        now = time.monotonic()
+        with self._lock:
+            # Both buckets are charged so a client rotating sessions is
+            # still limited by IP, and vice versa
+            ip_ok = self._ip_buckets.take(ip_address, now) if ip_address else True
+            session_ok = self._session_buckets.take(session_id, now) if session_id else True
+
+        if not ip_ok:
+            return 'ip_rate_limit'
+        if not session_ok:
+            return 'session_rate_limit'
+        return None
+
+
+_traffic_filter = None
+
+
+def get_traffic_filter():
+    global _traffic_filter
+    if _traffic_filter is None:
+        _traffic_filter = TrafficFilter.from_settings()
+    return _traffic_filter
@@ -0,0 +1,131 @@
+"""
+Impressions from the embed tracking pixel.
+
+The pixel is requested from third-party pages on every embed load, so it
+never touches the database. Each impression becomes one JSON line appended
+to a local log file, and the GIF goes back straight away. The log is
+split into segments: every process writes to its own file, and starts a new
+one every IMPRESSION_SEGMENT_SECONDS:
+
+    impressions-<segment start, UTC %Y%m%d%H%M%S>-<pid>.jsonl
+
+`manage.py load_impressions` picks up segments that have ended, inserts
+them into ad_views with one COPY per file and deletes them. Files are
+claimed by renaming them to .loading first. A loader that dies after
+committing but before deleting will load that file again on its next run,
+so delivery is at-least-once.
+
+Bot and rate limit checks use the same in-memory traffic filter as the
+track/* endpoints. Flagged impressions are stored but flagged.
+"""
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from .fraud import get_traffic_filter
+
+
+logger = logging.getLogger(__name__)
+
+# 1x1 transparent GIF
+PIXEL_GIF = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+FILE_PREFIX = 'impressions-'
+SEGMENT_FORMAT = '%Y%m%d%H%M%S'
+MAX_REFERRER_LENGTH = 512  # AdView.referrer
+
+
+def segment_start(path):
+    """Start time (epoch seconds) of the segment a log file belongs to"""
+    stamp = os.path.basename(path)[len(FILE_PREFIX):].split('-', 1)[0]
+    return datetime.strptime(stamp, SEGMENT_FORMAT).replace(tzinfo=dt_timezone.utc).timestamp()
+
+
+class ImpressionLog:
+    """
+    Append-only impression log for this process. A new file is opened per
+    segment and after a fork, so processes never share a file.
+    """
+
+    def __init__(self, directory, segment_seconds):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self._lock = threading.Lock()
+        self._current = None  # (pid, segment number)
+        self._fd = None
+
+    def _open(self, pid, segment):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+        os.makedirs(self.directory, exist_ok=True)
+        started = datetime.fromtimestamp(segment * self.segment_seconds, dt_timezone.utc)
+        path = os.path.join(self.directory, f"{FILE_PREFIX}{started:{SEGMENT_FORMAT}}-{pid}.jsonl")
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._current = (pid, segment)
+
+    def append(self, event, now=None):
+        now = time.time() if now is None else now
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+        key = (os.getpid(), int(now // self.segment_seconds))
+        with self._lock:
+            if key != self._current:
+                self._open(*key)
+            os.write(self._fd, line)
+
+
+_log = None
+
+
+def get_impression_log():
+    global _log
+    if _log is None:
+        _log = ImpressionLog(settings.IMPRESSION_LOG_DIR, settings.IMPRESSION_SEGMENT_SECONDS)
+    return _log
+
+
+def _client_ip(request):
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip_address = x_forwarded_for.split(',')[0].strip()
+    else:
+        ip_address = request.META.get('REMOTE_ADDR')
+    # ad_views.ip_address is an inet column; one bad value would fail a whole COPY
+    try:
+        return str(ipaddress.ip_address(ip_address))
+    except ValueError:
+        return None
+
+
+def record_impression(request, ad_id):
+    """
+    Log one impression of `ad_id`. The embed page passes the embedding
+    page's URL as ?ref=, since the pixel's own Referer is the embed page.
+    Errors are logged and swallowed; the pixel is served regardless.
+    """
+    now = time.time()
+    ip_address = _client_ip(request)
+    referrer = request.GET.get('ref') or request.META.get('HTTP_REFERER') or None
+    flag_reason = get_traffic_filter().inspect(ip_address, None, request.META.get('HTTP_USER_AGENT', ''))
+    try:
+        get_impression_log().append({
+            'ad': ad_id,
+            'at': now,
+            'ip': ip_address,
+            'ref': referrer[:MAX_REFERRER_LENGTH] if referrer else None,
+            'flag': flag_reason,
+        }, now)
+    except OSError:
+        logger.exception("Could not write impression for ad %s", ad_id)
@@ -0,0 +1,93 @@
+"""
+Flag anomalous click bursts per ad.
+
+Meant to run periodically (e.g. from cron every 15 minutes):
+
+    python manage.py flag_click_bursts --hours 24 --bucket minute
+
+Clicks are counted per ad per time bucket over the lookback window. A bucket
+is a burst when it holds at least --min-clicks clicks and sits more than
+--threshold standard deviations above that ad's mean bucket count (empty
+buckets included). Every unflagged click in a burst bucket is flagged, and
+the reputation of the affected businesses is recalculated.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.db.models.functions import TruncHour, TruncMinute
+from django.utils import timezone
+
+from ads.models import Ad
+from business.models import Business
+from interactions.models import AdClick
+from reputation.models import Reputation
+
+
+BUCKETS = {
+    'minute': (TruncMinute, timedelta(minutes=1)),
+    'hour': (TruncHour, timedelta(hours=1)),
+}
+
+
+class Command(BaseCommand):
+    help = 'Flag clicks that belong to anomalous per-ad click bursts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Lookback window in hours')
+        parser.add_argument('--bucket', choices=sorted(BUCKETS), default='minute')
+        parser.add_argument('--threshold', type=float, default=4.0, help='Z-score above which a bucket is a burst')
+        parser.add_argument('--min-clicks', type=int, default=20, help='Ignore buckets with fewer clicks than this')
+        parser.add_argument('--dry-run', action='store_true', help='Report bursts without flagging')
+        parser.add_argument('--skip-reputation', action='store_true', help='Do not recalculate reputation afterwards')
+
+    def handle(self, *args, **options):
+        trunc, bucket_size = BUCKETS[options['bucket']]
+        since = timezone.now() - timedelta(hours=options['hours'])
+        bucket_total = max(1, int(timedelta(hours=options['hours']) / bucket_size))
+
+        rows = (
+            AdClick.objects
+            .filter(created_at__gte=since)
+            .annotate(bucket=trunc('created_at'))
+            .values('ad_id', 'bucket')
+            .annotate(clicks=Count('id'))
+        )
+
+        per_ad = defaultdict(list)
+        for row in rows.iterator():
+            per_ad[row['ad_id']].append((row['bucket'], row['clicks']))
+
+        bursts = []
+        for ad_id, buckets in per_ad.items():
+            counts = [clicks for _, clicks in buckets]
+            mean = sum(counts) / bucket_total
+            variance = sum(c * c for c in counts) / bucket_total - mean * mean
+            std = math.sqrt(max(variance, 0.0))
+            for bucket, clicks in buckets:
+                if clicks >= options['min_clicks'] and clicks > mean + options['threshold'] * std:
+                    bursts.append((ad_id, bucket, clicks))
+
+        flagged = 0
+        for ad_id, bucket, clicks in bursts:
+            self.stdout.write(f"Burst on ad {ad_id}: {clicks} clicks in {options['bucket']} starting {bucket.isoformat()}")
+            if options['dry_run']:
+                continue
+            flagged += AdClick.objects.filter(
+                ad_id=ad_id,
+                created_at__gte=bucket,
+                created_at__lt=bucket + bucket_size,
+                is_flagged=False,
+            ).update(is_flagged=True, flag_reason='click_burst')
+
+        if flagged and not options['skip_reputation']:
+            business_ids = set(
+                Ad.objects.filter(id__in={ad_id for ad_id, _, _ in bursts}).values_list('business_id', flat=True)
+            )
+            for business in Business.objects.filter(id__in=business_ids):
+                reputation, _ = Reputation.objects.get_or_create(business=business)
+                reputation.update_from_business(business)
+
+        self.stdout.write(self.style.SUCCESS(f"Found {len(bursts)} bursts, flagged {flagged} clicks"))
@@ -0,0 +1,95 @@
+"""
+Load embed pixel impressions from the local log into ad_views.
+
+Meant to run periodically on every host serving the pixel (e.g. from cron
+every minute):
+
+    python manage.py load_impressions
+
+Runs must not overlap (wrap the cron entry in flock). Only segments that
+ended more than --grace seconds ago are loaded, so no process is still
+writing to them. Impressions of ads that no longer exist and lines that
+are not valid JSON (e.g. a write cut off by a crash) are skipped and
+counted.
+"""
+import glob
+import json
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ads.models import Ad
+from advouch.db.bulk import write_rows
+from interactions.impressions import FILE_PREFIX, segment_start
+from interactions.models import AdView
+
+
+COLUMNS = ['ad_id', 'ip_address', 'referrer', 'is_flagged', 'flag_reason', 'created_at']
+
+
+def read_events(path):
+    """(events, number of unreadable lines) for one log file"""
+    events, bad = [], 0
+    with open(path, 'rb') as log:
+        for line in log:
+            try:
+                event = json.loads(line)
+                events.append((int(event['ad']), float(event['at']), event))
+            except (ValueError, KeyError, TypeError):
+                bad += 1
+    return events, bad
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load embed pixel impressions from the impression log into ad_views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log-dir', default=settings.IMPRESSION_LOG_DIR)
+        parser.add_argument('--grace', type=float, default=5.0,
+                            help='Seconds to wait after a segment ends before loading it')
+
+    def handle(self, *args, **options):
+        log_dir = options['log_dir']
+        cutoff = time.time() - settings.IMPRESSION_SEGMENT_SECONDS - options['grace']
+
+        # .loading files were claimed by a run that did not finish; retry them
+        paths = sorted(glob.glob(os.path.join(log_dir, f'{FILE_PREFIX}*.loading')))
+        for path in sorted(glob.glob(os.path.join(log_dir, f'{FILE_PREFIX}*.jsonl'))):
+            if segment_start(path) > cutoff:
+                continue
+            claimed = path[:-len('.jsonl')] + '.loading'
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            paths.append(claimed)
+
+        totals = {'files': 0, 'loaded': 0, 'unknown_ad': 0, 'unreadable': 0}
+        for path in paths:
+            events, bad = read_events(path)
+            existing = set(Ad.objects.filter(id__in={ad_id for ad_id, _, _ in events}).values_list('id', flat=True))
+            rows = [
+                (
+                    ad_id,
+                    event.get('ip'),
+                    event.get('ref'),
+                    bool(event.get('flag')),
+                    event.get('flag'),
+                    datetime.fromtimestamp(at, dt_timezone.utc),
+                )
+                for ad_id, at, event in events
+                if ad_id in existing
+            ]
+            totals['loaded'] += write_rows(AdView, COLUMNS, rows)
+            totals['unknown_ad'] += len(events) - len(rows)
+            totals['unreadable'] += bad
+            totals['files'] += 1
+            os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {totals['loaded']} impressions from {totals['files']} file(s); "
+            f"skipped {totals['unknown_ad']} for unknown ads and {totals['unreadable']} unreadable lines"
+        ))
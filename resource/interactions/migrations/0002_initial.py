@@ -0,0 +1,104 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('ads', '0003_initial'),
+        ('business', '0002_initial'),
+        ('interactions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adclick',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ad_clicks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='adview',
+            name='ad',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='views', to='ads.ad'),
+        ),
+        migrations.AddField(
+            model_name='adview',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ad_views', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='ad',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ad_review', to='ads.ad'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviewer', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='clicked_ad',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='search_clicks', to='ads.ad'),
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='clicked_business',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='search_clicks', to='business.business'),
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='searches', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='serviceratting',
+            name='ad',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ad_rratting', to='ads.ad'),
+        ),
+        migrations.AddField(
+            model_name='serviceratting',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratting', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='share',
+            name='ad',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ad_share', to='ads.ad'),
+        ),
+        migrations.AddField(
+            model_name='share',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='user_share', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='adclick',
+            index=models.Index(fields=['ad', 'created_at'], name='ad_clicks_ad_id_5ad521_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adclick',
+            index=models.Index(fields=['user', 'created_at'], name='ad_clicks_user_id_7f98c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adview',
+            index=models.Index(fields=['ad', 'created_at'], name='ad_views_ad_id_4a5548_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adview',
+            index=models.Index(fields=['user', 'created_at'], name='ad_views_user_id_699016_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchquery',
+            index=models.Index(fields=['query', 'created_at'], name='search_quer_query_f94864_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchquery',
+            index=models.Index(fields=['user', 'created_at'], name='search_quer_user_id_175990_idx'),
+        ),
+    ]
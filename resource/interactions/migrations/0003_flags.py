@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adclick',
+            name='flag_reason',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='adclick',
+            name='is_flagged',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='adview',
+            name='flag_reason',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='adview',
+            name='is_flagged',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0003_flags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['ad', 'created_at'], name='reviews_ad_id_fd521c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceratting',
+            index=models.Index(fields=['ad', 'created_at'], name='ratings_ad_id_b86141_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='share',
+            index=models.Index(fields=['ad', 'created_at'], name='shares_ad_id_9283d9_idx'),
+        ),
+    ]
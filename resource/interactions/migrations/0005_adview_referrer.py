@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0004_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adview',
+            name='referrer',
+            field=models.CharField(blank=True, max_length=512, null=True),
+        ),
+    ]
@@ -8,6 +8,9 @@ class Share(models.Model):
 
     class Meta:
         db_table = 'shares'
+        indexes = [
+            models.Index(fields=['ad', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Share of ad {self.ad.id} by user {self.user.id if self.user else 'anonymous'}"
@@ -21,6 +24,9 @@ class Review(models.Model):
 
     class Meta:
         db_table = 'reviews'
+        indexes = [
+            models.Index(fields=['ad', 'created_at']),
+        ]
 
     def __str__(self):
         return f"user {self.user} reviewed {self.ad}"
@@ -34,6 +40,9 @@ class ServiceRatting(models.Model):
 
     class Meta:
         db_table = 'ratings'
+        indexes = [
+            models.Index(fields=['ad', 'created_at']),
+        ]
 
     def __str__(self):
         return f"user {self.user} rated {self.ad}"
@@ -49,6 +58,10 @@ class AdClick(models.Model):
     # Track where the click came from
     referrer = models.CharField(max_length=512, null=True, blank=True)
     user_agent = models.CharField(max_length=512, null=True, blank=True)
+    # Set by the tracking filter or the burst detector; flagged rows are kept
+    # for auditing but excluded from reputation and CTR figures
+    is_flagged = models.BooleanField(default=False)
+    flag_reason = models.CharField(max_length=32, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -68,6 +81,10 @@ class AdView(models.Model):
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='ad_views', null=True, blank=True)
     session_id = models.CharField(max_length=255, null=True, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Page the ad was shown on; set for impressions from the embed pixel
+    referrer = models.CharField(max_length=512, null=True, blank=True)
+    is_flagged = models.BooleanField(default=False)
+    flag_reason = models.CharField(max_length=32, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -3,7 +3,8 @@ from .views import (
     ListReviews, ListRattings, CreateReview, CreateRatting,
     UpdateReview, UpdateRattting, DeleteRatting, DeleteReview,
     ListShares, CreateShare,
-    TrackAdClickView, TrackAdViewView, TrackShareView, TrackSearchView
+    TrackAdClickView, TrackAdViewView, TrackShareView, TrackSearchView,
+    ExportInteractionsView
 )
 
 urlpatterns = [
@@ -28,4 +29,7 @@ urlpatterns = [
     path('track/view/', TrackAdViewView.as_view(), name='track-view'),
     path('track/share/', TrackShareView.as_view(), name='track-share'),
     path('track/search/', TrackSearchView.as_view(), name='track-search'),
+
+    # Export (business owners)
+    path('business/<int:business_id>/interactions/export/', ExportInteractionsView.as_view(), name='export-interactions'),
 ]
\ No newline at end of file
@@ -11,12 +11,23 @@ from rest_framework.response import Response
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
 from users.permission import IsAuthenticated, IsOwner
+from users.ownership import OwnerScopedMixin
 from users.authentication import JWTAuthentication
+from users.throttling import RateLimitThrottle
 from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from business.models import Business
+from ads.models import Ad
+from . import export
+from .fraud import get_traffic_filter
+from advouch.views import AsyncAPIView
+from advouch.db.replicas import ReplicaReadMixin
+from advouch.serialization import FastListMixin
 
 
 
-class ListReviews(ListAPIView):
+class ListReviews(FastListMixin, ReplicaReadMixin, ListAPIView):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     pagination_class = InteractionPagination
@@ -36,25 +47,27 @@ class CreateReview(CreateAPIView):
     serializer_class = ReviewSerializer
 
 
-class UpdateReview(UpdateAPIView):
+class UpdateReview(OwnerScopedMixin, UpdateAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
+    owner_field = 'user'
     
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     lookup_field = 'id'
 
 
-class DeleteReview(DestroyAPIView):
+class DeleteReview(OwnerScopedMixin, DestroyAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
+    owner_field = 'user'
     
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     lookup_field = 'id'
 
 
-class ListRattings(ListAPIView):
+class ListRattings(FastListMixin, ReplicaReadMixin, ListAPIView):
     queryset = ServiceRatting.objects.all()
     serializer_class = RattingSerializer
     pagination_class = InteractionPagination
@@ -75,18 +88,20 @@ class CreateRatting(CreateAPIView):
     serializer_class = RattingSerializer
     
 
-class UpdateRattting(UpdateAPIView):
+class UpdateRattting(OwnerScopedMixin, UpdateAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
+    owner_field = 'user'
 
     queryset = ServiceRatting.objects.all()
     serializer_class = RattingSerializer
     lookup_field = 'id'
 
 
-class DeleteRatting(DestroyAPIView):
+class DeleteRatting(OwnerScopedMixin, DestroyAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsOwner]
+    owner_field = 'user'
 
     queryset = ServiceRatting.objects.all()
     serializer_class = RattingSerializer
@@ -97,7 +112,7 @@ class DeleteRatting(DestroyAPIView):
 # SHARE VIEWS
 # ============================================================================
 
-class ListShares(ListAPIView):
+class ListShares(FastListMixin, ReplicaReadMixin, ListAPIView):
     queryset = Share.objects.all()
     serializer_class = ShareSerializer
     pagination_class = InteractionPagination
@@ -120,13 +135,16 @@ class CreateShare(CreateAPIView):
 # INTERACTION TRACKING VIEWS (Public endpoints for analytics)
 # ============================================================================
 
-class TrackAdClickView(APIView):
+class TrackAdClickView(AsyncAPIView):
     """
     Track ad clicks - can be called by authenticated or anonymous users
     POST /api/v1/interactions/track/click/
     Body: {"ad_id": 123, "referrer": "...", "user_agent": "..."}
     """
-    def post(self, request):
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'tracking'
+
+    async def post(self, request):
         serializer = TrackClickSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -143,17 +161,24 @@ class TrackAdClickView(APIView):
         # Get session ID
         session_id = request.session.session_key
         if not session_id:
-            request.session.create()
+            await request.session.acreate()
             session_id = request.session.session_key
 
+        user_agent = serializer.validated_data.get('user_agent', request.META.get('HTTP_USER_AGENT', ''))
+
+        # Bots and over-limit clients are recorded but flagged
+        flag_reason = get_traffic_filter().inspect(ip_address, session_id, user_agent)
+
         # Create click record
-        click = AdClick.objects.create(
+        click = await AdClick.objects.acreate(
             ad_id=ad_id,
             user=request.user if request.user.is_authenticated else None,
             session_id=session_id,
             ip_address=ip_address,
             referrer=serializer.validated_data.get('referrer', ''),
-            user_agent=serializer.validated_data.get('user_agent', request.META.get('HTTP_USER_AGENT', ''))
+            user_agent=user_agent,
+            is_flagged=flag_reason is not None,
+            flag_reason=flag_reason
         )
 
         return Response({
@@ -163,13 +188,16 @@ class TrackAdClickView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class TrackAdViewView(APIView):
+class TrackAdViewView(AsyncAPIView):
     """
     Track ad views/impressions
     POST /api/v1/interactions/track/view/
     Body: {"ad_id": 123}
     """
-    def post(self, request):
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'tracking'
+
+    async def post(self, request):
         serializer = TrackViewSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -186,15 +214,21 @@ class TrackAdViewView(APIView):
         # Get session ID
         session_id = request.session.session_key
         if not session_id:
-            request.session.create()
+            await request.session.acreate()
             session_id = request.session.session_key
 
+        flag_reason = get_traffic_filter().inspect(
+            ip_address, session_id, request.META.get('HTTP_USER_AGENT', '')
+        )
+
         # Create view record
-        view = AdView.objects.create(
+        view = await AdView.objects.acreate(
             ad_id=ad_id,
             user=request.user if request.user.is_authenticated else None,
             session_id=session_id,
-            ip_address=ip_address
+            ip_address=ip_address,
+            is_flagged=flag_reason is not None,
+            flag_reason=flag_reason
         )
 
         return Response({
@@ -204,13 +238,16 @@ class TrackAdViewView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class TrackShareView(APIView):
+class TrackShareView(AsyncAPIView):
     """
     Track ad shares
     POST /api/v1/interactions/track/share/
     Body: {"ad_id": 123}
     """
-    def post(self, request):
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'tracking'
+
+    async def post(self, request):
         serializer = TrackShareSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -218,7 +255,7 @@ class TrackShareView(APIView):
         ad_id = serializer.validated_data['ad_id']
 
         # Create share record
-        share = Share.objects.create(
+        share = await Share.objects.acreate(
             ad_id=ad_id,
             user=request.user if request.user.is_authenticated else None
         )
@@ -230,13 +267,16 @@ class TrackShareView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class TrackSearchView(APIView):
+class TrackSearchView(AsyncAPIView):
     """
     Track search queries
     POST /api/v1/interactions/track/search/
     Body: {"query": "coffee shop", "results_count": 5, "clicked_ad_id": 123}
     """
-    def post(self, request):
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'tracking'
+
+    async def post(self, request):
         serializer = TrackSearchSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -244,11 +284,11 @@ class TrackSearchView(APIView):
         # Get session ID
         session_id = request.session.session_key
         if not session_id:
-            request.session.create()
+            await request.session.acreate()
             session_id = request.session.session_key
 
         # Create search record
-        search = SearchQuery.objects.create(
+        search = await SearchQuery.objects.acreate(
             query=serializer.validated_data['query'],
             user=request.user if request.user.is_authenticated else None,
             session_id=session_id,
@@ -262,3 +302,65 @@ class TrackSearchView(APIView):
             'search_id': search.id,
             'message': 'Search tracked successfully'
         }, status=status.HTTP_201_CREATED)
+
+
+class ExportInteractionsView(APIView):
+    """
+    Stream a business's clicks, views and shares (owner only)
+    GET /api/v1/business/{business_id}/interactions/export/
+    Query params:
+        output=csv|ndjson        (default csv)
+        granularity=event|day    individual events or daily counts per ad (default event)
+        events=click,view,share  (default all three)
+        since, until             ISO date or datetime; until is exclusive, a bare date includes that day
+        gzip=true                compress on the fly (Content-Encoding: gzip)
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'export'
+
+    OUTPUTS = {
+        'csv': (export.encode_csv, 'text/csv; charset=utf-8'),
+        'ndjson': (export.encode_ndjson, 'application/x-ndjson'),
+    }
+
+    def get(self, request, business_id):
+        business = get_object_or_404(Business, id=business_id, owner=request.user)
+
+        output = request.query_params.get('output', 'csv')
+        granularity = request.query_params.get('granularity', 'event')
+        events = request.query_params.get('events', ','.join(export.EVENT_SOURCES)).split(',')
+        if output not in self.OUTPUTS:
+            return Response({'error': f"output must be one of {', '.join(self.OUTPUTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if granularity not in ('event', 'day'):
+            return Response({'error': 'granularity must be event or day'}, status=status.HTTP_400_BAD_REQUEST)
+        unknown = [event for event in events if event not in export.EVENT_SOURCES]
+        if unknown:
+            return Response({'error': f"Unknown events: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            since = export.parse_bound(request.query_params['since']) if request.query_params.get('since') else None
+            until = export.parse_bound(request.query_params['until'], end=True) if request.query_params.get('until') else None
+        except ValueError as e:
+            return Response({'error': f'Invalid date: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Filtering on the ad ids directly (rather than joining ads) lets each
+        # table use its (ad, created_at) index
+        ad_ids = list(Ad.objects.filter(business=business).values_list('id', flat=True))
+
+        if granularity == 'day':
+            rows, columns = export.rollup_rows(ad_ids, events, since, until), export.ROLLUP_COLUMNS
+        else:
+            rows, columns = export.event_rows(ad_ids, events, since, until), export.EVENT_COLUMNS
+
+        encode, content_type = self.OUTPUTS[output]
+        compress = request.query_params.get('gzip', '').lower() == 'true'
+        response = StreamingHttpResponse(
+            export.buffered(encode(rows, columns), compress=compress),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="business-{business.id}-interactions-{granularity}.{output}"'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1,216 @@
+"""
+Offer matching from engagement history.
+
+Each user is a sparse vector over businesses. The raw weight for
+(user, business) is the number of unflagged clicks on the business's ads,
+plus MATCHING_SHARE_WEIGHT for each share. Scoring uses log1p of that
+weight, so a handful of heavy clickers can't drown everyone else out. The
+index keeps two views of the same numbers: user -> {business: weight}, and
+the transposed business -> {user: weight} postings.
+
+Business similarity is cosine similarity between business columns. It is
+computed on demand from one business's postings, touching only the users
+who engaged with it, and at most MATCHING_MAX_POSTINGS of those (the most
+engaged ones), so a business everyone clicks on stays cheap. Similarities
+and top postings are cached until the next update.
+
+    candidate_scores(B)  users scored by their engagement with B and with
+                         the MATCHING_NEIGHBOURS businesses most similar to B
+    business_scores(u)   businesses scored by similarity to the ones u
+                         engaged with; the views map them to open offers
+
+Both accumulate scores over postings and top_k() picks the best with heapq,
+so the cost grows with the postings touched, not with the number of users.
+
+The index lives in process memory. It is built on first use. After that,
+a query arriving more than MATCHING_REFRESH_SECONDS after the last update
+first adds the clicks and shares with ids above the last ones seen.
+Clicks flagged after they were indexed (flag_click_bursts) drop out at the
+next full rebuild, every MATCHING_REBUILD_SECONDS. A rebuild reads every
+click and share, so it runs outside the lock: one thread builds the new
+index while queries keep using the old one, which is then swapped out.
+"""
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+
+from interactions.models import AdClick, Share
+
+
+class EngagementIndex:
+    def __init__(self, share_weight, neighbours, max_postings):
+        self.share_weight = share_weight
+        self.neighbours = neighbours
+        self.max_postings = max_postings
+        self.users = defaultdict(dict)     # user id -> {business id: raw weight}
+        self.postings = defaultdict(dict)  # business id -> {user id: raw weight}
+        self.norms = defaultdict(float)    # business id -> squared norm of its scored column
+        self.last_click_id = 0
+        self.last_share_id = 0
+        # Derived per business on first use, dropped whenever update() adds rows
+        self._top_users = {}
+        self._similar = {}
+
+    def add(self, user_id, business_id, weight):
+        previous = self.users[user_id].get(business_id, 0.0)
+        current = previous + weight
+        self.users[user_id][business_id] = current
+        self.postings[business_id][user_id] = current
+        self.norms[business_id] += math.log1p(current) ** 2 - math.log1p(previous) ** 2
+
+    def _grouped(self, queryset, last_id):
+        """(user, business, count) for rows after last_id, and the new last id"""
+        upto = queryset.filter(id__gt=last_id).aggregate(upto=Max('id'))['upto']
+        if upto is None:
+            return [], last_id
+        rows = (
+            queryset.filter(id__gt=last_id, id__lte=upto, user__isnull=False)
+            .values_list('user_id', F('ad__business_id'))
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        return rows.iterator(chunk_size=10_000), upto
+
+    def update(self):
+        """Add clicks and shares recorded since the last update"""
+        added = False
+        clicks, self.last_click_id = self._grouped(AdClick.objects.filter(is_flagged=False), self.last_click_id)
+        for user_id, business_id, count in clicks:
+            self.add(user_id, business_id, count)
+            added = True
+        shares, self.last_share_id = self._grouped(Share.objects.all(), self.last_share_id)
+        for user_id, business_id, count in shares:
+            self.add(user_id, business_id, count * self.share_weight)
+            added = True
+        if added:
+            self._top_users.clear()
+            self._similar.clear()
+
+    def top_users(self, business_id):
+        """
+        [(score, user id)] for the business's max_postings most engaged
+        users. Queries only walk these, which bounds their cost for
+        businesses with very many engaged users.
+        """
+        top = self._top_users.get(business_id)
+        if top is None:
+            top = heapq.nlargest(self.max_postings, (
+                (math.log1p(weight), user_id) for user_id, weight in self.postings.get(business_id, {}).items()
+            ))
+            self._top_users[business_id] = top
+        return top
+
+    def similar_businesses(self, business_id):
+        """[(similarity, business id)] for the businesses most like `business_id`"""
+        similar = self._similar.get(business_id)
+        if similar is not None:
+            return similar
+        dots = defaultdict(float)
+        for score, user_id in self.top_users(business_id):
+            for other, other_weight in self.users[user_id].items():
+                if other != business_id:
+                    dots[other] += score * math.log1p(other_weight)
+        norm = math.sqrt(self.norms[business_id])
+        similar = heapq.nlargest(self.neighbours, (
+            (dot / (norm * math.sqrt(self.norms[other])), other) for other, dot in dots.items()
+        ))
+        self._similar[business_id] = similar
+        return similar
+
+    def candidates(self, business_id):
+        """
+        {user id: score} for users who engaged with `business_id` or one of
+        its nearest businesses, each business weighted by its similarity
+        """
+        scores = defaultdict(float)
+        for similarity, other in [(1.0, business_id)] + self.similar_businesses(business_id):
+            for score, user_id in self.top_users(other):
+                scores[user_id] += similarity * score
+        return scores
+
+    def recommended(self, user_id):
+        """{business id: score} for businesses like the ones `user_id` engaged with"""
+        scores = defaultdict(float)
+        for business_id, weight in self.users.get(user_id, {}).items():
+            scored = math.log1p(weight)
+            scores[business_id] += scored
+            for similarity, other in self.similar_businesses(business_id):
+                scores[other] += scored * similarity
+        return scores
+
+
+_index = None
+_index_built_at = 0.0
+_index_updated_at = 0.0
+# Guards the index; queries hold it too, since update() mutates the dicts they walk
+_lock = threading.Lock()
+# Held by the one thread building a replacement index
+_rebuild_lock = threading.Lock()
+
+
+def _stale():
+    return _index is None or time.monotonic() - _index_built_at > settings.MATCHING_REBUILD_SECONDS
+
+
+def _rebuild():
+    """Build a new index without holding _lock and swap it in"""
+    global _index, _index_built_at, _index_updated_at
+    # Other threads keep querying the current index, unless there is none yet
+    if not _rebuild_lock.acquire(blocking=_index is None):
+        return
+    try:
+        if not _stale():  # another thread rebuilt it while this one waited
+            return
+        started = time.monotonic()
+        index = EngagementIndex(
+            settings.MATCHING_SHARE_WEIGHT, settings.MATCHING_NEIGHBOURS, settings.MATCHING_MAX_POSTINGS,
+        )
+        index.update()
+        with _lock:
+            _index, _index_built_at, _index_updated_at = index, started, started
+    finally:
+        _rebuild_lock.release()
+
+
+def _current_index():
+    """The index with the rows added since its last update; call with _lock held"""
+    global _index_updated_at
+    now = time.monotonic()
+    if now - _index_updated_at > settings.MATCHING_REFRESH_SECONDS:
+        _index.update()
+        _index_updated_at = now
+    return _index
+
+
+def candidate_scores(business_id):
+    if _stale():
+        _rebuild()
+    with _lock:
+        return _current_index().candidates(business_id)
+
+
+def business_scores(user_id):
+    if _stale():
+        _rebuild()
+    with _lock:
+        return _current_index().recommended(user_id)
+
+
+def top_k(scores, k, keep):
+    """
+    The `k` highest-scoring keys of `scores` that pass `keep(batch of keys)`,
+    which returns the kept subset of a batch (typically one query)
+    """
+    ranked = []
+    offset, batch = 0, max(k * 4, 50)
+    while len(ranked) < k and offset < len(scores):
+        chunk = heapq.nlargest(offset + batch, scores.items(), key=lambda item: item[1])[offset:]
+        kept = keep([key for key, _ in chunk])
+        ranked.extend((key, score) for key, score in chunk if key in kept)
+        offset, batch = offset + batch, batch * 2
+    return ranked[:k]
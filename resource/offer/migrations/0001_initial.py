@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('ads', '0001_initial'),
+        ('business', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Offer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('maximum_offer_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('Active', 'Active'), ('Inactive', 'Inactive')], default='active', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('ad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='ads.ad')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='business.business')),
+            ],
+            options={
+                'db_table': 'offers',
+            },
+        ),
+    ]
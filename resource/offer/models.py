@@ -14,4 +14,8 @@ class Offer(models.Model):
 
     class Meta:
         db_table = 'offers'
+        indexes = [
+            # ListOffer filters on status
+            models.Index(fields=['status', '-created_at'], name='offers_status_created_idx'),
+        ]
     
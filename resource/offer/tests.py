@@ -1,3 +1,39 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from . import matching
+
+
+@override_settings(MATCHING_REFRESH_SECONDS=3600, MATCHING_REBUILD_SECONDS=3600)
+class IndexRebuildTests(TestCase):
+    def setUp(self):
+        def reset():
+            matching._index, matching._index_built_at, matching._index_updated_at = None, 0.0, 0.0
+        reset()
+        self.addCleanup(reset)
+
+    def test_queries_use_the_old_index_during_a_rebuild(self):
+        matching.candidate_scores(1)
+        old = matching._index
+        matching._index_built_at -= 7200
+
+        building, release = threading.Event(), threading.Event()
+
+        def slow_update(index):
+            building.set()
+            release.wait(5)
+
+        with mock.patch.object(matching.EngagementIndex, 'update', slow_update):
+            rebuild = threading.Thread(target=matching.candidate_scores, args=(1,))
+            rebuild.start()
+            self.assertTrue(building.wait(5))
+            # Not blocked behind the rebuild, and still answered from the old index
+            self.assertEqual(matching.business_scores(1), {})
+            self.assertIs(matching._index, old)
+            release.set()
+            rebuild.join(5)
+
+        self.assertIsNot(matching._index, old)
+        self.assertFalse(matching._stale())
@@ -1,11 +1,13 @@
 from django.urls import path
-from .views import ListOffer, CreateOffer, UpdateOffer, DeleteOffer
+from .views import ListOffer, CreateOffer, UpdateOffer, DeleteOffer, OfferCandidatesView, RecommendedOffersView
 
 urlpatterns =[
     path('offer/', ListOffer.as_view(), name='list-offers'),
     path('offer/<int:id>/',UpdateOffer.as_view(), name='update-offer'),
     path('offer/', CreateOffer.as_view(), name='create-offer'),
-    path('offer/', DeleteOffer.as_view(), name='delete-offer')
+    path('offer/', DeleteOffer.as_view(), name='delete-offer'),
+    path('offer/<int:offer_id>/candidates/', OfferCandidatesView.as_view(), name='offer-candidates'),
+    path('offer/recommended/', RecommendedOffersView.as_view(), name='recommended-offers'),
     
     
 ]
\ No newline at end of file
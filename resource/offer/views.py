@@ -1,8 +1,19 @@
 from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 from .models import Offer
 from .pagination import OfferPagination
 from .serializers import OfferSerializer
-from rest_framework import filters
+from . import matching
+from rest_framework import filters, status
+from users.authentication import JWTAuthentication
+from users.models import User
+from users.permission import IsAuthenticated
+
+
+# 'active' is the model default, 'Active' the choice value
+OPEN_STATUSES = ('active', 'Active')
 
 
 # Create your views here.
@@ -32,4 +43,83 @@ class UpdateOffer(UpdateAPIView):
 class DeleteOffer(DestroyAPIView):
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
-    lookup_field = 'id'
\ No newline at end of file
+    lookup_field = 'id'
+
+
+class OfferCandidatesView(APIView):
+    """
+    Public users most likely to take up an offer, ranked by engagement with
+    the offer's business and similar businesses (business owner only)
+    GET /api/v1/offer/{offer_id}/candidates/?k=20
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, offer_id):
+        offer = get_object_or_404(Offer.objects.select_related('business'), id=offer_id)
+        if offer.business.owner_id != request.user.id:
+            return Response(
+                {'error': 'You do not have permission to view candidates for this offer'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        k = _top_k_param(request)
+
+        applied = set(offer.applications.values_list('user_id', flat=True))
+        applied.add(offer.business.owner_id)
+
+        def keep(user_ids):
+            return set(User.objects.filter(id__in=user_ids, public=True).values_list('id', flat=True)) - applied
+
+        ranked = matching.top_k(matching.candidate_scores(offer.business_id), k, keep)
+        users = User.objects.in_bulk([user_id for user_id, _ in ranked])
+        return Response({
+            'offer_id': offer.id,
+            'candidates': [
+                {'user_id': user_id, 'full_name': users[user_id].full_name, 'score': round(score, 4)}
+                for user_id, score in ranked if user_id in users
+            ],
+        })
+
+
+class RecommendedOffersView(APIView):
+    """
+    Open offers for the current user, ranked by similarity of the offering
+    business to the businesses they engaged with
+    GET /api/v1/offer/recommended/?k=20
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        k = _top_k_param(request)
+        scores = matching.business_scores(request.user.id)
+        applied = set(request.user.applications.values_list('offer_id', flat=True))
+
+        # Rank businesses, then list each one's open offers, newest first
+        def keep(business_ids):
+            return set(
+                Offer.objects.filter(business_id__in=business_ids, status__in=OPEN_STATUSES)
+                .exclude(id__in=applied).values_list('business_id', flat=True)
+            )
+
+        ranked = matching.top_k(scores, k, keep)
+        offers = (
+            Offer.objects.filter(business_id__in=[business_id for business_id, _ in ranked], status__in=OPEN_STATUSES)
+            .exclude(id__in=applied).order_by('-created_at')
+        )
+        by_business = {}
+        for offer in offers:
+            by_business.setdefault(offer.business_id, []).append(offer)
+
+        results = []
+        for business_id, score in ranked:
+            for offer in by_business.get(business_id, []):
+                results.append({**OfferSerializer(offer).data, 'score': round(score, 4)})
+        return Response({'results': results[:k]})
+
+
+def _top_k_param(request, default=20, maximum=100):
+    try:
+        return max(1, min(int(request.query_params.get('k', default)), maximum))
+    except ValueError:
+        return default
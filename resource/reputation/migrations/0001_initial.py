@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('business', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reputation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('share_count', models.BigIntegerField(default=0)),
+                ('average_ratting', models.FloatField(default=0.0)),
+                ('review_count', models.BigIntegerField(default=0)),
+                ('click_count', models.BigIntegerField(default=0)),
+                ('view_count', models.BigIntegerField(default=0)),
+                ('search_count', models.BigIntegerField(default=0)),
+                ('overall_score', models.BigIntegerField(default=50)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='business_reputation', to='business.business')),
+            ],
+            options={
+                'verbose_name_plural': 'Reputations',
+                'db_table': 'reputation',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reputation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reputation',
+            name='click_through_rate',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
@@ -2,6 +2,11 @@ from django.db import models
 from django.db.models import Count, Avg
 
 
+def click_through_rate(clicks, views):
+    """Clicks per view, 0.0 when the ad(s) have no views yet"""
+    return clicks / views if views else 0.0
+
+
 class Reputation(models.Model):
     business = models.ForeignKey('business.Business', on_delete=models.CASCADE, related_name='business_reputation')
     share_count = models.BigIntegerField(default=0)
@@ -10,6 +15,7 @@ class Reputation(models.Model):
     click_count = models.BigIntegerField(default=0)
     view_count = models.BigIntegerField(default=0)
     search_count = models.BigIntegerField(default=0)  # How many times business appeared in searches
+    click_through_rate = models.FloatField(default=0.0)  # clicks / views, flagged traffic excluded
     overall_score = models.BigIntegerField(default=50)
     last_updated = models.DateTimeField(auto_now=True)
 
@@ -57,25 +63,29 @@ class Reputation(models.Model):
         Update reputation metrics from business's ads
         """
         from interactions.models import Share, Review, ServiceRatting, AdClick, AdView, SearchQuery
+        from advouch.db.replicas import replica_reads
 
-        # Get all ads for this business
-        ads = business.ads.all()
+        # These aggregates tolerate replication lag, so read them from a replica if configured
+        with replica_reads():
+            # Get all ads for this business
+            ads = business.ads.all()
 
-        # Count shares
-        self.share_count = Share.objects.filter(ad__in=ads).count()
+            # Count shares
+            self.share_count = Share.objects.filter(ad__in=ads).count()
 
-        # Count and average ratings
-        ratings = ServiceRatting.objects.filter(ad__in=ads)
-        self.review_count = Review.objects.filter(ad__in=ads).count()
-        avg_rating = ratings.aggregate(Avg('ratting'))['ratting__avg']
-        self.average_ratting = avg_rating if avg_rating else 0.0
+            # Count and average ratings
+            ratings = ServiceRatting.objects.filter(ad__in=ads)
+            self.review_count = Review.objects.filter(ad__in=ads).count()
+            avg_rating = ratings.aggregate(Avg('ratting'))['ratting__avg']
+            self.average_ratting = avg_rating if avg_rating else 0.0
 
-        # Count clicks and views
-        self.click_count = AdClick.objects.filter(ad__in=ads).count()
-        self.view_count = AdView.objects.filter(ad__in=ads).count()
+            # Count clicks and views, ignoring traffic flagged as bots or bursts
+            self.click_count = AdClick.objects.filter(ad__in=ads, is_flagged=False).count()
+            self.view_count = AdView.objects.filter(ad__in=ads, is_flagged=False).count()
+            self.click_through_rate = click_through_rate(self.click_count, self.view_count)
 
-        # Count search appearances
-        self.search_count = SearchQuery.objects.filter(clicked_business=business).count()
+            # Count search appearances
+            self.search_count = SearchQuery.objects.filter(clicked_business=business).count()
 
         # Calculate overall score
         self.calculate_score()
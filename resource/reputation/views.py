@@ -2,11 +2,15 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.generics import RetrieveAPIView
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from asgiref.sync import sync_to_async
 from .models import Reputation
 from business.models import Business
 from users.authentication import JWTAuthentication
 from users.permission import IsAuthenticated
+from users.ownership import owns_business
+from advouch.conditional import ConditionalGetMixin
+from advouch.views import AsyncAPIView
 
 
 class ReputationSerializer:
@@ -23,21 +27,24 @@ class ReputationSerializer:
             'click_count': reputation.click_count,
             'view_count': reputation.view_count,
             'search_count': reputation.search_count,
+            'click_through_rate': reputation.click_through_rate,
             'overall_score': reputation.overall_score,
             'last_updated': reputation.last_updated.isoformat() if reputation.last_updated else None
         }
 
 
-class BusinessReputationView(APIView):
+class BusinessReputationView(ConditionalGetMixin, AsyncAPIView):
     """
     Get reputation for a specific business
     GET /api/v1/reputation/business/{business_id}/
     """
-    def get(self, request, business_id):
-        business = get_object_or_404(Business, id=business_id)
+    conditional_models = [Business, Reputation]
 
-        # Get or create reputation
-        reputation, created = Reputation.objects.get_or_create(
+    async def get(self, request, business_id):
+        business = await aget_object_or_404(Business, id=business_id)
+
+        # Get or create reputation (business is joined so serializing it needs no extra query)
+        reputation, created = await Reputation.objects.select_related('business').aget_or_create(
             business=business,
             defaults={
                 'share_count': 0,
@@ -52,7 +59,7 @@ class BusinessReputationView(APIView):
 
         # If just created or data is stale, update it
         if created:
-            reputation.update_from_business(business)
+            await sync_to_async(reputation.update_from_business)(business)
 
         return Response(ReputationSerializer.serialize(reputation))
 
@@ -70,7 +77,7 @@ class UpdateBusinessReputationView(APIView):
         business = get_object_or_404(Business, id=business_id)
 
         # Check if user owns this business
-        if business.owner != request.user:
+        if not owns_business(request, business_id):
             return Response(
                 {'error': 'You do not have permission to update this business reputation'},
                 status=status.HTTP_403_FORBIDDEN
@@ -75,14 +75,17 @@ class JWTAuthentication(authentication.BaseAuthentication):
             }
         )
 
-        # Update user data if not created (sync with latest OAuth data)
+        # Update user data if not created (sync with latest OAuth data).
+        # Only write when something changed so plain reads stay read-only.
         if not created:
-            user.full_name = full_name
-            user.email = email
-            user.gender = gender
+            changes = {"full_name": full_name, "email": email, "gender": gender}
             if birthdate:
-                user.birthdate = birthdate
-            user.save()
+                changes["birthdate"] = birthdate
+            changed_fields = [field for field, value in changes.items() if getattr(user, field) != value]
+            if changed_fields:
+                for field in changed_fields:
+                    setattr(user, field, changes[field])
+                user.save(update_fields=changed_fields)
 
         # Note: Profile picture is NOT included in JWT token to avoid huge token sizes
         # It should be handled separately during the OAuth callback via the sync endpoint
@@ -34,6 +34,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     gender = models.CharField(max_length=50, null=True, blank=True)
     birthdate = models.DateField(null=True, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    # width -> URL of a resized copy, filled in by users/pictures.py
+    picture_variants = models.JSONField(default=dict, blank=True)
     public = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -48,6 +50,19 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = 'users_user'
+        indexes = [
+            # ListUsers only ever reads public profiles
+            models.Index(
+                fields=['-created_at'],
+                name='users_public_created_idx',
+                condition=models.Q(public=True),
+            ),
+            models.Index(
+                fields=['full_name'],
+                name='users_public_name_idx',
+                condition=models.Q(public=True),
+            ),
+        ]
 
     def __str__(self):
         return self.full_name
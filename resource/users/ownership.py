@@ -0,0 +1,85 @@
+"""
+Ownership checks that don't load owners.
+
+Ownership is always decided on the owner's foreign key column (owner_id,
+user_id), never by loading the related user.
+
+    OwnerScopedMixin     update/delete views filter their queryset by the
+                         requesting user, so fetching the object is the
+                         ownership check; only when that finds nothing is
+                         the row looked up again, to answer 403 for other
+                         users' objects and 404 for missing ones
+    owned_ids()          which of many ids a user owns, in one query, for
+                         bulk endpoints
+    owned_business_ids() the requesting user's business ids, queried once
+                         per request however many checks need them
+"""
+from django.http import Http404
+from rest_framework.exceptions import PermissionDenied
+
+from business.models import Business
+
+
+def get_owner_field(view):
+    return getattr(view, 'owner_field', 'owner')
+
+
+def owner_attname(model, owner_field='owner'):
+    """The column behind `owner_field`, e.g. 'owner' -> 'owner_id'"""
+    return model._meta.get_field(owner_field).attname
+
+
+class OwnerScopedMixin:
+    """
+    For generic views over the requesting user's own objects. Set
+    `owner_field` if the model's owner foreign key isn't called owner.
+    """
+    owner_field = 'owner'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(**{owner_attname(queryset.model, self.owner_field): user.id})
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            if super().get_queryset().filter(**lookup).exists():
+                raise PermissionDenied
+            raise
+
+
+def owned_ids(model, ids, user, owner_field='owner'):
+    """The subset of `ids` that `user` owns, as a set; one query"""
+    ids = set(ids)
+    if not ids or not user.is_authenticated:
+        return set()
+    return set(
+        model._default_manager.filter(pk__in=ids, **{owner_attname(model, owner_field): user.id})
+        .values_list('pk', flat=True)
+    )
+
+
+def owned_business_ids(request):
+    """
+    Ids of the requesting user's businesses. Queried on first use and kept
+    on the request, so later checks in the same request are free.
+    """
+    http_request = getattr(request, '_request', request)
+    owned = getattr(http_request, '_owned_business_ids', None)
+    if owned is None:
+        user = request.user
+        owned = frozenset(
+            Business.objects.filter(owner_id=user.id).values_list('id', flat=True)
+        ) if user.is_authenticated else frozenset()
+        http_request._owned_business_ids = owned
+    return owned
+
+
+def owns_business(request, business_id):
+    return business_id in owned_business_ids(request)
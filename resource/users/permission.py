@@ -1,15 +1,27 @@
 from rest_framework.permissions import BasePermission
 
+from .ownership import get_owner_field, owner_attname
+
 
 class IsAuthenticated(BasePermission):
     def has_permission(self, request, view):
-        return request.user
+        return bool(request.user and request.user.is_authenticated)
 
 
 class IsOwner(BasePermission):
+    """
+    The object's owner is the requesting user. Compares the foreign key
+    column, so the owner row is never loaded. Views whose objects name
+    their owner differently set `owner_field` (e.g. 'user' for reviews).
+    """
+
+    def has_permission(self, request, view):
+        # Refuse anonymous requests before the object is looked up
+        return bool(request.user and request.user.is_authenticated)
+
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        return getattr(obj, owner_attname(type(obj), get_owner_field(view))) == request.user.id
 
 class IsSelf(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj == request.user
\ No newline at end of file
+        return obj == request.user
@@ -0,0 +1,126 @@
+"""
+Profile pictures (see advouch/media.py).
+
+SyncUserProfile passes the picture Fayda sends, a base64 data URI, to
+enqueue_picture() and returns without decoding it. Pictures whose encoded
+length already puts them over PROFILE_PICTURE_MAX_BYTES are refused before
+any decoding. In the background the picture is decoded and hashed in
+chunks. Fayda sends the same picture on every login, so if the hash names
+the user's current original nothing else happens. Otherwise the picture is
+scaled down to fit PROFILE_PICTURE_MAX_SIDE, stored content-addressed as
+the user's profile_picture, and its variants go into User.picture_variants.
+A picture that can't be decoded is logged and the user keeps the previous
+one.
+"""
+import base64
+import binascii
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+
+from advouch import conditional, media as pipeline
+from .models import User
+
+
+logger = logging.getLogger(__name__)
+
+
+# base64 characters decoded at a time; a multiple of 4
+DECODE_CHUNK = 64 * 1024
+_WHITESPACE = str.maketrans('', '', ' \t\r\n')
+
+
+def _payload_start(picture):
+    """Index where the base64 payload of a data URI starts; raises ValueError"""
+    if not isinstance(picture, str):
+        raise ValueError(f"expected a data URI string, got {type(picture).__name__}")
+    comma = picture.find(',', 0, 256)
+    header = picture[:comma]
+    if comma < 0 or not header.startswith('data:image/') or not header.endswith(';base64'):
+        raise ValueError("not a base64 image data URI")
+    return comma + 1
+
+
+def check_size(picture):
+    """Raise ValueError if the decoded picture would exceed PROFILE_PICTURE_MAX_BYTES"""
+    start = _payload_start(picture)
+    encoded = len(picture) - start
+    # Every 4 base64 characters decode to at most 3 bytes
+    if encoded // 4 * 3 > settings.PROFILE_PICTURE_MAX_BYTES:
+        raise ValueError(f"picture is over {settings.PROFILE_PICTURE_MAX_BYTES} bytes")
+
+
+def decode_data_uri(picture):
+    """
+    (image bytes as a bytearray, SHA-256 hex) from a 'data:image/...;base64,...' URI,
+    decoded and hashed a chunk at a time so the payload is never copied
+    whole. Raises ValueError.
+    """
+    check_size(picture)
+    start = _payload_start(picture)
+    decoded, digest, carry = bytearray(), hashlib.sha256(), ''
+    for offset in range(start, len(picture), DECODE_CHUNK):
+        # Line breaks are allowed in base64, so decode whole 4-character groups only
+        text = carry + picture[offset:offset + DECODE_CHUNK].translate(_WHITESPACE)
+        usable = len(text) - len(text) % 4
+        text, carry = text[:usable], text[usable:]
+        try:
+            chunk = base64.b64decode(text, validate=True)
+        except binascii.Error as error:
+            raise ValueError(f"bad base64: {error}") from error
+        digest.update(chunk)
+        decoded += chunk
+    if carry:
+        raise ValueError("bad base64: truncated payload")
+    return decoded, digest.hexdigest()
+
+
+def _save(user_id, data, digest=None, **current):
+    original, variants = pipeline.store_image(data, digest, max_side=settings.PROFILE_PICTURE_MAX_SIDE)
+    if User.objects.filter(pk=user_id, **current).update(profile_picture=original, picture_variants=variants):
+        conditional.bump(User)
+
+
+def ingest_picture(user_id, picture):
+    """
+    Store a data URI picture as the user's profile picture, unless it is
+    the one the user already has
+    """
+    try:
+        data, digest = decode_data_uri(picture)
+        # Originals are named after the hash of the bytes received
+        current = User.objects.filter(pk=user_id).values_list('profile_picture', flat=True).first()
+        if current and current.startswith(pipeline.original_prefix(digest)):
+            return
+        _save(user_id, data, digest)
+    except ValueError as error:
+        logger.warning("Profile picture of user %s: %s", user_id, error)
+
+
+def process_picture(user_id):
+    """Move a user's current profile picture into the pipeline and make its variants"""
+    user = User.objects.filter(pk=user_id).exclude(profile_picture='').exclude(profile_picture=None).first()
+    if user is None or user.profile_picture.size > settings.PROFILE_PICTURE_MAX_BYTES:
+        return
+    name = user.profile_picture.name
+    with user.profile_picture.open('rb') as source:
+        data = source.read()
+    # A picture already in the pipeline keeps its name
+    digest = os.path.basename(name).split('.', 1)[0] if name.startswith('originals/') else None
+    try:
+        # Unless a new picture arrived in the meantime
+        _save(user_id, data, digest, profile_picture=name)
+    except ValueError as error:
+        logger.warning("Profile picture of user %s: %s", user_id, error)
+
+
+def enqueue_picture(user_id, picture):
+    """
+    Ingest `picture` in the background after the current transaction
+    commits. Raises ValueError, without queueing anything, for a picture
+    that is not a data URI or is too large.
+    """
+    check_size(picture)
+    pipeline.enqueue(ingest_picture, user_id, picture)
@@ -12,12 +12,14 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
+        read_only_fields = ['picture_variants']
         fields = [
             'full_name',
             'phone_number',
             'email',
             'public',
             'profile_picture',
+            'picture_variants',
             'birthdate',
             'socials',
         ]
@@ -1,3 +1,110 @@
-from django.test import TestCase
+import base64
+import hashlib
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from business.models import Business
+
+from . import pictures
+from .models import User
+
+
+class PictureInputTests(SimpleTestCase):
+    """Pictures that can't be used raise ValueError before anything is decoded or queued"""
+
+    NOT_STRINGS = [123, 1.5, True, ['data:image/png;base64,AAAA'], {'data': 'x'}, b'data:image/png;base64,AAAA']
+    MALFORMED = [
+        '',
+        'hello',
+        'data:text/plain;base64,AAAA',
+        'data:image/png,AAAA',
+        'data:image/png;base64',
+        'data:image/png;base64,@@@@',
+        'data:image/png;base64,AAAAA',
+    ]
+
+    def test_non_string_is_value_error(self):
+        for picture in self.NOT_STRINGS:
+            with self.subTest(picture=picture):
+                with self.assertRaises(ValueError):
+                    pictures.check_size(picture)
+                with self.assertRaises(ValueError):
+                    pictures.decode_data_uri(picture)
+                with self.assertRaises(ValueError):
+                    pictures.enqueue_picture(1, picture)
+
+    def test_malformed_data_uri_is_value_error(self):
+        for picture in self.MALFORMED:
+            with self.subTest(picture=picture):
+                with self.assertRaises(ValueError):
+                    pictures.decode_data_uri(picture)
+
+    @override_settings(PROFILE_PICTURE_MAX_BYTES=3)
+    def test_oversized_picture_is_refused(self):
+        with self.assertRaises(ValueError):
+            pictures.check_size('data:image/png;base64,AAAAAAAA')
+
+    def test_decodes_across_line_breaks(self):
+        data = bytes(range(256)) * 700
+        encoded = base64.encodebytes(data).decode()
+        decoded, digest = pictures.decode_data_uri('data:image/png;base64,' + encoded)
+        self.assertEqual(bytes(decoded), data)
+        self.assertEqual(digest, hashlib.sha256(data).hexdigest())
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class SyncUserProfilePictureTests(TestCase):
+    """A bad picture is skipped; the rest of the profile still syncs"""
+
+    def setUp(self):
+        self.user = User.objects.create(phone_number='+251900000001', full_name='Before', email='before@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, picture):
+        return self.client.post('/api/v1/me/sync/', {'name': 'After', 'picture': picture}, format='json')
+
+    def test_non_string_picture(self):
+        for picture in [123, ['x'], {'data': 'x'}]:
+            with self.subTest(picture=picture):
+                response = self.sync(picture)
+                self.assertEqual(response.status_code, 200)
+                self.user.refresh_from_db()
+                self.assertEqual(self.user.full_name, 'After')
+                self.assertFalse(self.user.profile_picture)
+
+    def test_malformed_picture(self):
+        response = self.sync('data:image/png;base64')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.full_name, 'After')
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class OwnershipStatusTests(TestCase):
+    """Missing rows are 404s, other users' rows 403s"""
+
+    def setUp(self):
+        self.owner = User.objects.create(phone_number='+251900000001', full_name='Owner')
+        self.other = User.objects.create(phone_number='+251900000002', full_name='Other')
+        self.business = Business.objects.create(name='Cafe', location='Adama', description='Coffee', owner=self.owner)
+        self.client = APIClient()
+
+    def statuses(self, request):
+        self.client.force_authenticate(self.owner)
+        own = request(self.business.id).status_code
+        missing = request(self.business.id + 1000).status_code
+        self.client.force_authenticate(self.other)
+        others = request(self.business.id).status_code
+        return own, missing, others
+
+    def test_update_reputation(self):
+        def request(business_id):
+            return self.client.post(f'/api/v1/reputation/business/{business_id}/update/')
+        self.assertEqual(self.statuses(request), (200, 404, 403))
+
+    def test_update_business(self):
+        def request(business_id):
+            return self.client.patch(f'/api/v1/business/{business_id}/', {'name': 'Bar'}, format='json')
+        self.assertEqual(self.statuses(request), (200, 404, 403))
@@ -0,0 +1,169 @@
+"""
+GCRA (generic cell rate algorithm) rate limiting for DRF views.
+
+Views opt in per class:
+
+    class ListAds(ListAPIView):
+        throttle_classes = [RateLimitThrottle]
+        throttle_scope = 'public_read'
+
+The rate for a scope comes from settings.RATELIMIT_RATES (e.g. '120/min'),
+or from a `throttle_rate` attribute on the view. Authenticated requests are
+limited per user, anonymous ones per client IP. A rejected request gets a
+429 with a Retry-After header from DRF.
+
+GCRA keeps a single "theoretical arrival time" per key instead of a window of
+timestamps, so a check is one read and one write. The in-memory backend is
+per process; the Redis backend shares counters between workers and runs the
+whole check as one Lua script.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    '120/min' -> (120, 60). Same format as DRF's throttle rates.
+    """
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class MemoryBackend:
+    """
+    Per-process GCRA state, bounded to `max_keys` entries (least recently
+    used keys are dropped first, which only ever makes a limit more lenient).
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._tats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key, interval, burst_offset):
+        now = time.monotonic()
+        with self._lock:
+            tat = self._tats.get(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + interval
+            allow_at = new_tat - burst_offset
+            if now < allow_at:
+                return allow_at - now
+
+            self._tats[key] = new_tat
+            self._tats.move_to_end(key)
+            if len(self._tats) > self.max_keys:
+                self._tats.popitem(last=False)
+        return 0.0
+
+
+# KEYS[1] = limiter key, ARGV[1] = emission interval (ms), ARGV[2] = burst offset (ms).
+# Returns 0 when allowed, otherwise the number of ms to wait.
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local burst_offset = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - burst_offset
+if now < allow_at then
+    return allow_at - now
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return 0
+"""
+
+
+class RedisBackend:
+    """
+    Shared GCRA state in Redis. Uses Redis' own clock so workers on
+    different hosts agree on time. Fails open if Redis is unreachable.
+    """
+
+    def __init__(self, url, prefix='ratelimit:'):
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(GCRA_SCRIPT)
+
+    def check(self, key, interval, burst_offset):
+        try:
+            wait_ms = self._script(
+                keys=[self.prefix + key],
+                args=[int(interval * 1000), int(burst_offset * 1000)],
+            )
+        except Exception as e:
+            logger.warning("Rate limiter backend unavailable, allowing request: %s", e)
+            return 0.0
+        return wait_ms / 1000.0
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.RATELIMIT_BACKEND == 'redis':
+            _backend = RedisBackend(settings.REDIS_URL)
+        else:
+            _backend = MemoryBackend()
+    return _backend
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    DRF throttle backed by the GCRA limiter. A rate of 'N/period' allows
+    bursts of up to N requests, refilling evenly over the period.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rate(self, view):
+        rate = getattr(view, 'throttle_rate', None)
+        if rate is None:
+            scope = getattr(view, 'throttle_scope', None)
+            rate = settings.RATELIMIT_RATES.get(scope)
+        return rate
+
+    def get_cache_key(self, request, view):
+        scope = getattr(view, 'throttle_scope', None) or view.__class__.__name__
+        if request.user and request.user.is_authenticated:
+            return f"{scope}:user:{request.user.pk}"
+        return f"{scope}:ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        if not settings.RATELIMIT_ENABLED:
+            return True
+
+        rate = self.get_rate(view)
+        if rate is None:
+            return True
+
+        num_requests, period = parse_rate(rate)
+        interval = period / num_requests
+        burst_offset = interval * num_requests
+
+        wait = get_backend().check(self.get_cache_key(request, view), interval, burst_offset)
+        self.wait_seconds = wait
+        return wait <= 0
+
+    def wait(self):
+        return self.wait_seconds
@@ -1,30 +1,38 @@
 from rest_framework.generics import ListAPIView, DestroyAPIView, RetrieveAPIView, CreateAPIView, UpdateAPIView
 from rest_framework.views import APIView
 from .serializers import UserSerializer
-from .models import User
+from .models import Socials, User
+from . import pictures
 from .pagination import UserPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status
 from .permission import IsAuthenticated, IsSelf
 from .authentication import JWTAuthentication
+from .throttling import RateLimitThrottle
+from advouch.conditional import ConditionalGetMixin
+from advouch.fieldsets import SparseFieldsMixin
+from advouch.db.replicas import ReplicaReadMixin
 from rest_framework.response import Response
 from datetime import datetime
-import base64
-from django.core.files.base import ContentFile
 
 
-class GetMyProfile(RetrieveAPIView):
+class GetMyProfile(ConditionalGetMixin, RetrieveAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    conditional_models = [User, Socials]
+    conditional_per_user = True
+    cache_control = 'private, no-cache'
     
     def get(self, request):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
 
-class ListUsers(ListAPIView):
+class ListUsers(SparseFieldsMixin, ReplicaReadMixin, ListAPIView):
     queryset = User.objects.filter(public=True)
     serializer_class = UserSerializer
     pagination_class = UserPagination
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = 'public_read'
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['full_name', 'phone_number']
@@ -88,28 +96,16 @@ class SyncUserProfile(APIView):
         if 'gender' in data:
             user.gender = data['gender']
 
-        # Handle profile picture from Fayda (base64 encoded)
-        if 'picture' in data and data['picture']:
-            try:
-                picture_data = data['picture']
-                # Check if it's a base64 data URI
-                if picture_data.startswith('data:image'):
-                    # Extract format and base64 string
-                    format_part, imgstr = picture_data.split(';base64,')
-                    ext = format_part.split('/')[-1]  # e.g., 'jpeg', 'png'
-
-                    # Decode base64 and save
-                    file = ContentFile(
-                        base64.b64decode(imgstr),
-                        name=f"{user.phone_number}_profile.{ext}"
-                    )
-                    user.profile_picture.save(file.name, file, save=False)
-                    print(f"[SyncProfile] Saved profile picture for user {user.phone_number}")
-            except Exception as e:
-                print(f"[SyncProfile] Failed to save profile picture: {e}")
-                # Don't fail the entire sync if picture save fails
+        # Not profile_picture: the picture job below writes that on its own
+        user.save(update_fields=['full_name', 'email', 'phone_number', 'birthdate', 'gender'])
 
-        user.save()
+        # Profile picture from Fayda (base64 data URI), decoded and resized in the background
+        if data.get('picture'):
+            try:
+                pictures.enqueue_picture(user.id, data['picture'])
+            except ValueError as e:
+                # Don't fail the entire sync if the picture is unusable
+                print(f"[SyncProfile] Skipped profile picture: {e}")
 
         serializer = UserSerializer(user)
         return Response({